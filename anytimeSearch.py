@@ -0,0 +1,183 @@
+import heapq
+import time
+from typing import Callable, Dict
+
+from heuristicSearchComplete import COST_MAP, FlatGrid, Position
+from searchResult import SearchResult
+
+# =============================================
+# Busca Anytime (ARA*)
+# =============================================
+#
+# A primeira solução sai rápido com a heurística multiplicada por ``weight``.
+# Depois o peso diminui e a busca reaproveita o que já foi expandido: células
+# melhoradas depois de fechadas ficam em INCONS e voltam para a fila na
+# rodada seguinte. Isso continua até provar o ótimo ou acabar o orçamento
+# (tempo ou expansões), que só é cobrado depois da primeira solução: uma
+# busca nunca volta vazia se o objetivo for alcançável.
+#
+# Cada solução vem com um limite de subotimalidade: custo / menor g + h entre
+# as células ainda abertas ou inconsistentes. Algum nó do caminho ótimo está
+# nesse conjunto com g correto, então o limite vale só com a heurística
+# admissível (a 'scaled' não é consistente perto de células de custo 0).
+
+DEFAULT_WEIGHT = 3.0
+WEIGHT_STEP = 0.5
+
+# Expansões entre duas consultas ao relógio
+CLOCK_INTERVAL = 64
+
+def anytime_search(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    weight: float = DEFAULT_WEIGHT,
+    weight_step: float = WEIGHT_STEP,
+    time_limit: float = None,
+    deadline: float = None,
+    max_expansions: int = None,
+    on_solution: Callable = None,
+    stats: dict = None,
+    heuristic_mode: str = 'scaled'
+) -> SearchResult:
+    """ARA*: melhora a solução até o ótimo ou até o fim do orçamento.
+
+    ``time_limit`` é em segundos a partir de agora e ``deadline`` um instante
+    absoluto de ``time.perf_counter()`` (para dividir um prazo global entre
+    várias buscas). ``on_solution(resultado, limite)`` é chamado a cada
+    solução melhor. Retorna a última solução; ``stats`` recebe
+    ``'expanded'``, ``'bound'`` (1 = ótimo provado) e ``'solutions'``, a
+    lista de soluções com custo, limite, peso, expansões e tempo.
+    """
+    started = time.perf_counter()
+    if time_limit is not None:
+        limit = started + time_limit
+        deadline = limit if deadline is None else min(deadline, limit)
+
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    solutions = []
+    if stats is not None:
+        stats.update(expanded=0, bound=inf, solutions=solutions)
+    if not grid.components().reachable(start, goal):
+        return SearchResult.not_found(grid.cols)
+
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+    source = grid.index(start)
+    target = grid.index(goal)
+    estimate = grid.heuristic_fn(target, heuristic_mode)
+
+    g = [inf] * grid.size
+    parent = [-1] * grid.size
+    closed = bytearray(grid.size)
+    h_cache = [None] * grid.size
+
+    def h(s: int) -> float:
+        value = h_cache[s]
+        if value is None:
+            value = h_cache[s] = estimate(s)
+        return value
+
+    g[source] = 0
+    w = max(1.0, weight)
+    frontier = [(w * h(source), source)]
+    incons = set()
+    expanded = 0
+
+    def improve_path() -> bool:
+        """Uma rodada de A* com peso ``w``; False se o orçamento acabou"""
+        nonlocal expanded
+        while frontier:
+            key, s = frontier[0]
+            if closed[s] or key != g[s] + w * h(s):
+                heapq.heappop(frontier)  # Entrada antiga
+                continue
+            if g[target] <= key:
+                return True
+            # O orçamento só vale depois que existe alguma solução
+            if g[target] < inf:
+                if max_expansions is not None and expanded >= max_expansions:
+                    return False
+                if deadline is not None and expanded % CLOCK_INTERVAL == 0 and time.perf_counter() >= deadline:
+                    return False
+
+            heapq.heappop(frontier)
+            closed[s] = 1
+            expanded += 1
+            base = g[s]
+            for offset in offsets:
+                nxt = s + offset
+                step = move_cost[nxt]
+                if step == inf:
+                    continue
+                new_cost = base + step
+                if new_cost < g[nxt]:
+                    estimate_nxt = h(nxt)
+                    if estimate_nxt == inf:
+                        continue  # Não alcança o objetivo
+                    g[nxt] = new_cost
+                    parent[nxt] = s
+                    if closed[nxt]:
+                        incons.add(nxt)
+                    else:
+                        heapq.heappush(frontier, (new_cost + w * estimate_nxt, nxt))
+        return True
+
+    def open_cells():
+        return {s for _, s in frontier if not closed[s]} | incons
+
+    def extract() -> SearchResult:
+        cells = [target]
+        while cells[-1] != source:
+            cells.append(parent[cells[-1]])
+        cells.reverse()
+        path = [grid.position(s) for s in cells]
+        costs = {}
+        total = 0
+        for k, s in enumerate(cells):
+            if k > 0:
+                total += move_cost[s]
+            costs[path[k]] = total
+        return SearchResult.from_path(path, costs, grid.cols)
+
+    best = SearchResult.not_found(grid.cols)
+    bound = inf
+    while True:
+        finished = improve_path()
+        pending = open_cells()
+
+        if g[target] < inf:
+            lower = min([g[target]] + [g[s] + h(s) for s in pending])
+            result = extract()
+            improved = result.cost < best.cost
+            if improved:
+                best = result
+            new_bound = best.cost / lower if lower > 0 else (1.0 if best.cost == 0 else inf)
+            new_bound = max(1.0, new_bound)
+            if improved or new_bound < bound:
+                bound = new_bound
+                solutions.append({
+                    'cost': best.cost,
+                    'bound': bound,
+                    'weight': w,
+                    'expanded': expanded,
+                    'seconds': time.perf_counter() - started
+                })
+                if on_solution is not None:
+                    on_solution(best, bound)
+
+        if not finished or bound <= 1 or not pending:
+            break
+
+        # Próxima rodada: peso menor, abertas + inconsistentes com chaves novas
+        w = max(1.0, w - weight_step)
+        incons.clear()
+        closed[:] = bytes(grid.size)
+        frontier[:] = [(g[s] + w * h(s), s) for s in pending]
+        heapq.heapify(frontier)
+
+    if stats is not None:
+        stats.update(expanded=expanded, bound=bound)
+    return best
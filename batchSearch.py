@@ -0,0 +1,139 @@
+import os
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from heuristicSearchComplete import COST_MAP, FlatGrid, Path, Position, a_star_search_array
+
+# =============================================
+# Consultas em Lote (vários processos)
+# =============================================
+#
+# O processo principal monta o FlatGrid e copia uma única vez para memória
+# compartilhada o terreno, o vetor de custos com borda e os rótulos das
+# componentes. Cada processo monta seu FlatGrid como visões desses arrays
+# (``FlatGrid.from_arrays``), sem cópia própria do mapa, e depois só recebe
+# os pares (início, objetivo). O que cada processo aloca é o estado de cada
+# busca. Os resultados voltam com o índice do par, para que a lista final
+# fique na ordem da entrada.
+
+Query = Tuple[Position, Position]
+Result = Tuple[Path, Dict[Position, float]]
+
+# Abaixo deste número de consultas abrir processos custa mais do que ganha
+SERIAL_THRESHOLD = 64
+
+# Estado de cada processo trabalhador, preenchido por _init_worker
+_worker_grid = None
+_worker_memory = None
+
+# (shape, dtype, deslocamento em bytes) de cada array no bloco compartilhado
+Layout = List[Tuple[Tuple[int, ...], str, int]]
+
+def _solve(grid: FlatGrid, start: Position, goal: Position) -> Tuple[Result, int]:
+    stats = {}
+    path, cost = a_star_search_array(start, goal, grid, stats=stats)
+    if not path:
+        return ([], float('inf')), stats['expanded']
+    # Só os custos das células do caminho viajam de volta (GridCosts não é serializável)
+    costs = {pos: cost[pos] for pos in path}
+    if grid.integral and isinstance(grid.move_cost, memoryview):
+        costs = {pos: int(value) for pos, value in costs.items()}  # Visão em float
+    return (path, costs), stats['expanded']
+
+def _share(arrays: List[np.ndarray]) -> Tuple[SharedMemory, Layout]:
+    """Copia os arrays para um único bloco compartilhado, alinhados em 8 bytes"""
+    layout = []
+    offset = 0
+    for array in arrays:
+        layout.append((array.shape, array.dtype.str, offset))
+        offset += -(-array.nbytes // 8) * 8
+    memory = SharedMemory(create=True, size=max(1, offset))
+    for array, view in zip(arrays, _views(memory, layout)):
+        view[...] = array
+    return memory, layout
+
+def _views(memory: SharedMemory, layout: Layout) -> List[np.ndarray]:
+    return [np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+            for shape, dtype, offset in layout]
+
+def _init_worker(name: str, layout: Layout, cost_map: Dict[int, float]):
+    global _worker_grid, _worker_memory
+    _worker_memory = SharedMemory(name=name)
+    terrain, costs, labels = _views(_worker_memory, layout)
+    _worker_grid = FlatGrid.from_arrays(terrain, costs, cost_map, labels)
+
+def _solve_chunk(chunk: List[Tuple[int, Position, Position]]) -> List[Tuple[int, Result, int]]:
+    results = []
+    for index, start, goal in chunk:
+        result, expanded = _solve(_worker_grid, start, goal)
+        results.append((index, result, expanded))
+    return results
+
+def batch_search(
+    queries: Sequence[Query],
+    terrain_map,
+    cost_map: Dict[int, float] = COST_MAP,
+    workers: int = None,
+    serial_threshold: int = SERIAL_THRESHOLD,
+    chunk_size: int = None,
+    stats: dict = None
+) -> List[Result]:
+    """Resolve vários pares (início, objetivo) no mesmo mapa.
+
+    Retorna ``[(caminho, custos), ...]`` na ordem de ``queries``; os custos
+    cobrem as células de cada caminho e pares sem caminho viram
+    ``([], inf)``. Com poucas consultas ou ``workers=1`` tudo roda no
+    próprio processo.
+    """
+    queries = [(tuple(start), tuple(goal)) for start, goal in queries]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(queries)))
+
+    if workers == 1 or len(queries) < serial_threshold:
+        grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+        results = []
+        expanded = 0
+        for start, goal in queries:
+            result, count = _solve(grid, start, goal)
+            results.append(result)
+            expanded += count
+        if stats is not None:
+            stats.update(workers=1, expanded=expanded)
+        return results
+
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    components = grid.components()
+    if components.stale:
+        components.build()
+    terrain = grid.terrain
+    # uint8 cobre todos os tipos de terreno e reduz a cópia compartilhada
+    if terrain.size and 0 <= terrain.min() and terrain.max() <= 255:
+        terrain = terrain.astype(np.uint8)
+
+    if chunk_size is None:
+        # Alguns pedaços por processo equilibram a carga sem encher a fila
+        chunk_size = max(1, len(queries) // (workers * 4))
+    tasks = [(i, start, goal) for i, (start, goal) in enumerate(queries)]
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    memory, layout = _share([terrain, grid.costs, components.labels])
+    try:
+        results = [None] * len(queries)
+        expanded = 0
+        init_args = (memory.name, layout, grid.cost_map)
+        with get_context().Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            for chunk in pool.imap_unordered(_solve_chunk, chunks):
+                for index, result, count in chunk:
+                    results[index] = result
+                    expanded += count
+    finally:
+        memory.close()
+        memory.unlink()
+
+    if stats is not None:
+        stats.update(workers=workers, expanded=expanded)
+    return results
@@ -0,0 +1,537 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from heuristicSearchComplete import (
+    COST_MAP, GRASS, SAND, FOREST, MOUNTAIN, WATER, WAY, WALL, DANGEON, PENDANT, LINK, LOSTWOOD,
+    FlatGrid, a_star_search, dijkstra_scan, loading_map, multi_target_search
+)
+from batchSearch import batch_search
+from boundedSearch import bounded_search
+from distanceField import distance_field
+from dungeonTable import round_trip
+from mapLoader import TiledMap, load_map, save_binary_map, save_tiled_map
+from routePlanner import empty_matrix, solve_order
+
+Position = Tuple[int, int]
+
+# Versão do formato do JSON gerado (mudar ao alterar os campos dos registros)
+RESULTS_FORMAT = 2
+
+# =============================================
+# Mapas Sintéticos
+# =============================================
+
+# Proporção de cada terreno nos mapas aleatórios (predomínio de grama)
+TERRAIN_WEIGHTS = {
+    GRASS: 0.55,
+    SAND: 0.15,
+    FOREST: 0.15,
+    MOUNTAIN: 0.1,
+    WATER: 0.05
+}
+
+def random_terrain(rows: int, cols: int, seed: int = 0, obstacle_density: float = 0.0) -> np.ndarray:
+    """Mapa aleatório reproduzível; ``obstacle_density`` é a fração de paredes"""
+    rng = np.random.default_rng(seed)
+    kinds = np.array(list(TERRAIN_WEIGHTS.keys()))
+    weights = np.array(list(TERRAIN_WEIGHTS.values()))
+    terrain = rng.choice(kinds, size=(rows, cols), p=weights / weights.sum())
+    if obstacle_density > 0:
+        terrain[rng.random((rows, cols)) < obstacle_density] = WALL
+    return terrain
+
+def random_queries(grid: FlatGrid, count: int, seed: int = 0) -> List[Tuple[Position, Position]]:
+    """Pares (início, objetivo) sorteados entre células transitáveis"""
+    rng = np.random.default_rng(seed)
+    passable = np.argwhere(np.isfinite(grid.costs.reshape(grid.rows + 2, grid.width)[1:-1, 1:-1]))
+    picks = rng.integers(0, len(passable), size=(count, 2))
+    return [(tuple(map(int, passable[a])), tuple(map(int, passable[b]))) for a, b in picks]
+
+def largest_component_cells(grid: FlatGrid) -> np.ndarray:
+    """Células (linha, coluna) da maior componente conexa, para sortear pontos alcançáveis"""
+    components = grid.components()
+    if components.stale:
+        components.build()
+    labels = components.labels.reshape(grid.rows + 2, grid.width)[1:-1, 1:-1]
+    counts = np.bincount(labels.ravel())
+    counts[0] = 0
+    return np.argwhere(labels == counts.argmax())
+
+def random_world(
+    size: int,
+    seed: int = 0,
+    obstacle_density: float = 0.1,
+    dungeons: int = 3
+) -> Tuple[np.ndarray, Position, List[Position], Position]:
+    """Mapa principal com casa do Link, ``dungeons`` masmorras e Lost Woods.
+
+    Os pontos especiais são sorteados na maior componente, então todas as
+    pernas da jornada existem. Retorna ``(terreno, link, masmorras, lost woods)``.
+    """
+    terrain = random_terrain(size, size, seed, obstacle_density)
+    cells = largest_component_cells(FlatGrid(terrain, COST_MAP))
+    rng = np.random.default_rng(seed + 1)
+    picks = [tuple(map(int, cells[i])) for i in rng.choice(len(cells), size=dungeons + 2, replace=False)]
+    link, lost_woods, entrances = picks[0], picks[1], picks[2:]
+    terrain[link] = LINK
+    terrain[lost_woods] = LOSTWOOD
+    for pos in entrances:
+        terrain[pos] = DANGEON
+    return terrain, link, entrances, lost_woods
+
+def random_dungeon(size: int = 28, seed: int = 0, wall_density: float = 0.3) -> Tuple[np.ndarray, Position, Position]:
+    """Masmorra (caminho e paredes) com entrada e pingente na mesma componente"""
+    rng = np.random.default_rng(seed)
+    terrain = np.where(rng.random((size, size)) < wall_density, WALL, WAY)
+    cells = largest_component_cells(FlatGrid(terrain, COST_MAP))
+    entrance, pendant = (tuple(map(int, cells[i])) for i in rng.choice(len(cells), size=2, replace=False))
+    terrain[entrance] = LINK
+    terrain[pendant] = PENDANT
+    return terrain, entrance, pendant
+
+# =============================================
+# Medição
+# =============================================
+
+def measure(work: Callable, memory: bool = True) -> Tuple[object, float, int]:
+    """Executa ``work`` e retorna ``(resultado, segundos, pico de memória em bytes)``.
+
+    O pico vem de uma segunda execução sob ``tracemalloc`` (que deixa o código
+    mais lento), para não contaminar o tempo medido; ``None`` sem ``memory``.
+    """
+    started = time.perf_counter()
+    result = work()
+    seconds = time.perf_counter() - started
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            work()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+def bench_search(
+    terrain_map,
+    queries: List[Tuple[Position, Position]],
+    memory: bool = True,
+    **options
+) -> Dict[str, float]:
+    """Executa as consultas com ``a_star_search(**options)`` e mede vazão e memória"""
+    def work():
+        expanded = 0
+        total_cost = 0
+        stats = {}
+        for start, goal in queries:
+            result = a_star_search(start, goal, terrain_map, COST_MAP, stats=stats, **options)
+            expanded += stats['expanded']
+            if result:
+                total_cost += result.cost
+        return expanded, total_cost
+
+    (expanded, total_cost), seconds, peak = measure(work, memory)
+    return {
+        'queries': len(queries),
+        'seconds': seconds,
+        'expanded': expanded,
+        'expansions_per_sec': expanded / seconds if seconds > 0 else float('inf'),
+        'paths_per_sec': len(queries) / seconds if seconds > 0 else float('inf'),
+        'peak_bytes': peak,
+        'total_cost': total_cost
+    }
+
+# =============================================
+# Suítes
+# =============================================
+
+def shipped_queries() -> List[Tuple[str, FlatGrid, List[Tuple[Position, Position]]]]:
+    """Pernas da jornada real nos mapas do repositório"""
+    cases = []
+    main_map, link, targets, _ = loading_map("mainMap.txt")
+    cases.append(("mainMap.txt", FlatGrid(main_map, COST_MAP), [(link, t) for t in targets]))
+    for i in (1, 2, 3):
+        dungeon_map, entrance, _, pendant = loading_map(f"dungeonMap{i}.txt")
+        cases.append((f"dungeonMap{i}.txt", FlatGrid(dungeon_map, COST_MAP),
+                      [(entrance, pendant), (pendant, entrance)]))
+    return cases
+
+def benchmark_cases(sizes: List[int], queries: int, seed: int, densities: List[float]):
+    cases = shipped_queries()
+    for size in sizes:
+        for density in densities:
+            grid = FlatGrid(random_terrain(size, size, seed, density), COST_MAP)
+            cases.append((f"random {size}x{size} p={density:g}", grid, random_queries(grid, queries, seed)))
+        # Labirinto de custo uniforme (caminho e paredes), onde entram JPS e corredores;
+        # uma consulta sai de uma parede, que o início atravessa sem pagar
+        maze = FlatGrid(np.where(np.random.default_rng(seed).random((size, size)) < 0.3, WALL, WAY), COST_MAP)
+        pairs = random_queries(maze, queries, seed)
+        goal = pairs[0][1]
+        walls = (tuple(map(int, pos)) for pos in np.argwhere(maze.terrain == WALL))
+        wall = next((pos for pos in walls if maze.components().reachable(pos, goal)), None)
+        if wall is not None:
+            pairs.append((wall, goal))
+        cases.append((f"maze {size}x{size}", maze, pairs))
+    return cases
+
+def search_benchmark(cases, memory: bool = True) -> List[dict]:
+    """``a_star_search`` com o motor de dicionários (listas) e o de vetores (FlatGrid).
+
+    Nos mapas de custo uniforme (masmorras) o motor padrão já usa pontos de
+    salto; a variante 'jps' mede o JPS+ com as tabelas do FlatGrid e a
+    'corridor' a busca no grafo de corredores (montado na primeira consulta).
+    Todas as variantes devem somar o mesmo custo; uma diferença é avisada.
+    """
+    records = []
+    for name, grid, pairs in cases:
+        started = time.perf_counter()
+        terrain_list = grid.terrain.tolist()
+        setup = time.perf_counter() - started
+        engines = [('dict', terrain_list), ('array', grid), ('bidirectional', grid)]
+        if all(grid.uniform_step(start, goal) is not None for start, goal in pairs):
+            engines.append(('jps', grid))
+            engines.append(('corridor', grid))
+        reference = None
+        for engine, terrain_map in engines:
+            record = bench_search(terrain_map, pairs, memory, engine=engine)
+            record.update(suite='search', variant=engine, map=name,
+                          setup_seconds=setup if engine == 'dict' else 0.0)
+            records.append(record)
+            if reference is None:
+                reference = record['total_cost']
+            elif record['total_cost'] != reference:
+                print(f"Aviso: custo de '{engine}' em {name} difere do motor 'dict'")
+    return records
+
+def queue_benchmark(cases, memory: bool = True) -> List[dict]:
+    """heapq x fila de baldes, com a mesma heurística"""
+    records = []
+    for name, grid, pairs in cases:
+        for queue in ('heap', 'bucket'):
+            record = bench_search(grid, pairs, memory, engine='array', queue=queue)
+            record.update(suite='queue', variant=queue, map=name)
+            records.append(record)
+    return records
+
+def heuristic_benchmark(cases, memory: bool = True) -> List[dict]:
+    """Nós expandidos com Manhattan pura, escalada e ALT"""
+    records = []
+    for name, grid, pairs in cases:
+        # Os marcos são pré-calculados uma vez por mapa, fora da medição
+        started = time.perf_counter()
+        grid.landmarks()
+        setup = time.perf_counter() - started
+        for mode in ('manhattan', 'scaled', 'alt'):
+            record = bench_search(grid, pairs, memory, engine='array', heuristic_mode=mode)
+            record.update(suite='heuristic', variant=mode, map=name,
+                          setup_seconds=setup if mode == 'alt' else 0.0)
+            records.append(record)
+    return records
+
+def field_benchmark(cases, memory: bool = True) -> List[dict]:
+    """Custo até todas as células: ``dijkstra_scan`` x ``distance_field`` (vetorizado)"""
+    records = []
+    for name, grid, pairs in cases:
+        start = pairs[0][0]
+        variants = (
+            ('dijkstra_scan', lambda: dijkstra_scan(grid, grid.index(start))),
+            ('distance_field', lambda: distance_field(start, grid).cost)
+        )
+        for variant, work in variants:
+            dist, seconds, peak = measure(work, memory)
+            dist = np.asarray(dist, dtype=float)
+            reached = int(np.count_nonzero(np.isfinite(dist)))
+            records.append({
+                'suite': 'field', 'variant': variant, 'map': name,
+                'queries': 1, 'seconds': seconds, 'expanded': reached,
+                'expansions_per_sec': reached / seconds if seconds > 0 else float('inf'),
+                'paths_per_sec': None, 'peak_bytes': peak,
+                'total_cost': float(dist[np.isfinite(dist)].sum())
+            })
+    return records
+
+# Limites de nós da suíte bounded (o primeiro cabe todas as buscas dos mapas do repositório)
+BOUNDED_LIMITS = (100_000, 1000, 400)
+
+def bounded_benchmark(memory: bool = True) -> List[dict]:
+    """IDA* com memória limitada nas pernas reais, com limites de nós decrescentes.
+
+    Só os mapas do repositório: nos aleatórios grandes as iterações do IDA*
+    levam tempo demais para uma suíte de benchmark.
+    """
+    records = []
+    for name, grid, pairs in shipped_queries():
+        for limit in BOUNDED_LIMITS:
+            def work():
+                totals = dict(expanded=0, pruned=0, regenerated=0, peak_nodes=0, cost=0)
+                stats = {}
+                for start, goal in pairs:
+                    result = bounded_search(start, goal, grid, COST_MAP, limit, stats)
+                    for key in ('expanded', 'pruned', 'regenerated'):
+                        totals[key] += stats[key]
+                    totals['peak_nodes'] = max(totals['peak_nodes'], stats['peak_nodes'])
+                    if result:
+                        totals['cost'] += result.cost
+                return totals
+
+            totals, seconds, peak = measure(work, memory)
+            records.append({
+                'suite': 'bounded', 'variant': f"max {limit}", 'map': name,
+                'queries': len(pairs), 'seconds': seconds, 'expanded': totals['expanded'],
+                'expansions_per_sec': totals['expanded'] / seconds if seconds > 0 else float('inf'),
+                'paths_per_sec': len(pairs) / seconds if seconds > 0 else float('inf'),
+                'peak_bytes': peak, 'total_cost': totals['cost'], 'pruned': totals['pruned'],
+                'regenerated': totals['regenerated'], 'peak_nodes': totals['peak_nodes']
+            })
+    return records
+
+def plan_journey(grid: FlatGrid, link: Position, entrances: List[Position], lost_woods: Position,
+                 dungeon_maps: List[Tuple[np.ndarray, Position, Position]]) -> Tuple[tuple, float, int]:
+    """Mesmo fluxo de ``collect_pendants``: ida e volta das masmorras, pernas por
+    varredura e ordem por ``solve_order``. Retorna ``(ordem, custo, pernas)``."""
+    n = len(entrances)
+    node_cost = [0] * (n + 2)
+    for k, (dungeon, entrance, pendant) in enumerate(dungeon_maps, start=1):
+        node_cost[k] = round_trip(a_star_search, dungeon, entrance, pendant, COST_MAP).cost
+
+    points = [link] + entrances + [lost_woods]
+    leg_cost = empty_matrix(n)
+    legs = 0
+    for a in range(n + 1):
+        _, costs = multi_target_search(points[a], points[1:], grid)
+        for b in range(1, n + 2):
+            if a != b and not (a == 0 and b == n + 1 and n > 0):
+                leg_cost[a][b] = costs.get(points[b], float('inf'))
+                legs += 1
+    order, cost = solve_order(leg_cost, node_cost)
+    return order, cost, legs
+
+def ordering_benchmark(sizes: List[int], dungeon_counts: List[int], seed: int, density: float,
+                       memory: bool = True) -> List[dict]:
+    """Ordenação das masmorras (pendant ordering) com número crescente de masmorras"""
+    records = []
+    for size in sizes:
+        for count in dungeon_counts:
+            terrain, link, entrances, lost_woods = random_world(size, seed, density, count)
+            grid = FlatGrid(terrain, COST_MAP)
+            dungeons = [random_dungeon(seed=seed + k) for k in range(count)]
+            dungeon_maps = [(d, entrance, pendant) for d, entrance, pendant in dungeons]
+
+            (order, cost, legs), seconds, peak = measure(
+                lambda: plan_journey(grid, link, entrances, lost_woods, dungeon_maps), memory)
+            records.append({
+                'suite': 'ordering', 'variant': f"{count} masmorras", 'map': f"world {size}x{size} p={density:g}",
+                'queries': legs, 'seconds': seconds, 'expanded': None,
+                'expansions_per_sec': None, 'paths_per_sec': legs / seconds if seconds > 0 else float('inf'),
+                'peak_bytes': peak, 'total_cost': cost, 'order': list(order) if order else None
+            })
+    return records
+
+def loading_benchmark(sizes: List[int], seed: int, density: float, memory: bool = True) -> List[dict]:
+    """Listas aninhadas (o formato antigo), ``load_map`` em texto e ``load_map`` em .hmap"""
+    records = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            terrain, _, _, _ = random_world(size, seed, density)
+            text_file = os.path.join(folder, f"map{size}.txt")
+            binary_file = os.path.join(folder, f"map{size}.hmap")
+            with open(text_file, 'w') as f:
+                f.write('\n'.join(' '.join(map(str, row)) for row in terrain.tolist()))
+            save_binary_map(terrain, binary_file)
+
+            variants = (
+                ('listas', lambda: load_map(text_file).terrain.tolist()),
+                ('load_map txt', lambda: load_map(text_file)),
+                ('load_map hmap', lambda: load_map(binary_file))
+            )
+            for variant, work in variants:
+                _, seconds, peak = measure(work, memory)
+                records.append({
+                    'suite': 'loading', 'variant': variant, 'map': f"world {size}x{size}",
+                    'queries': 1, 'seconds': seconds, 'expanded': None, 'expansions_per_sec': None,
+                    'paths_per_sec': None, 'peak_bytes': peak,
+                    'cells_per_sec': size * size / seconds if seconds > 0 else float('inf')
+                })
+    return records
+
+def tiled_benchmark(sizes: List[int], queries: int, seed: int, density: float,
+                    memory: bool = True) -> List[dict]:
+    """Mesmas consultas no FlatGrid (motor de vetores) e no mapa em blocos (.tmap).
+
+    O .tmap é reaberto a cada medição, então o pico de memória inclui os
+    blocos lidos pela busca.
+    """
+    records = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            grid = FlatGrid(random_terrain(size, size, seed, density), COST_MAP)
+            pairs = random_queries(grid, queries, seed)
+            tiled_file = os.path.join(folder, f"map{size}.tmap")
+            save_tiled_map(grid.terrain, tiled_file)
+            name = f"random {size}x{size} p={density:g}"
+
+            record = bench_search(grid, pairs, memory, engine='array')
+            record.update(suite='tiled', variant='array', map=name)
+            records.append(record)
+
+            def work():
+                expanded = 0
+                total_cost = 0
+                stats = {}
+                with TiledMap(tiled_file) as tiled:
+                    for start, goal in pairs:
+                        result = a_star_search(start, goal, tiled, COST_MAP, stats=stats)
+                        expanded += stats['expanded']
+                        if result:
+                            total_cost += result.cost
+                return expanded, total_cost
+
+            (expanded, total_cost), seconds, peak = measure(work, memory)
+            records.append({
+                'suite': 'tiled', 'variant': 'tiled', 'map': name,
+                'queries': len(pairs), 'seconds': seconds, 'expanded': expanded,
+                'expansions_per_sec': expanded / seconds if seconds > 0 else float('inf'),
+                'paths_per_sec': len(pairs) / seconds if seconds > 0 else float('inf'),
+                'peak_bytes': peak, 'total_cost': total_cost
+            })
+    return records
+
+def default_workers() -> List[int]:
+    """1, 2, 4... até o número de núcleos da máquina"""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    if cpus > 1:
+        counts.append(cpus)
+    return counts
+
+def batch_benchmark(sizes: List[int], queries: int, seed: int, density: float,
+                    workers: List[int]) -> List[dict]:
+    """``batch_search`` com número crescente de processos (escalonamento).
+
+    ``speedup`` é relativo a ``workers=1``. O pico de memória dos processos
+    filhos não aparece no ``tracemalloc``, então não é medido aqui.
+    """
+    records = []
+    for size in sizes:
+        grid = FlatGrid(random_terrain(size, size, seed, density), COST_MAP)
+        pairs = random_queries(grid, queries, seed)
+        name = f"random {size}x{size} p={density:g}"
+        baseline = None
+        for count in workers:
+            stats = {}
+            results, seconds, _ = measure(
+                lambda: batch_search(pairs, grid, workers=count, serial_threshold=0, stats=stats), False)
+            if baseline is None:
+                baseline = seconds
+            records.append({
+                'suite': 'batch', 'variant': f"workers={stats['workers']}", 'map': name,
+                'queries': len(pairs), 'seconds': seconds, 'expanded': stats['expanded'],
+                'expansions_per_sec': stats['expanded'] / seconds if seconds > 0 else float('inf'),
+                'paths_per_sec': len(pairs) / seconds if seconds > 0 else float('inf'),
+                'peak_bytes': None, 'workers': stats['workers'],
+                'speedup': baseline / seconds if seconds > 0 else float('inf'),
+                'total_cost': sum(cost[path[-1]] for path, cost in results if path)
+            })
+    return records
+
+# =============================================
+# Relatório
+# =============================================
+
+def environment() -> dict:
+    """Identifica a versão do código e a máquina, para comparar execuções"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'format': RESULTS_FORMAT,
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+def print_records(records: List[dict]):
+    def number(value, spec):
+        return format(value, spec) if value is not None else '-'
+
+    print(f"{'suíte':<10} {'mapa':<26} {'variante':<14} {'n':>6} {'tempo (s)':>10} {'expandidos':>11} "
+          f"{'exp/s':>11} {'caminhos/s':>11} {'pico (MB)':>10}")
+    for r in records:
+        peak = r['peak_bytes'] / 2**20 if r['peak_bytes'] is not None else None
+        print(f"{r['suite']:<10} {r['map']:<26} {r['variant']:<14} {r['queries']:>6} {r['seconds']:>10.3f} "
+              f"{number(r['expanded'], 'd'):>11} {number(r['expansions_per_sec'], '.0f'):>11} "
+              f"{number(r['paths_per_sec'], '.2f'):>11} {number(peak, '.1f'):>10}")
+
+SUITES = ('search', 'queue', 'heuristic', 'field', 'bounded', 'ordering', 'loading', 'tiled', 'batch')
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das buscas, da ordenação das masmorras e da leitura de mapas")
+    parser.add_argument('--suite', choices=SUITES + ('all',), nargs='*', default=['all'])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[256, 1024],
+                        help="lados dos mapas aleatórios (até 4096)")
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--obstacles', type=float, nargs='*', default=[0.1],
+                        help="densidades de paredes dos mapas aleatórios")
+    parser.add_argument('--dungeons', type=int, nargs='*', default=[3, 8, 12],
+                        help="números de masmorras da suíte ordering")
+    parser.add_argument('--workers', type=int, nargs='*', default=default_workers(),
+                        help="números de processos da suíte batch")
+    parser.add_argument('--batch-queries', type=int, default=256, help="consultas da suíte batch")
+    parser.add_argument('--no-memory', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--json', help="arquivo de saída em JSON ('-' para a saída padrão)")
+    args = parser.parse_args()
+
+    suites = SUITES if 'all' in args.suite else args.suite
+    memory = not args.no_memory
+    records = []
+    if {'search', 'queue', 'heuristic', 'field'} & set(suites):
+        cases = benchmark_cases(args.sizes, args.queries, args.seed, args.obstacles)
+        if 'search' in suites:
+            records += search_benchmark(cases, memory)
+        if 'queue' in suites:
+            records += queue_benchmark(cases, memory)
+        if 'heuristic' in suites:
+            records += heuristic_benchmark(cases, memory)
+        if 'field' in suites:
+            records += field_benchmark(cases, memory)
+    if 'bounded' in suites:
+        records += bounded_benchmark(memory)
+    if 'ordering' in suites:
+        records += ordering_benchmark(args.sizes, args.dungeons, args.seed, args.obstacles[0], memory)
+    if 'loading' in suites:
+        records += loading_benchmark(args.sizes, args.seed, args.obstacles[0], memory)
+    if 'tiled' in suites:
+        records += tiled_benchmark(args.sizes, args.queries, args.seed, args.obstacles[0], memory)
+    if 'batch' in suites:
+        records += batch_benchmark(args.sizes, args.batch_queries, args.seed, args.obstacles[0], args.workers)
+
+    results = {'environment': environment(), 'arguments': vars(args), 'records': records}
+    if args.json == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print_records(records)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
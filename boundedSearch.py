@@ -0,0 +1,149 @@
+from typing import Dict
+
+from heuristicSearchComplete import COST_MAP, FlatGrid, Position
+from searchResult import SearchResult
+
+# =============================================
+# Busca com Memória Limitada (IDA* + tabela de transposição)
+# =============================================
+#
+# Busca em profundidade com limite de f = g + h que cresce a cada iteração
+# para o menor f que passou do limite anterior. A tabela de transposição
+# guarda o melhor g de cada célula já expandida e corta caminhos piores até
+# ela, o que evita repetir os mesmos trechos da grade em ordens diferentes.
+#
+# A memória é limitada em ``max_nodes`` nós: células da tabela mais as da
+# pilha da busca. Com a tabela cheia, as entradas de maior f (as menos
+# promissoras) são descartadas; se uma delas voltar a ser expandida, conta
+# como regenerada. O descarte só custa tempo: com a heurística admissível, o
+# caminho continua ótimo. Só quando o próprio caminho da pilha não cabe em
+# ``max_nodes`` algum ramo fica de fora, e a resposta deixa de ser garantida.
+#
+# ``evicted`` tem um byte por célula do FlatGrid, que já é do tamanho do mapa;
+# o que o limite controla é o crescimento da busca.
+
+DEFAULT_MAX_NODES = 100_000
+
+# Fração da tabela descartada de uma vez quando ela enche
+EVICT_FRACTION = 0.25
+
+def bounded_search(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    stats: dict = None,
+    heuristic_mode: str = 'scaled'
+) -> SearchResult:
+    """IDA* com tabela de transposição limitada a ``max_nodes`` nós.
+
+    ``stats`` recebe ``'expanded'``, ``'iterations'``, ``'pruned'`` (entradas
+    descartadas da tabela), ``'regenerated'`` (células expandidas de novo
+    depois de descartadas), ``'peak_nodes'`` e ``'optimal'`` (False se algum
+    ramo ficou de fora por falta de memória).
+    """
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    max_nodes = max(2, max_nodes)
+    counters = dict(expanded=0, iterations=0, pruned=0, regenerated=0, peak_nodes=0, optimal=True)
+    if stats is not None:
+        stats.update(counters)
+    if not grid.components().reachable(start, goal):
+        return SearchResult.not_found(grid.cols)
+
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+    source = grid.index(start)
+    target = grid.index(goal)
+    estimate = grid.heuristic_fn(target, heuristic_mode)
+
+    if source == target:
+        return SearchResult.from_path([tuple(start)], {tuple(start): 0}, grid.cols)
+
+    table = {}  # célula -> (melhor g, iteração em que foi expandida com ele)
+    evicted = bytearray(grid.size)
+
+    def children(cell: int, g: float) -> list:
+        """Vizinhos transitáveis como (f, célula, g), o de menor f no fim"""
+        result = []
+        for offset in offsets:
+            nxt = cell + offset
+            step = move_cost[nxt]
+            if step == inf:
+                continue
+            new_g = g + step
+            result.append((new_g + estimate(nxt), nxt, new_g))
+        result.sort(reverse=True)
+        return result
+
+    def evict(on_path: set) -> bool:
+        """Descarta as entradas de maior f fora da pilha; False se nada saiu"""
+        candidates = [cell for cell in table if cell not in on_path]
+        if not candidates:
+            return False
+        candidates.sort(key=lambda cell: table[cell][0] + estimate(cell), reverse=True)
+        for cell in candidates[:max(1, int(len(table) * EVICT_FRACTION))]:
+            del table[cell]
+            evicted[cell] = 1
+            counters['pruned'] += 1
+        return True
+
+    def finish(result: SearchResult) -> SearchResult:
+        if stats is not None:
+            stats.update(counters)
+        return result
+
+    threshold = estimate(source)
+    while threshold < inf:
+        counters['iterations'] += 1
+        iteration = counters['iterations']
+        next_threshold = inf
+        table[source] = (0, iteration)
+        stack = [(source, 0, children(source, 0))]
+        on_path = {source}
+
+        while stack:
+            cell, g, pending = stack[-1]
+            if not pending:
+                stack.pop()
+                on_path.discard(cell)
+                continue
+            f, nxt, new_g = pending.pop()
+            if f > threshold:
+                next_threshold = min(next_threshold, f)
+                continue
+            entry = table.get(nxt)
+            if entry is not None and (entry[0] < new_g or (entry[0] == new_g and entry[1] == iteration)):
+                continue  # Já alcançada por um caminho tão bom quanto este
+
+            if nxt == target:
+                # f = g no objetivo e o limite nunca passa do ótimo
+                cells = [frame[0] for frame in stack] + [nxt]
+                path = [grid.position(i) for i in cells]
+                costs = {}
+                total = 0
+                for k, index in enumerate(cells):
+                    if k > 0:
+                        total += move_cost[index]
+                    costs[path[k]] = total
+                return finish(SearchResult.from_path(path, costs, grid.cols))
+
+            # Um nó a mais na tabela e outro na pilha
+            while len(table) + len(stack) + 2 > max_nodes and evict(on_path):
+                pass
+            if len(table) + len(stack) + 2 > max_nodes:
+                counters['optimal'] = False  # O caminho da pilha ocupa toda a memória
+                continue
+            table[nxt] = (new_g, iteration)
+            if evicted[nxt]:
+                evicted[nxt] = 0
+                counters['regenerated'] += 1
+            counters['expanded'] += 1
+            stack.append((nxt, new_g, children(nxt, new_g)))
+            on_path.add(nxt)
+            counters['peak_nodes'] = max(counters['peak_nodes'], len(table) + len(stack))
+
+        threshold = next_threshold
+
+    return finish(SearchResult.not_found(grid.cols))
@@ -0,0 +1,293 @@
+import heapq
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from heuristicSearchComplete import COST_MAP, FlatGrid, Path, Position
+from mapLoader import SPECIAL_CELLS, MapInfo, load_map
+from pathCache import cost_table_hash, map_hash
+
+# =============================================
+# Grafo de Corredores
+# =============================================
+#
+# Nas masmorras quase toda célula transitável tem exatamente dois vizinhos
+# transitáveis. Essas cadeias viram uma única aresta com o custo somado entre
+# os nós do grafo: junções (3 ou 4 vizinhos), becos (0 ou 1) e células
+# especiais (entrada, pingente...). A busca roda sobre os nós e o caminho é
+# expandido de volta célula a célula no fim, no formato de ``a_star_search``.
+#
+# O grafo de um arquivo de mapa é gravado ao lado dele
+# (dungeonMap1.txt -> dungeonMap1.corridors.json), com o hash do mapa e da
+# tabela de custos, como as rotas de ``dungeonTable``.
+
+CORRIDOR_SUFFIX = '.corridors.json'
+
+# Aresta: (nó de origem, nó de destino, custo, células intermediárias)
+Edge = Tuple[int, int, float, List[int]]
+
+class CorridorGraph:
+    """Nós e arestas de corredor de um ``FlatGrid``"""
+
+    def __init__(self, grid: FlatGrid, nodes: List[int] = None, edges: List[Edge] = None):
+        self.grid = grid
+        if nodes is None or edges is None:
+            nodes, edges = self.build()
+        self.nodes = set(nodes)
+        self.edges = edges
+
+        self.adjacency: Dict[int, List[int]] = {node: [] for node in self.nodes}
+        # Célula de corredor -> (aresta, posição na cadeia); basta um sentido
+        self.chain_of: Dict[int, Tuple[int, int]] = {}
+        for k, (a, _, _, chain) in enumerate(edges):
+            self.adjacency[a].append(k)
+            for i, cell in enumerate(chain):
+                self.chain_of.setdefault(cell, (k, i))
+
+    def build(self) -> Tuple[List[int], List[Edge]]:
+        grid = self.grid
+        inf = float('inf')
+        move_cost = grid.move_cost
+        offsets = grid.offsets
+        free = [c != inf for c in move_cost]
+        terrain = grid.terrain
+        special = set()
+        for kind in SPECIAL_CELLS:
+            rows, cols = (terrain == kind).nonzero()
+            special.update(grid.index((r, c)) for r, c in zip(rows.tolist(), cols.tolist()))
+
+        nodes = [x for x in range(grid.size)
+                 if free[x] and (x in special or sum(free[x + o] for o in offsets) != 2)]
+        is_node = set(nodes)
+        covered = set()
+        edges = []
+
+        def walk(a: int):
+            for offset in offsets:
+                x = a + offset
+                if not free[x]:
+                    continue
+                prev = a
+                chain = []
+                cost = 0
+                while x not in is_node:
+                    chain.append(x)
+                    cost += move_cost[x]
+                    # Célula de corredor: segue pelo outro vizinho transitável
+                    prev, x = x, next(x + o for o in offsets if free[x + o] and x + o != prev)
+                covered.update(chain)
+                # Laços que voltam ao mesmo nó ficam: só assim suas células são achadas
+                edges.append((a, x, cost + move_cost[x], chain))
+
+        for a in nodes:
+            walk(a)
+        # Anéis fechados de corredor não tocam nenhum nó: uma célula de cada vira nó
+        for x in range(grid.size):
+            if free[x] and x not in is_node and x not in covered:
+                nodes.append(x)
+                is_node.add(x)
+                walk(x)
+        return nodes, edges
+
+    # ---------------------------------------------
+    # Consultas
+    # ---------------------------------------------
+
+    def entries(self, cell: int) -> List[Tuple[int, float, List[int]]]:
+        """Primeiras células transitáveis a partir de ``cell``: (célula, custo, células).
+
+        O início não paga custo, então uma célula intransitável (fora do
+        grafo) ainda sai pelas vizinhas transitáveis, como nos outros motores.
+        """
+        move_cost = self.grid.move_cost
+        if move_cost[cell] != float('inf'):
+            return [(cell, 0, [])]
+        return [(cell + offset, move_cost[cell + offset], [cell + offset])
+                for offset in self.grid.offsets if move_cost[cell + offset] != float('inf')]
+
+    def departures(self, cell: int) -> List[Tuple[int, float, List[int]]]:
+        """Saídas de ``cell`` até os nós: (nó, custo, células depois de ``cell``)"""
+        if cell in self.nodes:
+            return [(cell, 0, [])]
+        move_cost = self.grid.move_cost
+        k, i = self.chain_of[cell]
+        a, b, _, chain = self.edges[k]
+        forward = chain[i + 1:] + [b]
+        backward = chain[:i][::-1] + [a]
+        return [(node, sum(move_cost[x] for x in cells), cells)
+                for node, cells in ((b, forward), (a, backward))]
+
+    def arrivals(self, cell: int) -> Dict[int, Tuple[float, List[int]]]:
+        """Chegadas em ``cell`` a partir dos nós: nó -> (custo, células até ``cell``)"""
+        if cell in self.nodes:
+            return {cell: (0, [])}
+        if cell not in self.chain_of:
+            return {}  # Intransitável: não se chega nela
+        move_cost = self.grid.move_cost
+        k, i = self.chain_of[cell]
+        a, b, _, chain = self.edges[k]
+        result = {}
+        for node, cells in ((a, chain[:i + 1]), (b, chain[i:][::-1])):
+            cost = sum(move_cost[x] for x in cells)
+            if cost < result.get(node, (float('inf'),))[0]:
+                result[node] = (cost, cells)
+        return result
+
+    def direct(self, source: int, target: int) -> Optional[Tuple[float, List[int]]]:
+        """Trecho dentro de uma mesma cadeia, sem passar por nós"""
+        if source not in self.chain_of or target not in self.chain_of:
+            return None  # Nós ou células intransitáveis
+        (k, i), (l, j) = self.chain_of[source], self.chain_of[target]
+        if k != l:
+            return None
+        chain = self.edges[k][3]
+        cells = chain[i + 1:j + 1] if j > i else chain[j:i][::-1]
+        return sum(self.grid.move_cost[x] for x in cells), cells
+
+    def search(self, start: Position, goal: Position, stats: dict = None) -> Tuple[Path, Dict[Position, float]]:
+        """A* sobre os nós; retorna ``(caminho, custos acumulados)`` célula a célula"""
+        grid = self.grid
+        inf = float('inf')
+        source = grid.index(start)
+        target = grid.index(goal)
+        if stats is not None:
+            stats.update(expanded=0, nodes=len(self.nodes), edges=len(self.edges))
+        if not grid.components().reachable(start, goal):
+            return [], inf
+        if source == target:
+            return [tuple(start)], {tuple(start): 0}
+
+        best, best_cells = inf, None
+
+        estimate = grid.heuristic_fn(target)
+        endings = self.arrivals(target)
+        g_score = {}
+        via = {}  # nó -> (nó anterior, aresta) ou (None, células desde o início)
+        frontier = []
+        for first, lead, prefix in self.entries(source):
+            # Trechos que chegam ao objetivo sem passar por nós
+            if first == target:
+                same_chain = (0, [])
+            else:
+                same_chain = self.direct(first, target)
+            if same_chain is not None and lead + same_chain[0] < best:
+                best, best_cells = lead + same_chain[0], prefix + same_chain[1]
+
+            for node, cost, cells in self.departures(first):
+                cost += lead
+                if cost < g_score.get(node, inf):
+                    g_score[node] = cost
+                    via[node] = (None, prefix + cells)
+                    heapq.heappush(frontier, (cost + estimate(node), cost, node))
+
+        expanded = 0
+        closed = set()
+        best_end = None
+        while frontier:
+            priority, cost, node = heapq.heappop(frontier)
+            if priority >= best:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+            expanded += 1
+
+            ending = endings.get(node)
+            if ending is not None and cost + ending[0] < best:
+                best = cost + ending[0]
+                best_end = node
+
+            for k in self.adjacency[node]:
+                _, nxt, step, _ = self.edges[k]
+                new_cost = cost + step
+                if new_cost < g_score.get(nxt, inf):
+                    g_score[nxt] = new_cost
+                    via[nxt] = (node, k)
+                    heapq.heappush(frontier, (new_cost + estimate(nxt), new_cost, nxt))
+
+        if stats is not None:
+            stats['expanded'] = expanded
+        if best == inf:
+            return [], inf
+
+        # Expande nós e arestas de volta para a sequência de células
+        if best_end is None:
+            cells = [source] + best_cells
+        else:
+            pieces = [endings[best_end][1]]
+            node = best_end
+            while True:
+                previous, step = via[node]
+                if previous is None:
+                    pieces.append(step)
+                    break
+                _, _, _, chain = self.edges[step]
+                pieces.append(chain + [node])
+                node = previous
+            cells = [source]
+            for piece in reversed(pieces):
+                cells.extend(piece)
+
+        path = [grid.position(i) for i in cells]
+        costs = {}
+        total = 0
+        for k, index in enumerate(cells):
+            if k > 0:
+                total += grid.move_cost[index]
+            costs[path[k]] = total
+        return path, costs
+
+def corridor_search(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    stats: dict = None
+) -> Tuple[Path, Dict[Position, float]]:
+    """Busca pelo grafo de corredores; o grafo fica guardado no ``FlatGrid``"""
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    if grid.corridor_cache is None:
+        grid.corridor_cache = CorridorGraph(grid)
+    return grid.corridor_cache.search(start, goal, stats)
+
+def corridor_filename(map_filename: str) -> str:
+    return os.path.splitext(map_filename)[0] + CORRIDOR_SUFFIX
+
+def corridor_graph(
+    map_filename: str,
+    cost_map: Dict[int, int] = COST_MAP,
+    info: Optional[MapInfo] = None
+) -> CorridorGraph:
+    """Grafo de corredores do mapa, lido do arquivo ao lado dele ou construído e gravado"""
+    if info is None:
+        info = load_map(map_filename)
+    grid = FlatGrid(info.terrain, cost_map)
+    keys = {'map': map_hash(grid), 'costs': cost_table_hash(cost_map)}
+    filename = corridor_filename(map_filename)
+
+    try:
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        if data.get('keys') == keys:
+            edges = [(a, b, cost, chain) for a, b, cost, chain in data['edges']]
+            graph = CorridorGraph(grid, data['nodes'], edges)
+            grid.corridor_cache = graph
+            return graph
+    except (OSError, ValueError, KeyError):
+        pass  # Sem grafo válido: reconstrói
+
+    graph = CorridorGraph(grid)
+    grid.corridor_cache = graph
+    data = {
+        'keys': keys,
+        'nodes': sorted(graph.nodes),
+        'edges': [[a, b, cost, chain] for a, b, cost, chain in graph.edges]
+    }
+    try:
+        tmp = filename + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, filename)
+    except OSError as e:
+        print(f"Não foi possível gravar o grafo de corredores em {filename}: {e}")
+    return graph
@@ -0,0 +1,234 @@
+import heapq
+import os
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from heuristicSearchComplete import COST_MAP, DOWN, LEFT, RIGHT, UP, FlatGrid, Path, Position
+from mapLoader import MapInfo, load_map
+from pathCache import cost_table_hash, map_hash
+
+# =============================================
+# Campos de Distância (mapa inteiro)
+# =============================================
+#
+# Custo de uma origem até todas as células, sem laço Python por célula. É o
+# Dijkstra em baldes de largura igual ao menor custo positivo do mapa: todas
+# as células de um balde têm custo final quando ele é alcançado (um passo
+# positivo sempre leva a um balde seguinte), então o balde inteiro é
+# expandido de uma vez, com operações vetoriais sobre os índices da grade
+# achatada. Só as células de custo 0 (especiais) fazem um balde precisar de
+# mais de uma onda. O laço Python é por onda, não por célula.
+#
+# ``parent`` guarda, para cada célula, a direção (UP, DOWN, LEFT, RIGHT) da
+# vizinha um passo mais perto da origem, ou -1. Os campos podem ser gravados
+# ao lado do mapa (dungeonMap1.txt -> dungeonMap1.field-3-5.npz), com o hash
+# do mapa e da tabela de custos, e reaproveitados entre execuções.
+
+FIELD_EXTENSION = '.npz'
+
+# Versão dos campos gravados; arquivos de outra versão são recalculados
+FIELD_FORMAT = 2
+
+# (linha, coluna) de cada direção
+DIRECTION_STEPS = {UP: (-1, 0), DOWN: (1, 0), LEFT: (0, -1), RIGHT: (0, 1)}
+
+class DistanceField(NamedTuple):
+    """Custos de/até ``source`` em todo o mapa e a direção do passo para a origem"""
+    source: Position
+    reverse: bool  # True: custo de cada célula até ``source``
+    cost: np.ndarray  # float64, inf onde não há caminho
+    parent: np.ndarray  # int8, direção da vizinha mais perto da origem ou -1
+
+    def reachable(self, pos: Position) -> bool:
+        return bool(np.isfinite(self.cost[pos]))
+
+    def path(self, pos: Position) -> Tuple[Path, Dict[Position, float]]:
+        """Caminho entre ``source`` e ``pos`` no formato de ``a_star_search``.
+
+        Sem ``reverse`` o caminho sai da origem; com ``reverse`` sai de ``pos``
+        e termina na origem. Retorna ``([], inf)`` sem caminho.
+        """
+        pos = tuple(pos)
+        if not self.reachable(pos):
+            return [], float('inf')
+        cells = [pos]
+        while cells[-1] != self.source:
+            r, c = cells[-1]
+            dr, dc = DIRECTION_STEPS[int(self.parent[r, c])]
+            cells.append((r + dr, c + dc))
+
+        if self.reverse:
+            total = self.cost[pos].item()
+            return cells, {cell: total - self.cost[cell].item() for cell in cells}
+        cells.reverse()
+        return cells, {cell: self.cost[cell].item() for cell in cells}
+
+    def save(self, filename: str, keys: Optional[Dict[str, str]] = None):
+        """Grava o campo em .npz (escrita atômica); ``keys`` identifica mapa e custos"""
+        keys = keys or {}
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, cost=self.cost, parent=self.parent, source=np.array(self.source),
+                     reverse=np.array(self.reverse), map=np.array(keys.get('map', '')),
+                     costs=np.array(keys.get('costs', '')), format=np.array(keys.get('format', '')))
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename: str) -> Tuple['DistanceField', Dict[str, str]]:
+        """Lê um campo gravado por ``save``; retorna ``(campo, chaves)``"""
+        with np.load(filename) as data:
+            field = cls(tuple(int(v) for v in data['source']), bool(data['reverse']),
+                        data['cost'], data['parent'])
+            keys = {'map': str(data['map']), 'costs': str(data['costs']),
+                    'format': str(data['format']) if 'format' in data.files else ''}
+        return field, keys
+
+def propagate(costs: np.ndarray, offsets, origin: int, reverse: bool, stats: dict = None) -> np.ndarray:
+    """Custos a partir de ``origin`` (ou até ela) sobre os custos achatados com borda.
+
+    O custo é cobrado na célula de entrada; com ``reverse`` o passo de uma
+    célula para a vizinha custa a própria célula, como em ``dijkstra_scan``.
+    Com ``reverse`` as células intransitáveis também recebem custo: a busca
+    não cobra o início, então delas se sai para a melhor vizinha.
+    """
+    passable = np.isfinite(costs)
+    positive = costs[passable & (costs > 0)]
+    width = positive.min() if positive.size else 1.0
+    offsets = np.asarray(offsets)
+
+    dist = np.full(costs.size, np.inf)
+    dist[origin] = 0
+    buckets = {0: [np.array([origin])]}
+    order = [0]
+    waves = 0
+    while order:
+        k = heapq.heappop(order)
+        frontier = np.unique(np.concatenate(buckets.pop(k)))
+        # Entradas antigas: a célula melhorou para um balde anterior
+        frontier = frontier[dist[frontier] // width == k]
+        while frontier.size:
+            waves += 1
+            neighbors = (frontier[:, None] + offsets).ravel()
+            if reverse:
+                new = np.repeat(dist[frontier] + costs[frontier], len(offsets))
+            else:
+                new = np.repeat(dist[frontier], len(offsets)) + costs[neighbors]
+            better = passable[neighbors] & (new < dist[neighbors])
+            neighbors = neighbors[better]
+            np.minimum.at(dist, neighbors, new[better])
+            neighbors = np.unique(neighbors)
+
+            ids = (dist[neighbors] // width).astype(np.int64)
+            later = ids != k
+            if later.any():
+                sorting = np.argsort(ids[later], kind='stable')
+                cells, keys = neighbors[later][sorting], ids[later][sorting]
+                cuts = np.flatnonzero(np.diff(keys)) + 1
+                for group, key in zip(np.split(cells, cuts), keys[np.r_[0, cuts]].tolist()):
+                    if key not in buckets:
+                        buckets[key] = []
+                        heapq.heappush(order, key)
+                    buckets[key].append(group)
+            # Passos de custo 0 continuam no mesmo balde
+            frontier = neighbors[~later]
+
+    if reverse:
+        # Paredes (fora da borda) saem de graça para a vizinha de menor custo até a origem
+        width = int(offsets.max())
+        walls = np.flatnonzero(~passable[width:-width]) + width
+        walls = walls[walls != origin]
+        around = (walls[:, None] + offsets).ravel()
+        dist[walls] = (dist[around] + costs[around]).reshape(len(walls), len(offsets)).min(axis=1)
+
+    if stats is not None:
+        stats['waves'] = waves
+    return dist
+
+def field_parents(dist: np.ndarray, costs: np.ndarray, source: Tuple[int, int], reverse: bool) -> np.ndarray:
+    """Direção da vizinha um passo mais perto da origem (grade com borda)"""
+    inner = (slice(1, -1), slice(1, -1))
+    target = dist[inner]
+    parent = np.full(target.shape, -1, dtype=np.int8)
+    todo = np.isfinite(target)
+    todo[source[0] - 1, source[1] - 1] = False
+
+    candidates = []
+    for direction, (dr, dc) in DIRECTION_STEPS.items():
+        window = (slice(1 + dr, dist.shape[0] - 1 + dr), slice(1 + dc, dist.shape[1] - 1 + dc))
+        step = costs[window] if reverse else costs[inner]
+        candidates.append((direction, window, step, dist[window] + step == target))
+
+    # Passos com custo positivo nunca formam ciclos
+    for direction, _, step, match in candidates:
+        chosen = todo & match & (step > 0)
+        parent[chosen] = direction
+        todo &= ~chosen
+
+    # Células de custo 0 (especiais): só apontam para vizinhas já resolvidas
+    while todo.any():
+        done = np.pad(parent >= 0, 1)
+        done[source] = True
+        progress = False
+        for direction, window, _, match in candidates:
+            chosen = todo & match & done[window]
+            if chosen.any():
+                parent[chosen] = direction
+                todo &= ~chosen
+                progress = True
+        if not progress:
+            break
+    return parent
+
+def distance_field(
+    source: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    reverse: bool = False,
+    stats: dict = None
+) -> DistanceField:
+    """Campo de distância de ``source`` a todas as células (ou até ela, com ``reverse``).
+
+    Mesmos custos de ``dijkstra_scan``; com ``reverse`` as células
+    intransitáveis têm o custo que ``a_star_search`` cobra partindo delas (o
+    início não paga), e não ``inf``. ``stats`` recebe ``'waves'``, o número
+    de ondas expandidas.
+    """
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    shape = (grid.rows + 2, grid.width)
+    origin = (source[0] + 1, source[1] + 1)
+    dist = propagate(grid.costs, grid.offsets, grid.index(source), reverse, stats).reshape(shape)
+    parent = field_parents(dist, grid.costs.reshape(shape), origin, reverse)
+    return DistanceField(tuple(source), reverse, dist[1:-1, 1:-1].copy(), parent)
+
+def field_filename(map_filename: str, source: Position, reverse: bool = False) -> str:
+    suffix = '-to' if reverse else ''
+    return f"{os.path.splitext(map_filename)[0]}.field-{source[0]}-{source[1]}{suffix}{FIELD_EXTENSION}"
+
+def stored_distance_field(
+    map_filename: str,
+    source: Position,
+    cost_map: Dict[int, int] = COST_MAP,
+    reverse: bool = False,
+    info: Optional[MapInfo] = None
+) -> DistanceField:
+    """Campo do mapa, lido do arquivo ao lado dele ou calculado e gravado"""
+    if info is None:
+        info = load_map(map_filename)
+    grid = FlatGrid(info.terrain, cost_map)
+    keys = {'map': map_hash(grid), 'costs': cost_table_hash(cost_map), 'format': str(FIELD_FORMAT)}
+    filename = field_filename(map_filename, source, reverse)
+
+    try:
+        field, stored = DistanceField.load(filename)
+        if stored == keys and field.cost.shape == info.terrain.shape:
+            return field
+    except (OSError, ValueError, KeyError):
+        pass  # Sem campo válido: recalcula
+
+    field = distance_field(source, grid, cost_map, reverse)
+    try:
+        field.save(filename, keys)
+    except OSError as e:
+        print(f"Não foi possível gravar o campo de distância em {filename}: {e}")
+    return field
@@ -0,0 +1,135 @@
+import json
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from mapLoader import MapInfo, load_map
+from pathCache import cost_table_hash, map_hash
+
+Position = Tuple[int, int]
+Path = List[Position]
+
+# =============================================
+# Tabela de Ida e Volta das Masmorras
+# =============================================
+#
+# O trajeto dentro de uma masmorra (entrada -> pingente -> entrada) não
+# depende da ordem de visita, então é calculado uma vez e gravado ao lado do
+# mapa (dungeonMap1.txt -> dungeonMap1.route.json). O arquivo guarda o hash
+# do mapa e da tabela de custos: se um dos dois mudar, a rota é recalculada.
+#
+# Como o custo é cobrado na célula de entrada, o caminho de volta custa o de
+# ida menos o custo do pingente mais o custo da entrada, para qualquer
+# caminho. Logo o inverso do melhor caminho de ida é o melhor de volta e
+# basta uma busca por masmorra. A função de busca é recebida por parâmetro
+# (como em PathCache), normalmente ``a_star_search``.
+
+ROUTE_SUFFIX = '.route.json'
+
+class DungeonRoute(NamedTuple):
+    """Ida e volta dentro de uma masmorra, vista pelo planejador como um nó de custo ``cost``"""
+    entrance: Position
+    pendant: Position
+    path_in: Path
+    cost_in: float
+    cost_out: float
+
+    @property
+    def path_out(self) -> Path:
+        return self.path_in[::-1]
+
+    @property
+    def cost(self) -> float:
+        return self.cost_in + self.cost_out
+
+    def leg_costs(self, terrain_map, cost_map: Dict[int, float]) -> Tuple[Dict[Position, float], Dict[Position, float]]:
+        """Custos acumulados de ida e de volta por célula, no formato de ``a_star_search``"""
+        return (cumulative_costs(self.path_in, terrain_map, cost_map),
+                cumulative_costs(self.path_out, terrain_map, cost_map))
+
+def cumulative_costs(path: Path, terrain_map, cost_map: Dict[int, float]) -> Dict[Position, float]:
+    costs = {}
+    total = 0
+    for k, (r, c) in enumerate(path):
+        if k > 0:
+            total += cost_map.get(int(terrain_map[r][c]), float('inf'))
+        costs[(r, c)] = total
+    return costs
+
+def round_trip(
+    search: Callable,
+    terrain_map,
+    entrance: Position,
+    pendant: Position,
+    cost_map: Dict[int, float]
+) -> DungeonRoute:
+    """Calcula a ida e volta com uma única busca (a volta é a ida invertida)"""
+    path, cost = search(entrance, pendant, terrain_map, cost_map)
+    if not path:
+        return DungeonRoute(entrance, pendant, [], float('inf'), float('inf'))
+
+    cost_in = cost[pendant]
+    entrance_cost = cost_map.get(int(terrain_map[entrance[0]][entrance[1]]), float('inf'))
+    pendant_cost = cost_map.get(int(terrain_map[pendant[0]][pendant[1]]), float('inf'))
+    if entrance == pendant:
+        cost_out = 0
+    elif entrance_cost == float('inf'):
+        cost_out = float('inf')  # Não dá para voltar para uma célula intransitável
+    else:
+        cost_out = cost_in - pendant_cost + entrance_cost
+    return DungeonRoute(entrance, pendant, path, cost_in, cost_out)
+
+def route_filename(map_filename: str) -> str:
+    return os.path.splitext(map_filename)[0] + ROUTE_SUFFIX
+
+def dungeon_route(
+    map_filename: str,
+    search: Callable,
+    cost_map: Dict[int, float],
+    info: Optional[MapInfo] = None
+) -> DungeonRoute:
+    """Rota da masmorra, lida do arquivo ao lado do mapa ou calculada e gravada nele"""
+    if info is None:
+        info = load_map(map_filename)
+    terrain_map = info.terrain
+    keys = {'map': map_hash(terrain_map), 'costs': cost_table_hash(cost_map)}
+    filename = route_filename(map_filename)
+
+    try:
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        if data.get('keys') == keys:
+            return DungeonRoute(tuple(data['entrance']), tuple(data['pendant']),
+                                [tuple(pos) for pos in data['path_in']],
+                                data['cost_in'], data['cost_out'])
+    except (OSError, ValueError, KeyError):
+        pass  # Sem tabela válida: recalcula
+
+    route = round_trip(search, terrain_map, info.link, info.pendant, cost_map)
+    data = {
+        'keys': keys,
+        'entrance': list(route.entrance),
+        'pendant': list(route.pendant),
+        'path_in': [list(pos) for pos in route.path_in],
+        'cost_in': route.cost_in,
+        'cost_out': route.cost_out
+    }
+    try:
+        tmp = filename + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, filename)
+    except OSError as e:
+        print(f"Não foi possível gravar a tabela da masmorra em {filename}: {e}")
+    return route
+
+def dungeon_table(
+    map_filenames: List[str],
+    search: Callable,
+    cost_map: Dict[int, float]
+) -> Dict[str, DungeonRoute]:
+    """Rotas de várias masmorras, indexadas pelo arquivo do mapa"""
+    return {name: dungeon_route(name, search, cost_map) for name in map_filenames}
+
+def node_costs(routes: List[DungeonRoute]) -> List[float]:
+    """Vetor ``node_cost`` de ``routePlanner.solve_order`` (início e destino custam 0)"""
+    return [0] + [route.cost for route in routes] + [0]
@@ -1,7 +1,11 @@
 import heapq
 import math
+import time
 from typing import List, Tuple, Dict, Set
-from itertools import permutations
+
+from anytimeSearch import anytime_search
+from heuristicSearchComplete import FlatGrid
+from routePlanner import HELD_KARP_LIMIT, empty_matrix, solve_order
 
 # =============================================
 # Definições de Tipos e Constantes 
@@ -27,6 +31,9 @@ COST_MAP = {
     AGUA: 180
 }
 
+# Nas masmorras só o chão (0) é transitável, com custo fixo (como dungeon=True)
+DUNGEON_COST_MAP = {0: 10}
+
 # Posições importantes no mapa (verificar coordenadas reais)
 LINK_START = (25, 28)
 LOST_WOODS = (7, 6)
@@ -40,9 +47,9 @@ DUNGEONS = {
 # Implementação do Algoritmo A* 
 # =============================================
 
-def heuristic(a: Position, b: Position) -> float:
-    """Função heurística (distância de Manhattan)"""
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+def heuristic(a: Position, b: Position, scale: float = 1) -> float:
+    """Função heurística (distância de Manhattan vezes o menor custo de passo)"""
+    return scale * (abs(a[0] - b[0]) + abs(a[1] - b[1]))
 
 def a_star_search(
     start: Position,
@@ -60,6 +67,10 @@ def a_star_search(
         terrain_type = terrain_map[pos[0]][pos[1]]
         return cost_map.get(terrain_type, float('inf'))  # Retorna infinito para terrenos inválidos
     
+    # Nenhum passo custa menos que o menor custo da tabela: a heurística
+    # escalada continua admissível e expande muito menos células
+    scale = 10 if dungeon else min(cost_map.values())
+    
     frontier = []
     heapq.heappush(frontier, (0, start))
     came_from = {start: None}
@@ -92,7 +103,7 @@ def a_star_search(
             
             if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
                 cost_so_far[next_pos] = new_cost
-                priority = new_cost + heuristic(next_pos, goal)
+                priority = new_cost + heuristic(next_pos, goal, scale)
                 heapq.heappush(frontier, (priority, next_pos))
                 came_from[next_pos] = current
                 
@@ -110,6 +121,71 @@ def a_star_search(
     
     return path, cost_so_far.get(goal, float('inf'))
 
+def multi_target_search(
+    start: Position,
+    goals: List[Position],
+    terrain_map: TerrainMap,
+    cost_map: Dict[int, int],
+    dungeon: bool = False
+) -> Dict[Position, Tuple[Path, int]]:
+    """Dijkstra de uma origem para vários destinos em uma única varredura.
+
+    Para assim que todos os destinos forem fechados. Destinos inalcançáveis
+    recebem ``([], inf)``, como em ``a_star_search``.
+    """
+    
+    def get_move_cost(pos: Position) -> int:
+        if dungeon:
+            return 10  # Custo fixo em masmorras
+        terrain_type = terrain_map[pos[0]][pos[1]]
+        return cost_map.get(terrain_type, float('inf'))
+    
+    pending = set(goals)
+    frontier = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    closed = set()
+    
+    while frontier and pending:
+        current_cost, current = heapq.heappop(frontier)
+        if current in closed:
+            continue  # Entrada antiga no heap
+        closed.add(current)
+        pending.discard(current)
+        
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            next_pos = (current[0] + dx, current[1] + dy)
+            
+            if (next_pos[0] < 0 or next_pos[0] >= len(terrain_map) or
+                next_pos[1] < 0 or next_pos[1] >= len(terrain_map[0])):
+                continue
+            if dungeon and terrain_map[next_pos[0]][next_pos[1]] != 0:
+                continue
+                
+            move_cost = get_move_cost(next_pos)
+            if move_cost == float('inf'):
+                continue
+                
+            new_cost = current_cost + move_cost
+            if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
+                cost_so_far[next_pos] = new_cost
+                heapq.heappush(frontier, (new_cost, next_pos))
+                came_from[next_pos] = current
+    
+    results = {}
+    for goal in goals:
+        if goal not in closed:
+            results[goal] = ([], float('inf'))
+            continue
+        path = []
+        current = goal
+        while current is not None:
+            path.append(current)
+            current = came_from[current]
+        path.reverse()
+        results[goal] = (path, cost_so_far[goal])
+    return results
+
 # =============================================
 # Estratégia para Coletar Pingentes 
 # =============================================
@@ -121,13 +197,20 @@ def collect_pendants(
     dungeon_maps: Dict[int, TerrainMap],
     hyrule_map: TerrainMap,
     cost_map: Dict[int, int],
-    lost_woods: Position
+    lost_woods: Position,
+    exact_limit: int = HELD_KARP_LIMIT,
+    time_limit: float = None,
+    stats: dict = None
 ) -> Tuple[Path, int]:
-    """Versão corrigida da função de coleta de pingentes"""
-    
-    best_order = None
-    best_cost = float('inf')
-    best_path = []
+    """Coleta dos pingentes com a ordem escolhida sobre a matriz de custos.
+
+    Cada perna é buscada uma única vez e a ordem é resolvida por Held-Karp
+    (ou vizinho mais próximo + 2-opt acima de ``exact_limit`` masmorras).
+
+    Com ``time_limit`` (segundos) as pernas usam ``anytime_search`` e dividem
+    o prazo entre si; a rota pode sair subótima, no máximo pelo fator
+    impresso no fim (também em ``stats['bound']``).
+    """
     
     # Posições de entrada das masmorras (ajustar conforme necessário)
     dungeon_entrances = {
@@ -136,65 +219,90 @@ def collect_pendants(
         3: (14, 14)
     }
     
-    for order in permutations(dungeons.keys()):
-        temp_path = []
-        temp_cost = 0
-        temp_pos = start
-        valid_path = True
-        
-        for dungeon_id in order:
-            # 1. Ir do ponto atual até a masmorra
-            path, cost = a_star_search(temp_pos, dungeons[dungeon_id], hyrule_map, cost_map)
-            if not path:
-                valid_path = False
-                break
-            temp_path.extend(path)
-            temp_cost += cost
-            temp_pos = dungeons[dungeon_id]
-            
-            # 2. Entrar na masmorra e pegar o pingente
-            entrance = dungeon_entrances[dungeon_id]
-            pendant_pos = pendant_positions[dungeon_id]
-            
-            # Caminho da entrada até o pingente
-            path, cost = a_star_search(entrance, pendant_pos, dungeon_maps[dungeon_id], cost_map, True)
-            if not path:
-                valid_path = False
-                break
-            temp_path.extend(path)
-            temp_cost += cost
-            temp_pos = pendant_pos
-            
-            # 3. Voltar para a entrada da masmorra
-            path, cost = a_star_search(temp_pos, entrance, dungeon_maps[dungeon_id], cost_map, True)
-            if not path:
-                valid_path = False
-                break
-            temp_path.extend(path)
-            temp_cost += cost
-            temp_pos = entrance
-        
-        if not valid_path:
-            continue  # Pular ordens inválidas
-        
-        # 4. Ir para Lost Woods após coletar todos os pingentes
-        path, cost = a_star_search(temp_pos, lost_woods, hyrule_map, cost_map)
-        if not path:
+    # Nós da matriz: 0 = início, 1..n = masmorras, n + 1 = Lost Woods
+    dungeon_ids = list(dungeons.keys())
+    n = len(dungeon_ids)
+    end = n + 1
+    
+    # Cada masmorra é percorrida uma única vez (entrada -> pingente -> entrada).
+    # O custo dentro da masmorra é fixo por passo, então a volta é a ida
+    # invertida, com o mesmo custo: uma busca por masmorra
+    # Ponto de onde parte a perna seguinte no mapa principal. Mantém o
+    # comportamento anterior: Link segue da posição de entrada da masmorra.
+    departures = [start] + [dungeon_entrances[dungeon_id] for dungeon_id in dungeon_ids]
+    arrivals = [None] + [dungeons[dungeon_id] for dungeon_id in dungeon_ids] + [lost_woods]
+
+    # Prazo global: cada busca recebe uma fatia igual do tempo que sobrou
+    bound = 1.0
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+        remaining = n + len(set(departures)) * (n + 1)
+        hyrule_grid = FlatGrid(hyrule_map, cost_map)
+
+    def timed_search(source: Position, target: Position, grid: FlatGrid) -> Tuple[Path, float]:
+        nonlocal remaining, bound
+        now = time.perf_counter()
+        share = now + max(0.0, deadline - now) / max(1, remaining)
+        remaining -= 1
+        leg_stats = {}
+        result = anytime_search(source, target, grid, deadline=share, stats=leg_stats)
+        if result:
+            bound = max(bound, leg_stats['bound'])
+        return result.path, result.cost
+
+    node_cost = [0] * (n + 2)
+    dungeon_paths = {}
+    for k, dungeon_id in enumerate(dungeon_ids, start=1):
+        entrance = dungeon_entrances[dungeon_id]
+        pendant_pos = pendant_positions[dungeon_id]
+        if time_limit is None:
+            in_path, in_cost = a_star_search(entrance, pendant_pos, dungeon_maps[dungeon_id], cost_map, True)
+        else:
+            in_path, in_cost = timed_search(entrance, pendant_pos, FlatGrid(dungeon_maps[dungeon_id], DUNGEON_COST_MAP))
+        node_cost[k] = 2 * in_cost if in_path else float('inf')
+        dungeon_paths[k] = in_path + in_path[::-1]
+    
+    # Uma varredura por ponto de partida distinto cobre todas as suas pernas
+    leg_cost = empty_matrix(n)
+    leg_paths = {}
+    sweeps = {}
+    for a in range(n + 1):
+        if a > 0 and node_cost[a] == float('inf'):
             continue
-            
-        temp_cost += cost
-        temp_path.extend(path)
-        
-        if temp_cost < best_cost:
-            best_cost = temp_cost
-            best_order = order
-            best_path = temp_path
+        targets = [b for b in range(1, n + 2) if a != b and not (a == 0 and b == end and n > 0)]
+        if departures[a] not in sweeps:
+            if time_limit is None:
+                sweeps[departures[a]] = multi_target_search(
+                    departures[a], arrivals[1:], hyrule_map, cost_map)
+            else:
+                sweeps[departures[a]] = {arrival: timed_search(departures[a], arrival, hyrule_grid)
+                                         for arrival in arrivals[1:]}
+        for b in targets:
+            path, cost = sweeps[departures[a]][arrivals[b]]
+            if path:
+                leg_cost[a][b] = cost
+                leg_paths[(a, b)] = path
     
-    if best_order is None:
+    order, best_cost = solve_order(leg_cost, node_cost, exact_limit)
+    
+    if order is None:
         print("Erro: Não foi possível encontrar um caminho válido para nenhuma ordem de masmorras!")
         return [], float('inf')
     
+    best_path = []
+    previous = 0
+    for k in order:
+        best_path.extend(leg_paths[(previous, k)])
+        best_path.extend(dungeon_paths[k])
+        previous = k
+    best_path.extend(leg_paths[(previous, end)])
+    
+    best_order = tuple(dungeon_ids[k - 1] for k in order)
     print(f"Melhor ordem para visitar masmorras: {best_order}")
+    if time_limit is not None:
+        print(f"Custo no máximo {bound:.3f} vezes o ótimo (prazo de {time_limit:g} s)")
+    if stats is not None:
+        stats['bound'] = bound
     return best_path, best_cost
 
 # =============================================
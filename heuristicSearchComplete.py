@@ -1,13 +1,25 @@
+import argparse
 import heapq
+import sys
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
 from typing import List, Tuple, Dict, Set
 from itertools import permutations
-import matplotlib.pyplot as plt
 import numpy as np
 
+from dungeonTable import dungeon_route
+from mapLoader import TiledMap, load_map
+from pathCache import PathCache
+from searchResult import SearchResult, map_columns
+
 Position = Tuple[int, int]
 Path = List[Position]
 TerrainMap = List[List[int]]
 
+# Arquivo do cache persistente de caminhos usado por main()
+PATH_CACHE_FILE = '.pathCache.json'
+
 # Tamanho do mapa
 MAIN_MAP_SIZE = (42, 42)
 DUNGEON_MAP_SIZE = (28, 28)
@@ -46,18 +58,142 @@ COST_MAP = {
     SWORD: 0
 }
 
+# Número padrão de marcos (landmarks) da heurística ALT
+DEFAULT_LANDMARKS = 4
+
 # Funcao heuristica (distância de Manhattan)
-def heuristic(a: Position, b: Position) -> float:
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+# scale é o menor custo positivo do mapa e slack o número de células de custo 0:
+# no máximo slack células do caminho saem de graça, então continua admissível.
+def heuristic(a: Position, b: Position, scale: float = 1, slack: int = 0) -> float:
+    distance = abs(a[0] - b[0]) + abs(a[1] - b[1]) - slack
+    return scale * distance if distance > 0 else 0
+
+def terrain_counts(terrain_map) -> Counter:
+    """Número de células de cada tipo de terreno (listas aninhadas ou array numpy)"""
+    if isinstance(terrain_map, np.ndarray):
+        values, counts = np.unique(terrain_map, return_counts=True)
+        return Counter(dict(zip(values.tolist(), counts.tolist())))
+    counts = Counter()
+    for row in terrain_map:
+        counts.update(row)
+    return counts
+
+def heuristic_scale(terrain_map: TerrainMap, cost_map: Dict[int, int]) -> Tuple[float, int]:
+    """Retorna (menor custo positivo, número de células de custo 0) do mapa"""
+    counts = terrain_counts(terrain_map)
+    positive = [cost_map.get(t, float('inf')) for t in counts]
+    positive = [c for c in positive if 0 < c < float('inf')]
+    slack = sum(n for t, n in counts.items() if cost_map.get(t, float('inf')) == 0)
+    return (min(positive) if positive else 0), slack
 
 def a_star_search(
     start: Position,
     goal: Position,
     terrain_map: TerrainMap,
     cost_map: Dict[int, int],
-    dungeon: bool = False  
-) -> Tuple[Path, dict[Position, int]]:
-    
+    dungeon: bool = False,
+    engine: str = 'dict',
+    queue: str = 'heap',
+    stats: dict = None,
+    heuristic_mode: str = 'scaled',
+    components: 'Components' = None,
+    trace: 'SearchTrace' = None
+) -> SearchResult:
+    """Busca A* com o motor escolhido em ``engine``.
+
+    Retorna um ``SearchResult`` com só o caminho e seus custos acumulados;
+    ``caminho, custos = a_star_search(...)`` continua funcionando, com
+    ``custos`` cobrindo as células do caminho. Com o motor padrão, mapas de
+    custo uniforme (as masmorras) usam ``jump_point_search`` automaticamente;
+    ``engine='jps'`` força essa escolha e ``engine='corridor'`` busca no
+    grafo de corredores (``corridorGraph.py``). ``engine='bounded'`` é o
+    IDA* com memória limitada de ``boundedSearch.py``. Um ``TiledMap`` (mapa
+    .tmap) sempre usa ``tiled_search`` e não aceita ``trace``.
+
+    Listas e arrays ganham um ``FlatGrid`` guardado por ``map_grid``, com o
+    índice de componentes, a escala da heurística e a contagem de custos
+    calculados uma vez por mapa. Antes de qualquer motor, o índice
+    (``components`` ou o do ``FlatGrid``) descarta objetivos inalcançáveis
+    sem expandir nada.
+    """
+    # Consulta ao índice de componentes antes de qualquer motor: sem caminho, nada é expandido
+    if not isinstance(terrain_map, TiledMap):
+        grid = terrain_map if isinstance(terrain_map, FlatGrid) else map_grid(terrain_map, cost_map)
+        if components is None:
+            components = grid.components()
+        if not components.reachable(start, goal):
+            if stats is not None:
+                stats['expanded'] = 0
+            return SearchResult.not_found(grid.cols)
+
+    # Mapas em blocos (.tmap) nunca viram FlatGrid: a busca lê só os blocos que toca
+    if isinstance(terrain_map, TiledMap):
+        if trace is not None:
+            raise ValueError("SearchTrace não é suportado em mapas em blocos (.tmap)")
+        path, costs = tiled_search(start, goal, terrain_map, cost_map, stats)
+    # Busca instrumentada (estatísticas, ganchos e mapa de calor): ver SearchTrace
+    elif trace is not None:
+        path, costs = a_star_search_traced(start, goal, grid, cost_map, trace, heuristic_mode)
+        if stats is not None:
+            stats.update(trace.as_dict())
+    elif engine == 'bounded':
+        from boundedSearch import bounded_search  # boundedSearch importa este módulo
+        path, costs = bounded_search(start, goal, grid, cost_map, stats=stats, heuristic_mode=heuristic_mode)
+    elif engine == 'corridor':
+        from corridorGraph import corridor_search  # corridorGraph importa este módulo
+        path, costs = corridor_search(start, goal, grid, cost_map, stats)
+    elif engine == 'bidirectional':
+        path, costs = bidirectional_search(start, goal, grid, cost_map, stats, heuristic_mode)
+    # Motor alternativo sobre a grade achatada (fila de baldes e ALT só existem nele)
+    elif engine == 'array' or queue == 'bucket' or heuristic_mode == 'alt':
+        path, costs = a_star_search_array(start, goal, grid, cost_map, queue, stats, heuristic_mode)
+    elif engine == 'jps' or (engine == 'dict' and heuristic_mode == 'scaled' and
+                             grid.uniform_step(start, goal) is not None):
+        # Tabelas JPS+ só compensam quando o FlatGrid é reaproveitado entre buscas
+        path, costs = jump_point_search(start, goal, grid, cost_map, stats,
+                                        tables=isinstance(terrain_map, FlatGrid))
+    else:
+        # Listas seguem como estão; o FlatGrid só fornece escala e componentes
+        path, costs = a_star_search_dict(start, goal, terrain_map, cost_map, stats, heuristic_mode,
+                                         components, grid)
+    return SearchResult.from_path(path, costs, map_columns(terrain_map))
+
+def a_star_search_dict(
+    start: Position,
+    goal: Position,
+    terrain_map: TerrainMap,
+    cost_map: Dict[int, int],
+    stats: dict = None,
+    heuristic_mode: str = 'scaled',
+    components: 'Components' = None,
+    grid: 'FlatGrid' = None
+) -> Tuple[Path, Dict[Position, int]]:
+    """O A* original sobre listas e dicionários (``engine='dict'``).
+
+    ``grid`` é o ``FlatGrid`` do mapa (por padrão o de ``map_grid``), de onde
+    vêm a escala da heurística e o índice de componentes.
+    """
+    if isinstance(terrain_map, FlatGrid):
+        grid = terrain_map
+    elif grid is None:
+        grid = map_grid(terrain_map, cost_map)
+    if components is None:
+        components = grid.components()
+    if not isinstance(terrain_map, list):
+        terrain_map = grid.terrain_rows()
+
+    # Consulta ao índice de componentes (FlatGrid.components) antes de buscar
+    if not components.reachable(start, goal):
+        if stats is not None:
+            stats['expanded'] = 0
+        return [], float('inf')
+
+    # Escala da heurística ('manhattan' mantém a distância pura), como em heuristic_scale
+    if heuristic_mode == 'manhattan':
+        scale, slack = 1, 0
+    else:
+        scale, slack = grid.min_cost, grid.free_cells
+
     # Função para obter custo de movimento
     def get_move_cost(pos: Position) -> int:
         terrain_type = terrain_map[pos[0]][pos[1]]
@@ -67,9 +203,11 @@ def a_star_search(
     heapq.heappush(frontier, (0, start))
     came_from = {start: None}
     cost_so_far = {start: 0}
+    expanded = 0
     
     while frontier:
         _, current = heapq.heappop(frontier)
+        expanded += 1
         
         if current == goal:
             break
@@ -91,10 +229,13 @@ def a_star_search(
             
             if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
                 cost_so_far[next_pos] = new_cost
-                priority = new_cost + heuristic(next_pos, goal)
+                priority = new_cost + heuristic(next_pos, goal, scale, slack)
                 heapq.heappush(frontier, (priority, next_pos))
                 came_from[next_pos] = current
                 
+    if stats is not None:
+        stats['expanded'] = expanded
+
     # Reconstruir caminho
     if goal not in came_from:
         return [], float('inf')  # Caminho não encontrado
@@ -109,198 +250,1670 @@ def a_star_search(
 
     return path, cost_so_far
 
-def plot_map(map_data: TerrainMap, map_size: Tuple[int, int], path: Path = None, 
-             cost: dict[Position, int] = {}, total_cost: int = 0):
-    
-    color_map = {
-        GRASS: [0.55, 0.8, 0.3],
-        SAND: [0.77, 0.75, 0.6],
-        FOREST: [0.1, 0.55, 0.1],
-        MOUNTAIN: [0.4, 0.35, 0.15],
-        WATER: [0.33, 0.55, 0.83],
-        DANGEON: [0.12, 0.12, 0.12], 
-        LINK: [0.85, 0.5, 0.3],
-        WAY: [1.0, 0.9, 0.9],
-        WALL: [0.7, 0.7, 0.7],
-        PENDANT: [1, 1, 0],
-        LOSTWOOD: [0.8, 0.8, 0],
-        SWORD: [0.8, 0.2, 0.2]
-    }
-    
-    rows, cols = map_size
-    grid = np.zeros((rows, cols, 3))
-
-    for r in range(rows):
-        for c in range(cols):
-            terrain_type = map_data[r][c]
-            if terrain_type == SWORD:
-                grid[r, c] = color_map[SWORD]
-            elif terrain_type == LINK:
-                grid[r, c] = color_map[LINK]
+class FlatGrid:
+    """Mapa achatado em um vetor de índices inteiros com os custos pré-calculados.
+
+    A grade recebe uma borda intransitável, assim os vizinhos de uma célula são
+    sempre ``i + 1``, ``i - 1``, ``i + width`` e ``i - width`` sem testar limites.
+    A ordem dos índices preserva a ordem das tuplas (linha, coluna), o que mantém
+    o desempate do heap igual ao de ``a_star_search``.
+    """
+
+    def __init__(self, terrain_map: TerrainMap, cost_map: Dict[int, int]):
+        self.cost_map = cost_map
+        self.terrain = np.asarray(terrain_map, dtype=np.int64)
+        self.rows, self.cols = self.terrain.shape
+        self.width = self.cols + 2
+        self.size = (self.rows + 2) * self.width
+
+        # Tabela de custos por tipo de terreno, aplicada uma única vez
+        values, inverse = np.unique(self.terrain, return_inverse=True)
+        lookup = [cost_map.get(int(v), float('inf')) for v in values]
+        lookup.append(float('inf'))  # Borda
+
+        padded = np.full((self.rows + 2, self.width), len(values), dtype=np.int64)
+        padded[1:-1, 1:-1] = inverse.reshape(self.terrain.shape)
+        flat = padded.ravel()
+
+        self.costs = np.array(lookup, dtype=np.float64)[flat]
+        # Custos inteiros permitem a fila de baldes (BucketQueue)
+        self.integral = all(isinstance(c, int) for c in lookup if c != float('inf'))
+        # Lista Python para o laço principal (mantém os custos inteiros originais)
+        self.move_cost = [lookup[i] for i in flat.tolist()]
+        self.offsets = (1, self.width, -1, -self.width)
+
+        # Escala da heurística, como em heuristic_scale
+        positive = [c for c in lookup if 0 < c < float('inf')]
+        self.min_cost = min(positive) if positive else 0
+        self.free_cells = int(np.count_nonzero(self.costs == 0))
+        self.landmark_cache = {}
+        self.component_index = None
+        self.jump_cache = None
+        self.step_counts = None
+        self.corridor_cache = None  # CorridorGraph, preenchido por corridorGraph.py
+        self.rows_cache = None  # terrain.tolist(), para o motor de dicionários
+
+    @classmethod
+    def from_arrays(cls, terrain: np.ndarray, costs: np.ndarray, cost_map: Dict[int, int],
+                    labels: np.ndarray = None) -> 'FlatGrid':
+        """Grade sobre arrays já calculados, sem copiá-los (ex.: memória compartilhada).
+
+        ``costs`` é o vetor de custos com borda de outro ``FlatGrid`` e
+        ``labels`` os rótulos do seu índice de componentes. ``move_cost`` vira
+        uma visão de ``costs`` (custos em float): a grade serve só para buscas,
+        não para ``set_cell``.
+        """
+        grid = cls.__new__(cls)
+        grid.cost_map = cost_map
+        grid.terrain = terrain
+        grid.rows, grid.cols = terrain.shape
+        grid.width = grid.cols + 2
+        grid.size = (grid.rows + 2) * grid.width
+        grid.costs = costs
+        finite = [c for c in cost_map.values() if c != float('inf')]
+        grid.integral = all(isinstance(c, int) for c in finite)
+        grid.move_cost = memoryview(costs)
+        grid.offsets = (1, grid.width, -1, -grid.width)
+
+        positive = costs[(costs > 0) & (costs < float('inf'))]
+        grid.min_cost = positive.min().item() if positive.size else 0
+        if grid.integral:
+            grid.min_cost = int(grid.min_cost)
+        grid.free_cells = int(np.count_nonzero(costs == 0))
+        grid.landmark_cache = {}
+        grid.component_index = Components(grid, labels) if labels is not None else None
+        grid.jump_cache = None
+        grid.step_counts = None
+        grid.corridor_cache = None
+        grid.rows_cache = None
+        return grid
+
+    def index(self, pos: Position) -> int:
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, index: int) -> Position:
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def set_cell(self, pos: Position, terrain_type: int):
+        """Troca o terreno de uma célula mantendo custos e heurística coerentes"""
+        index = self.index(pos)
+        old = self.move_cost[index]
+        cost = self.cost_map.get(terrain_type, float('inf'))
+        self.terrain[pos] = terrain_type
+        if self.rows_cache is not None:
+            self.rows_cache[pos[0]][pos[1]] = terrain_type
+        self.move_cost[index] = cost
+        self.costs[index] = cost
+
+        # A escala só diminui, então a heurística continua admissível
+        self.free_cells += (cost == 0) - (old == 0)
+        if 0 < cost < float('inf') and (self.min_cost == 0 or cost < self.min_cost):
+            self.min_cost = cost
+        if cost != float('inf') and not isinstance(cost, int):
+            self.integral = False
+        self.landmark_cache.clear()  # Distâncias dos marcos deixam de valer
+        self.jump_cache = None
+        self.step_counts = None
+        self.corridor_cache = None
+        if self.component_index is not None:
+            self.component_index.cell_changed(index, old, cost)
+
+    def landmarks(self, count: int = DEFAULT_LANDMARKS) -> 'Landmarks':
+        """Marcos da heurística ALT, calculados uma única vez por mapa"""
+        if count not in self.landmark_cache:
+            self.landmark_cache[count] = Landmarks(self, count)
+        return self.landmark_cache[count]
+
+    def terrain_rows(self) -> TerrainMap:
+        """O terreno como listas aninhadas, montadas uma única vez por mapa"""
+        if self.rows_cache is None:
+            self.rows_cache = self.terrain.tolist()
+        return self.rows_cache
+
+    def jump_tables(self) -> 'JumpTables':
+        """Tabelas de salto (JPS+), calculadas uma única vez por mapa"""
+        if self.jump_cache is None:
+            self.jump_cache = JumpTables(self)
+        return self.jump_cache
+
+    def uniform_step(self, start: Position, goal: Position):
+        """Ver ``uniform_step``: custo comum fora de ``start`` e ``goal``, ou None"""
+        if self.step_counts is None:
+            self.step_counts = Counter(self.move_cost)
+        counts = self.step_counts.copy()
+        for pos in {tuple(start), tuple(goal)}:
+            counts[self.move_cost[self.index(pos)]] -= 1
+        steps = [cost for cost, n in counts.items() if n > 0 and cost != float('inf')]
+        return steps[0] if len(steps) == 1 and steps[0] > 0 else None
+
+    def components(self) -> 'Components':
+        """Índice de alcançabilidade do mapa, mantido nas edições de célula"""
+        if self.component_index is None:
+            self.component_index = Components(self)
+        return self.component_index
+
+    def heuristic_params(self, goal: int, mode: str = 'scaled'):
+        """Parâmetros da heurística até ``goal`` para uso em linha nos laços.
+
+        Retorna ``(linha, coluna, escala, folga, alt)``; ``alt`` é ``None``
+        fora do modo 'alt' ou uma função ``alt(índice, manhattan)`` que
+        acrescenta os limites dos marcos.
+        """
+        goal_r, goal_c = divmod(goal, self.width)
+        if mode == 'manhattan':
+            scale, slack = 1, 0
+        else:
+            scale, slack = self.min_cost, self.free_cells
+        if mode != 'alt':
+            return goal_r, goal_c, scale, slack, None
+
+        forward, backward = self.landmarks().terms(goal)
+
+        def alt(index: int, best: float) -> float:
+            for from_landmark, from_goal in forward:
+                bound = from_goal - from_landmark[index]
+                if bound > best:
+                    best = bound
+            for to_landmark, to_goal in backward:
+                bound = to_landmark[index] - to_goal
+                if bound > best:
+                    best = bound
+            return best
+
+        return goal_r, goal_c, scale, slack, alt
+
+    def heuristic_fn(self, goal: int, mode: str = 'scaled'):
+        """Heurística até o índice ``goal``: 'manhattan', 'scaled' ou 'alt'"""
+        width = self.width
+        goal_r, goal_c, scale, slack, alt = self.heuristic_params(goal, mode)
+
+        def estimate(index: int) -> float:
+            r, c = divmod(index, width)
+            distance = abs(r - goal_r) + abs(c - goal_c) - slack
+            value = scale * distance if distance > 0 else 0
+            return alt(index, value) if alt is not None else value
+
+        return estimate
+
+class GridCosts(Mapping):
+    """Visão somente leitura do vetor de custos como ``{posição: custo}``."""
+
+    def __init__(self, grid: FlatGrid, g_score: List[float]):
+        self.grid = grid
+        self.g_score = g_score
+
+    def __getitem__(self, pos: Position):
+        r, c = pos
+        if not (0 <= r < self.grid.rows and 0 <= c < self.grid.cols):
+            raise KeyError(pos)
+        value = self.g_score[self.grid.index(pos)]
+        if value == float('inf'):
+            raise KeyError(pos)
+        return value
+
+    def __iter__(self):
+        inf = float('inf')
+        for i, value in enumerate(self.g_score):
+            if value != inf:
+                yield self.grid.position(i)
+
+    def __len__(self):
+        inf = float('inf')
+        return sum(1 for value in self.g_score if value != inf)
+
+def dijkstra_scan(grid: FlatGrid, source: int, reverse: bool = False) -> List[float]:
+    """Custo exato de ``source`` até todas as células do mapa.
+
+    Com ``reverse`` calcula o custo de cada célula até ``source``. O custo é
+    cobrado na célula de entrada, então as duas direções diferem.
+    """
+    inf = float('inf')
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+    dist = [inf] * grid.size
+    dist[source] = 0
+    frontier = [(0, source)]
+
+    while frontier:
+        current_cost, current = heapq.heappop(frontier)
+        if current_cost != dist[current]:
+            continue
+        for offset in offsets:
+            nxt = current + offset
+            step = move_cost[nxt]
+            if step == inf:
+                continue
+            new_cost = current_cost + (move_cost[current] if reverse else step)
+            if new_cost < dist[nxt]:
+                dist[nxt] = new_cost
+                heapq.heappush(frontier, (new_cost, nxt))
+    return dist
+
+class Landmarks:
+    """Distâncias exatas de e até alguns marcos para a heurística ALT.
+
+    Pela desigualdade triangular, para cada marco L:
+    d(n, alvo) >= d(L, alvo) - d(L, n) e d(n, alvo) >= d(n, L) - d(alvo, L).
+    Os marcos são escolhidos pelo critério do mais distante, e uma componente
+    ainda não coberta tem prioridade.
+    """
+
+    def __init__(self, grid: FlatGrid, count: int = DEFAULT_LANDMARKS):
+        inf = float('inf')
+        self.cells = []
+        self.from_landmark = []
+        self.to_landmark = []
+
+        passable = [i for i, c in enumerate(grid.move_cost) if c != inf]
+        if not passable:
+            return
+
+        probe = dijkstra_scan(grid, passable[0])
+        current = max(passable, key=lambda i: probe[i] if probe[i] != inf else -1)
+        nearest = [inf] * grid.size
+
+        for _ in range(min(count, len(passable))):
+            self.cells.append(grid.position(current))
+            from_l = dijkstra_scan(grid, current)
+            self.from_landmark.append(from_l)
+            self.to_landmark.append(dijkstra_scan(grid, current, reverse=True))
+
+            for i in passable:
+                if from_l[i] < nearest[i]:
+                    nearest[i] = from_l[i]
+            current = max(passable, key=lambda i: nearest[i])
+            if nearest[current] == 0:
+                break  # Todas as células já são marcos
+
+    def terms(self, goal: int):
+        """Termos (vetor, valor no alvo) úteis para um alvo específico"""
+        inf = float('inf')
+        forward = [(f, f[goal]) for f in self.from_landmark if f[goal] != inf]
+        backward = [(t, t[goal]) for t in self.to_landmark if t[goal] != inf]
+        return forward, backward
+
+class Components:
+    """Componentes conexas das células transitáveis (vizinhança 4).
+
+    ``reachable`` responde em O(1) se existe caminho entre duas posições. A
+    célula inicial não paga custo, então mesmo parada sobre uma parede ela
+    alcança as componentes vizinhas; já o objetivo precisa ser transitável.
+    As edições de ``FlatGrid.set_cell`` são aplicadas em ``cell_changed``:
+    abrir uma célula só une rótulos e fechar uma só reconstrói o índice
+    quando pode ter dividido uma componente.
+    """
+
+    def __init__(self, grid: FlatGrid, labels: np.ndarray = None):
+        self.grid = grid
+        # Rótulos já calculados (ver FlatGrid.from_arrays) dispensam o build
+        self.stale = labels is None
+        self.labels = labels
+        self.count = int(labels.max()) if labels is not None and labels.size else 0
+
+    def build(self):
+        grid = self.grid
+        passable = np.isfinite(grid.costs)
+
+        # Trechos horizontais contínuos recebem um número (a borda separa as linhas)
+        starts = passable & ~np.concatenate(([False], passable[:-1]))
+        run = np.cumsum(starts) * passable
+        runs = int(run.max()) if run.size else 0
+
+        # Trechos ligados verticalmente são unidos (union-find sobre os trechos)
+        above, below = run[:-grid.width], run[grid.width:]
+        linked = (above > 0) & (below > 0)
+        pairs = np.unique(np.stack([above[linked], below[linked]], axis=1), axis=0)
+
+        parent = list(range(runs + 1))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in pairs.tolist():
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+        roots = np.array([find(x) for x in range(runs + 1)], dtype=np.int64)
+        _, compact = np.unique(roots, return_inverse=True)  # raiz 0 continua 0
+        self.labels = compact.ravel()[run]
+        self.count = int(compact.max()) if compact.size else 0
+        self.stale = False
+
+    def cell_changed(self, index: int, old_cost: float, new_cost: float):
+        inf = float('inf')
+        if self.stale or (old_cost == inf) == (new_cost == inf):
+            return
+        labels = self.labels
+        around = {int(labels[index + offset]) for offset in self.grid.offsets} - {0}
+
+        if new_cost != inf:
+            # A célula abriu: vira parte dos vizinhos e une as componentes deles
+            if not around:
+                self.count += 1
+                labels[index] = self.count
+                return
+            target = min(around)
+            others = list(around - {target})
+            if others:
+                labels[np.isin(labels, others)] = target
+            labels[index] = target
+        else:
+            labels[index] = 0
+            # Com até um vizinho transitável a componente não se divide
+            if sum(1 for offset in self.grid.offsets if labels[index + offset]) > 1:
+                self.stale = True
+
+    def label(self, index: int) -> int:
+        if self.stale:
+            self.build()
+        return int(self.labels[index])
+
+    def departure_labels(self, index: int) -> Set[int]:
+        """Componentes alcançáveis a partir de ``index`` (que pode ser intransitável)"""
+        if self.stale:
+            self.build()
+        own = int(self.labels[index])
+        if own:
+            return {own}
+        return {int(self.labels[index + offset]) for offset in self.grid.offsets} - {0}
+
+    def reachable(self, start: Position, goal: Position) -> bool:
+        if start == goal:
+            return True
+        grid = self.grid
+        target = self.label(grid.index(goal))
+        return target != 0 and target in self.departure_labels(grid.index(start))
+
+    def groups(self, points: List[Position]) -> List[List[Position]]:
+        """Agrupa os pontos que se alcançam mutuamente (para o planejamento da rota).
+
+        Pontos intransitáveis ficam sozinhos no próprio grupo.
+        """
+        grouped = {}
+        result = []
+        for pos in points:
+            key = self.label(self.grid.index(pos))
+            if key == 0:
+                result.append([pos])
+            elif key in grouped:
+                grouped[key].append(pos)
             else:
-                grid[r, c] = color_map.get(terrain_type, [0.5, 0.5, 0.5])
-    
-    plt.ion()
-    fig, ax = plt.subplots(figsize=(12, 12))
-    mng = plt.get_current_fig_manager()
-    if mng is not None:
-        mng.full_screen_toggle() 
-    
-    # Configurações do plot
-    plt.title('Jornada de Link', pad=20, fontsize=16, weight='bold')
-    fig.subplots_adjust(top=0.9, bottom=0.15, left=0.1, right=0.75)
-    
-    # Adicionar legenda
-    legend_elements = [
-        plt.Line2D([0], [0], marker='o', color='w', label='Link (Início)', 
-                  markerfacecolor=color_map[LINK], markersize=10),
-        plt.Line2D([0], [0], marker='o', color='w', label='Master Sword (Objetivo)', 
-                  markerfacecolor=color_map[SWORD], markersize=10),
-        plt.Line2D([0], [0], marker='o', color='w', label='Pingente da Virtude', 
-                  markerfacecolor=color_map[PENDANT], markersize=10),
-        plt.Line2D([0], [0], marker='o', color='w', label='Lost Woods', 
-                  markerfacecolor=color_map[LOSTWOOD], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Grama (Custo: 10)', 
-                  markerfacecolor=color_map[GRASS], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Areia (Custo: 20)', 
-                  markerfacecolor=color_map[SAND], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Floresta (Custo: 100)', 
-                  markerfacecolor=color_map[FOREST], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Montanha (Custo: 150)', 
-                  markerfacecolor=color_map[MOUNTAIN], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Água (Custo: 180)', 
-                  markerfacecolor=color_map[WATER], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Masmorra', 
-                  markerfacecolor=color_map[DANGEON], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Caminho (Masmorra)', 
-                  markerfacecolor=color_map[WAY], markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label='Parede (Intransponível)', 
-                  markerfacecolor=color_map[WALL], markersize=10)
-    ]
-    
-    ax.legend(handles=legend_elements, bbox_to_anchor=(1.05, 1), 
-              loc='upper left', borderaxespad=0., title="Legenda:")
-    
-    # Linhas para as bordas
-    ax.set_xticks(np.arange(-.5, cols, 1))
-    ax.set_yticks(np.arange(-.5, rows, 1))
-    ax.set_xticklabels([])
-    ax.set_yticklabels([])
-    ax.tick_params(axis='both', which='both', length=0)
-    ax.grid(which='major', color='black', linestyle='-', linewidth=1)
-    
-    # Textos de custo
-    current_cost_text = ax.text(-0.015, 0.98, 'Custo Atual: 0', ha='right', va='top', 
-                               color='white', fontsize=14, weight='bold', 
-                               bbox=dict(facecolor='black', alpha=0.8, edgecolor='white', boxstyle='round,pad=0.5'))
-    
-    total_cost_text = ax.text(-0.015, 0.94, 'Custo Total: 0', ha='right', va='top', 
-                             color='white', fontsize=14, weight='bold', 
-                             bbox=dict(facecolor='black', alpha=0.8, edgecolor='white', boxstyle='round,pad=0.5'))
-    
-    # Barra de progresso
-    progress_text = ax.text(0.5, -0.05, 'Preparando jornada...', ha='center', va='top', 
-                           color='black', fontsize=12, weight='bold',
-                           transform=ax.transAxes)
-    
-    # Mostrar mapa inicial
-    im = ax.imshow(grid)
-    fig.canvas.draw_idle()
-    plt.pause(0.5)
+                grouped[key] = [pos]
+                result.append(grouped[key])
+        return result
+
+# FlatGrid dos mapas em listas ou arrays, do mais antigo ao mais recente
+GRID_CACHE_SIZE = 4
+grid_cache = OrderedDict()
+
+def map_grid(terrain_map, cost_map: Dict[int, int]) -> FlatGrid:
+    """``FlatGrid`` de um mapa em listas ou array, montado uma vez por objeto.
+
+    A chave é a identidade do mapa e da tabela de custos (a entrada guarda os
+    dois, então a identidade não é reaproveitada enquanto ela existir): uma
+    consulta não varre nem calcula hash do mapa. Um mapa editado no lugar
+    precisa ser passado como outro objeto ou editado por ``FlatGrid.set_cell``.
+    """
+    if isinstance(terrain_map, FlatGrid):
+        return terrain_map
+    key = (id(terrain_map), id(cost_map))
+    entry = grid_cache.get(key)
+    if entry is None or entry[0] is not terrain_map or entry[1] is not cost_map:
+        entry = (terrain_map, cost_map, FlatGrid(terrain_map, cost_map))
+        grid_cache[key] = entry
+        while len(grid_cache) > GRID_CACHE_SIZE:
+            grid_cache.popitem(last=False)
+    grid_cache.move_to_end(key)
+    return entry[2]
+
+class BucketQueue:
+    """Fila de prioridade por baldes (Dial) para prioridades inteiras.
+
+    Os custos do mapa são inteiros pequenos, então as prioridades ficam em uma
+    janela estreita acima do mínimo atual: inserir e remover custam O(1)
+    amortizado. Uma prioridade menor que o cursor (heurística inconsistente em
+    células de custo 0) apenas recua o cursor.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.current = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, priority: int, item):
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            self.buckets[priority] = [item]
+        else:
+            bucket.append(item)
+        if priority < self.current or self.size == 0:
+            self.current = priority
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        bucket = buckets.get(self.current)
+        while not bucket:
+            if bucket is not None:
+                del buckets[self.current]
+            self.current += 1
+            bucket = buckets.get(self.current)
+        self.size -= 1
+        return self.current, bucket.pop()
+
+def a_star_search_array(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    queue: str = 'heap',
+    stats: dict = None,
+    heuristic_mode: str = 'scaled'
+) -> Tuple[Path, GridCosts]:
+    """A* com índices inteiros e vetores pré-alocados de custo e pai.
+
+    Aceita um ``FlatGrid`` já construído (recomendado ao repetir buscas no
+    mesmo mapa) ou um ``TerrainMap``. Com ``queue='heap'`` retorna o mesmo
+    caminho e os mesmos custos que ``a_star_search``; ``queue='bucket'`` usa a
+    ``BucketQueue`` e descarta entradas antigas (mesmo custo ótimo, o
+    desempate entre caminhos equivalentes pode mudar). Se ``stats`` for um
+    dicionário, recebe o número de nós expandidos em ``'expanded'``.
+    ``heuristic_mode`` escolhe a heurística (ver ``FlatGrid.heuristic_fn``);
+    com 'alt' as células que não alcançam o objetivo nem entram na fila.
+    """
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+
+    # Objetivo em outra componente: nem começa a busca
+    if not grid.components().reachable(start, goal):
+        if stats is not None:
+            stats['expanded'] = 0
+        return [], float('inf')
+
+    g_score = [inf] * grid.size
+    parent = [-1] * grid.size
+    source = grid.index(start)
+    target = grid.index(goal)
+    width = grid.width
+    goal_r, goal_c, scale, slack, alt = grid.heuristic_params(target, heuristic_mode)
+
+    g_score[source] = 0
+    expanded = 0
+
+    if queue == 'bucket' and grid.integral:
+        # Operações da BucketQueue feitas em linha no laço principal
+        buckets = {0: [(0, source)]}
+        cursor = 0
+        pending = 1
+
+        while pending:
+            bucket = buckets.get(cursor)
+            while not bucket:
+                if bucket is not None:
+                    del buckets[cursor]
+                cursor += 1
+                bucket = buckets.get(cursor)
+            entry_cost, current = bucket.pop()
+            pending -= 1
+            if entry_cost != g_score[current]:
+                continue  # Entrada antiga: a célula já foi melhorada
+            expanded += 1
+
+            if current == target:
+                break
+
+            for offset in offsets:
+                nxt = current + offset
+                step = move_cost[nxt]
+                if step == inf:
+                    continue
+
+                new_cost = entry_cost + step
+                if new_cost < g_score[nxt]:
+                    r, c = divmod(nxt, width)
+                    estimate = abs(r - goal_r) + abs(c - goal_c) - slack
+                    estimate = scale * estimate if estimate > 0 else 0
+                    if alt is not None:
+                        estimate = alt(nxt, estimate)
+                    if estimate == inf:
+                        continue  # Não alcança o objetivo
+                    g_score[nxt] = new_cost
+                    priority = new_cost + estimate
+                    slot = buckets.get(priority)
+                    if slot is None:
+                        buckets[priority] = [(new_cost, nxt)]
+                    else:
+                        slot.append((new_cost, nxt))
+                    if priority < cursor:
+                        cursor = priority
+                    pending += 1
+                    parent[nxt] = current
+    else:
+        frontier = [(0, source)]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        while frontier:
+            _, current = heappop(frontier)
+            expanded += 1
+
+            if current == target:
+                break
+
+            base = g_score[current]
+            for offset in offsets:
+                nxt = current + offset
+                step = move_cost[nxt]
+                if step == inf:
+                    continue  # Terreno intransitável ou borda
+
+                new_cost = base + step
+                if new_cost < g_score[nxt]:
+                    r, c = divmod(nxt, width)
+                    estimate = abs(r - goal_r) + abs(c - goal_c) - slack
+                    estimate = scale * estimate if estimate > 0 else 0
+                    if alt is not None:
+                        estimate = alt(nxt, estimate)
+                    if estimate == inf:
+                        continue  # Não alcança o objetivo
+                    g_score[nxt] = new_cost
+                    heappush(frontier, (new_cost + estimate, nxt))
+                    parent[nxt] = current
+
+    if stats is not None:
+        stats['expanded'] = expanded
+
+    # Reconstruir caminho
+    if target != source and parent[target] == -1:
+        return [], float('inf')  # Caminho não encontrado
+
+    path = []
+    current = target
+    while current != source:
+        path.append(grid.position(current))
+        current = parent[current]
+    path.append(start)
+    path.reverse()
+
+    return path, GridCosts(grid, g_score)
+
+class SearchTrace:
+    """Estatísticas e ganchos de uma busca, preenchidos por ``a_star_search(trace=...)``.
+
+    Os ganchos recebem posições: ``on_expand(pos, g)``, ``on_push(pos, g,
+    prioridade)`` e ``on_goal(pos, custo)``. Com ``heatmap=True``,
+    ``heat[linha, coluna]`` conta quantas vezes cada célula foi expandida
+    (ver ``plot_map(heatmap=...)``). Sem ``trace`` as buscas não pagam nada
+    por isso: a versão instrumentada é um laço separado.
+    """
+
+    def __init__(self, on_expand=None, on_push=None, on_goal=None, heatmap: bool = False):
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.on_goal = on_goal
+        self.heatmap = heatmap
+        self.heat = None
+        self.reset()
+
+    def reset(self):
+        self.expanded = 0
+        self.pushed = 0
+        self.stale_pops = 0   # entradas do heap já superadas por um custo menor
+        self.reopened = 0     # células expandidas de novo com custo menor
+        self.frontier_peak = 0
+        self.path_length = 0
+        self.cost = float('inf')
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'expanded': self.expanded,
+            'pushed': self.pushed,
+            'stale_pops': self.stale_pops,
+            'reopened': self.reopened,
+            'frontier_peak': self.frontier_peak,
+            'path_length': self.path_length,
+            'cost': self.cost,
+            'seconds': self.seconds
+        }
+
+def a_star_search_traced(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    trace: SearchTrace = None,
+    heuristic_mode: str = 'scaled'
+) -> Tuple[Path, GridCosts]:
+    """O mesmo A* de ``a_star_search_array`` (heap), instrumentado.
+
+    Segue exatamente a ordem de inserções e remoções da versão rápida, então
+    ``expanded`` e o caminho coincidem com ela; as entradas antigas também
+    são expandidas lá, e aqui são contadas em ``stale_pops``.
+    """
+    if trace is None:
+        trace = SearchTrace()
+    trace.reset()
+    started = time.perf_counter()
+
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+    position = grid.position
+    on_expand, on_push, on_goal = trace.on_expand, trace.on_push, trace.on_goal
+    heat = np.zeros((grid.rows, grid.cols), dtype=np.int64) if trace.heatmap else None
+    trace.heat = heat
+
+    if not grid.components().reachable(start, goal):
+        trace.seconds = time.perf_counter() - started
+        return [], inf
+
+    g_score = [inf] * grid.size
+    parent = [-1] * grid.size
+    closed = bytearray(grid.size)
+    source = grid.index(start)
+    target = grid.index(goal)
+    estimate_of = grid.heuristic_fn(target, heuristic_mode)
+
+    g_score[source] = 0
+    frontier = [(0, source)]
+    trace.pushed = 1
+    trace.frontier_peak = 1
+
+    while frontier:
+        priority, current = heapq.heappop(frontier)
+        base = g_score[current]
+        trace.expanded += 1
+        if priority != base + estimate_of(current) and current != source:
+            trace.stale_pops += 1
+        elif closed[current]:
+            trace.reopened += 1
+        closed[current] = 1
+        if heat is not None:
+            heat[position(current)] += 1
+        if on_expand is not None:
+            on_expand(position(current), base)
+
+        if current == target:
+            if on_goal is not None:
+                on_goal(goal, base)
+            break
+
+        for offset in offsets:
+            nxt = current + offset
+            step = move_cost[nxt]
+            if step == inf:
+                continue
+
+            new_cost = base + step
+            if new_cost < g_score[nxt]:
+                estimate = estimate_of(nxt)
+                if estimate == inf:
+                    continue
+                g_score[nxt] = new_cost
+                heapq.heappush(frontier, (new_cost + estimate, nxt))
+                parent[nxt] = current
+                trace.pushed += 1
+                if on_push is not None:
+                    on_push(position(nxt), new_cost, new_cost + estimate)
+        if len(frontier) > trace.frontier_peak:
+            trace.frontier_peak = len(frontier)
+
+    trace.seconds = time.perf_counter() - started
+    if target != source and parent[target] == -1:
+        return [], inf
+
+    path = []
+    current = target
+    while current != source:
+        path.append(grid.position(current))
+        current = parent[current]
+    path.append(start)
+    path.reverse()
+    trace.path_length = len(path)
+    trace.cost = g_score[target]
+    return path, GridCosts(grid, g_score)
+
+def multi_target_search(
+    start: Position,
+    goals: List[Position],
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP
+) -> Tuple[Dict[Position, Path], GridCosts]:
+    """Dijkstra de uma origem para vários destinos em uma única varredura.
+
+    Fecha células até alcançar todos os destinos e retorna o caminho de cada
+    um (``[]`` quando inalcançável) e os custos acumulados, como
+    ``a_star_search``. Substitui uma busca por par (origem, destino).
+    """
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+
+    g_score = [inf] * grid.size
+    parent = [-1] * grid.size
+    closed = bytearray(grid.size)
+    source = grid.index(start)
+    # Destinos inalcançáveis não seguram a varredura até esgotar o mapa
+    components = grid.components()
+    pending = {grid.index(goal) for goal in goals if components.reachable(start, goal)}
+
+    g_score[source] = 0
+    frontier = [(0, source)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    while frontier and pending:
+        current_cost, current = heappop(frontier)
+        if closed[current]:
+            continue  # Entrada antiga no heap
+        closed[current] = 1
+        pending.discard(current)
+
+        for offset in offsets:
+            nxt = current + offset
+            step = move_cost[nxt]
+            if step == inf:
+                continue
+
+            new_cost = current_cost + step
+            if new_cost < g_score[nxt]:
+                g_score[nxt] = new_cost
+                heappush(frontier, (new_cost, nxt))
+                parent[nxt] = current
+
+    paths = {}
+    for goal in goals:
+        target = grid.index(goal)
+        if not closed[target]:
+            paths[goal] = []
+            continue
+        path = []
+        current = target
+        while current != source:
+            path.append(grid.position(current))
+            current = parent[current]
+        path.append(start)
+        path.reverse()
+        paths[goal] = path
 
-    if path:
-        # Mostrar caminho sendo percorrido
+    return paths, GridCosts(grid, g_score)
+
+def bidirectional_search(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    stats: dict = None,
+    heuristic_mode: str = 'scaled'
+) -> Tuple[Path, Dict[Position, float]]:
+    """A* bidirecional: uma busca parte do início e outra do objetivo.
+
+    O custo é cobrado na célula de entrada, então a busca reversa anda de
+    ``v`` para o antecessor ``u`` pagando o custo de ``v``, e ``g_r(v)`` não
+    inclui o custo da própria célula: o caminho que passa por ``v`` custa
+    ``g_f(v) + g_r(v)``. Cada lado usa uma heurística admissível (a
+    Manhattan escalada pode ser inconsistente perto de células de custo 0,
+    por isso as células são reabertas quando melhoram) e a busca termina
+    quando o menor ``f`` de uma das fronteiras alcança o melhor custo
+    conhecido. Retorna ``(caminho, custos acumulados ao longo do caminho)``;
+    ``stats`` recebe ``'expanded'`` e a divisão entre os dois lados.
+    """
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    move_cost = grid.move_cost
+    offsets = grid.offsets
+    width = grid.width
+    source = grid.index(start)
+    target = grid.index(goal)
+
+    if not grid.components().reachable(start, goal):
+        if stats is not None:
+            stats.update(expanded=0, expanded_forward=0, expanded_backward=0)
+        return [], inf
+
+    if heuristic_mode == 'manhattan':
+        scale, slack = 1, 0
+    else:
+        scale, slack = grid.min_cost, grid.free_cells
+    source_r, source_c = divmod(source, width)
+    target_r, target_c = divmod(target, width)
+
+    g_forward = [inf] * grid.size
+    g_backward = [inf] * grid.size
+    parent = [-1] * grid.size  # antecessor na busca direta
+    child = [-1] * grid.size   # sucessor na busca reversa
+    g_forward[source] = 0
+    g_backward[target] = 0
+    forward = [(0, 0, source)]
+    backward = [(0, 0, target)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    best = inf
+    meeting = -1
+    if source == target:
+        best, meeting = 0, source
+    expanded_forward = expanded_backward = 0
+
+    while forward and backward:
+        # Descarta entradas antigas do topo antes de usar o f mínimo
+        while forward and forward[0][1] != g_forward[forward[0][2]]:
+            heappop(forward)
+        while backward and backward[0][1] != g_backward[backward[0][2]]:
+            heappop(backward)
+        if not forward or not backward or max(forward[0][0], backward[0][0]) >= best:
+            break
+
+        if len(forward) <= len(backward):
+            _, base, current = heappop(forward)
+            expanded_forward += 1
+            for offset in offsets:
+                nxt = current + offset
+                step = move_cost[nxt]
+                if step == inf:
+                    continue
+                new_cost = base + step
+                if new_cost < g_forward[nxt]:
+                    g_forward[nxt] = new_cost
+                    parent[nxt] = current
+                    if g_backward[nxt] != inf and new_cost + g_backward[nxt] < best:
+                        best = new_cost + g_backward[nxt]
+                        meeting = nxt
+                    r, c = divmod(nxt, width)
+                    estimate = abs(r - target_r) + abs(c - target_c) - slack
+                    estimate = scale * estimate if estimate > 0 else 0
+                    if new_cost + estimate < best:
+                        heappush(forward, (new_cost + estimate, new_cost, nxt))
+        else:
+            _, base, current = heappop(backward)
+            expanded_backward += 1
+            # Entrar em current custa o mesmo vindo de qualquer vizinho
+            new_cost = base + move_cost[current]
+            for offset in offsets:
+                nxt = current + offset
+                # Só o início pode estar em uma célula intransitável
+                if move_cost[nxt] == inf and nxt != source:
+                    continue
+                if new_cost < g_backward[nxt]:
+                    g_backward[nxt] = new_cost
+                    child[nxt] = current
+                    if g_forward[nxt] != inf and g_forward[nxt] + new_cost < best:
+                        best = g_forward[nxt] + new_cost
+                        meeting = nxt
+                    r, c = divmod(nxt, width)
+                    estimate = abs(r - source_r) + abs(c - source_c) - slack
+                    estimate = scale * estimate if estimate > 0 else 0
+                    if new_cost + estimate < best:
+                        heappush(backward, (new_cost + estimate, new_cost, nxt))
+
+    if stats is not None:
+        stats.update(expanded=expanded_forward + expanded_backward,
+                     expanded_forward=expanded_forward, expanded_backward=expanded_backward)
+
+    if meeting == -1:
+        return [], inf  # Caminho não encontrado
+
+    # Início -> encontro pelos pais, encontro -> objetivo pelos filhos
+    cells = []
+    current = meeting
+    while current != source:
+        cells.append(current)
+        current = parent[current]
+    cells.append(source)
+    cells.reverse()
+    current = meeting
+    while current != target:
+        current = child[current]
+        cells.append(current)
+
+    path = [grid.position(i) for i in cells]
+    costs = {}
+    total = 0
+    for k, index in enumerate(cells):
+        if k > 0:
+            total += move_cost[index]
+        costs[path[k]] = total
+    return path, costs
+
+# Direções dos saltos: índices em JumpTables.tables
+UP, DOWN, LEFT, RIGHT = range(4)
+
+def uniform_step(start: Position, goal: Position, terrain_map, cost_map: Dict[int, int]):
+    """Custo comum a todas as células transitáveis fora ``start`` e ``goal``, ou None.
+
+    O início nunca é cobrado e o objetivo é cobrado uma única vez, então só
+    as demais células precisam ter o mesmo custo para que o menor número de
+    passos seja também o menor custo (o caso da busca por pontos de salto).
+    """
+    return map_grid(terrain_map, cost_map).uniform_step(start, goal)
+
+class JumpTables:
+    """Distâncias de salto pré-calculadas (JPS+) nas quatro direções.
+
+    ``tables[direção][índice]`` positivo é o número de passos até o próximo
+    ponto de salto; zero ou negativo é menos o número de células livres até a
+    parede. A ordem canônica é horizontal antes de vertical: um salto
+    vertical para onde um vizinho lateral se abre (e estava fechado na linha
+    anterior) e um salto horizontal para onde algum salto vertical para.
+    """
+
+    def __init__(self, grid: FlatGrid):
+        self.grid = grid
+        inf = float('inf')
+        width = grid.width
+        size = grid.size
+        free = [c != inf for c in grid.move_cost]
+        up, down, left, right = ([0] * size for _ in range(4))
+
+        def sweep(table, order, offset, stops):
+            for x in order:
+                if not free[x]:
+                    continue
+                nxt = x + offset
+                if not free[nxt]:
+                    continue
+                if stops(nxt, x):
+                    table[x] = 1
+                else:
+                    d = table[nxt]
+                    table[x] = d + 1 if d > 0 else d - 1
+
+        def forced(x: int, back: int) -> bool:
+            return (free[x - 1] and not free[back - 1]) or (free[x + 1] and not free[back + 1])
+
+        def vertical_stop(x: int, back: int) -> bool:
+            return up[x] > 0 or down[x] > 0
+
+        # Cada tabela é preenchida a partir da parede para onde o salto segue
+        sweep(up, range(size), -width, forced)
+        sweep(down, range(size - 1, -1, -1), width, forced)
+        sweep(left, range(size), -1, vertical_stop)
+        sweep(right, range(size - 1, -1, -1), 1, vertical_stop)
+        self.tables = (up, down, left, right)
+
+    def distance(self, index: int, direction: int) -> int:
+        return self.tables[direction][index]
+
+def jump_point_search(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    stats: dict = None,
+    tables: bool = False
+) -> Tuple[Path, Dict[Position, float]]:
+    """Busca por pontos de salto (JPS, vizinhança 4) para mapas de custo uniforme.
+
+    Só os pontos de salto entram no heap; os trechos retos entre eles são
+    preenchidos no fim. Com ``tables=True`` os saltos vêm das ``JumpTables``
+    guardadas no ``FlatGrid`` (JPS+), senão são varridos na hora. Retorna o
+    mesmo custo ótimo de ``a_star_search``; em empates o caminho pode ser
+    outro. Levanta ``ValueError`` se o mapa não tiver custo uniforme (ver
+    ``uniform_step``).
+    """
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    inf = float('inf')
+    if not grid.components().reachable(start, goal):
+        if stats is not None:
+            stats['expanded'] = 0
+        return [], inf
+    step_cost = grid.uniform_step(start, goal)
+    if step_cost is None:
+        raise ValueError("a busca por pontos de salto exige custo uniforme fora do início e do objetivo")
+
+    move_cost = grid.move_cost
+    width = grid.width
+    offsets = (-width, width, -1, 1)
+    free = move_cost.__getitem__
+
+    if tables:
+        distance = grid.jump_tables().distance
+    else:
+        def forced(x: int, back: int) -> bool:
+            return ((free(x - 1) != inf and free(back - 1) == inf) or
+                    (free(x + 1) != inf and free(back + 1) == inf))
+
+        def distance(index: int, direction: int) -> int:
+            offset = offsets[direction]
+            steps = 0
+            x = index
+            while True:
+                nxt = x + offset
+                if free(nxt) == inf:
+                    return -steps
+                steps += 1
+                if direction < LEFT:
+                    if forced(nxt, x):
+                        return steps
+                elif distance(nxt, UP) > 0 or distance(nxt, DOWN) > 0:
+                    return steps
+                x = nxt
+
+    source = grid.index(start)
+    target = grid.index(goal)
+    goal_r, goal_c = divmod(target, width)
+
+    def successor(index: int, direction: int):
+        """Próximo ponto de salto (ou o objetivo) e a distância até ele"""
+        d = distance(index, direction)
+        reach = d if d > 0 else -d
+        r, c = divmod(index, width)
+        if direction < LEFT:
+            if c == goal_c:
+                k = (goal_r - r) if direction == DOWN else (r - goal_r)
+                if 0 < k <= reach:
+                    return target, k
+        else:
+            k = (goal_c - c) if direction == RIGHT else (c - goal_c)
+            if 0 < k <= reach:
+                if r == goal_r:
+                    return target, k
+                # Da coluna do objetivo uma reta vertical livre chega até ele
+                if k < reach or d <= 0:
+                    cell = index + k * offsets[direction]
+                    toward = DOWN if goal_r > r else UP
+                    clear = distance(cell, toward)
+                    if clear <= 0 and -clear >= abs(goal_r - r):
+                        return cell, k
+        if d > 0:
+            return index + d * offsets[direction], d
+        return None, 0
+
+    g_score = {source: 0}
+    parent = {source: None}
+    heading = {source: None}
+    closed = set()
+    frontier = [(0, source)]
+    expanded = 0
+    if free(source) == inf:
+        # Início intransitável: as tabelas não saltam dele, então a busca
+        # começa pelas vizinhas transitáveis (o início não paga custo)
+        closed.add(source)
+        frontier = []
+        for offset in offsets:
+            nxt = source + offset
+            if free(nxt) != inf:
+                g_score[nxt] = free(nxt)
+                parent[nxt] = source
+                heading[nxt] = None
+                r, c = divmod(nxt, width)
+                heapq.heappush(frontier, (free(nxt) + step_cost * (abs(r - goal_r) + abs(c - goal_c)), nxt))
+
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue  # Entrada antiga no heap
+        closed.add(current)
+        expanded += 1
+        if current == target:
+            break
+
+        came = heading[current]
+        if came is None:
+            directions = (UP, DOWN, LEFT, RIGHT)
+        elif came >= LEFT:
+            directions = (came, UP, DOWN)
+        else:
+            back = current - offsets[came]
+            directions = [came] + [side for side in (LEFT, RIGHT)
+                                   if free(current + offsets[side]) != inf and free(back + offsets[side]) == inf]
+
+        base = g_score[current]
+        for direction in directions:
+            nxt, steps = successor(current, direction)
+            if nxt is None:
+                continue
+            new_cost = base + steps * step_cost
+            if new_cost < g_score.get(nxt, inf):
+                g_score[nxt] = new_cost
+                parent[nxt] = current
+                heading[nxt] = direction
+                r, c = divmod(nxt, width)
+                heapq.heappush(frontier, (new_cost + step_cost * (abs(r - goal_r) + abs(c - goal_c)), nxt))
+
+    if stats is not None:
+        stats['expanded'] = expanded
+    if target not in closed:
+        return [], inf
+
+    # Preenche as retas entre pontos de salto e acumula os custos reais
+    jumps = [target]
+    while parent[jumps[-1]] is not None:
+        jumps.append(parent[jumps[-1]])
+    jumps.reverse()
+    cells = [source]
+    for a, b in zip(jumps, jumps[1:]):
+        step = (1 if b > a else -1) if abs(b - a) < width else (width if b > a else -width)
+        cells.extend(range(a + step, b + step, step))
+
+    path = [grid.position(i) for i in cells]
+    costs = {}
+    total = 0
+    for k, index in enumerate(cells):
+        if k > 0:
+            total += move_cost[index]
+        costs[path[k]] = total
+    return path, costs
+
+def tiled_search(
+    start: Position,
+    goal: Position,
+    tiled: TiledMap,
+    cost_map: Dict[int, int],
+    stats: dict = None
+) -> Tuple[Path, Dict[Position, float]]:
+    """A* sobre um ``TiledMap`` (.tmap) sem montar a grade inteira.
+
+    Custos e pais ficam em dicionários indexados por ``linha * colunas +
+    coluna``, então a memória cresce com a região explorada e não com o mapa;
+    o terreno vem dos blocos do cache LRU do próprio ``TiledMap``. A
+    heurística é a escalada, com escala e folga tiradas da contagem de
+    terrenos gravada no arquivo. ``stats`` recebe ``'expanded'``,
+    ``'touched'`` (células com custo conhecido) e ``'tile_loads'``.
+    """
+    inf = float('inf')
+    rows, cols = tiled.shape
+    size = tiled.tile_size
+    across = tiled.tiles_across
+    lookup = [cost_map.get(kind, inf) for kind in range(len(tiled.counts))]
+    present = np.flatnonzero(tiled.counts).tolist()
+    positive = [lookup[kind] for kind in present if 0 < lookup[kind] < inf]
+    scale = min(positive) if positive else 0
+    slack = sum(int(tiled.counts[kind]) for kind in present if lookup[kind] == 0)
+    loads = tiled.loads
+
+    # Quase todos os vizinhos estão no bloco da célula anterior
+    last_key = -1
+    last_tile = b''
+
+    def step_cost(r: int, c: int) -> float:
+        nonlocal last_key, last_tile
+        key = (r // size) * across + c // size
+        if key != last_key:
+            last_tile = tiled.tile(key)
+            last_key = key
+        return lookup[last_tile[(r % size) * size + c % size]]
+
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    cost_so_far = {source: 0}
+    came_from = {source: None}
+    frontier = [(0, 0, source)]
+    expanded = 0
+
+    # O objetivo precisa ser transitável (como em Components.reachable)
+    if step_cost(*goal) == inf:
+        frontier = []
+
+    while frontier:
+        _, current_cost, current = heapq.heappop(frontier)
+        if current_cost != cost_so_far[current]:
+            continue  # Entrada antiga no heap
+        expanded += 1
+        if current == target:
+            break
+
+        r, c = divmod(current, cols)
+        for nr, nc in ((r, c + 1), (r + 1, c), (r, c - 1), (r - 1, c)):
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            step = step_cost(nr, nc)
+            if step == inf:
+                continue
+            new_cost = current_cost + step
+            nxt = nr * cols + nc
+            if new_cost < cost_so_far.get(nxt, inf):
+                cost_so_far[nxt] = new_cost
+                came_from[nxt] = current
+                priority = new_cost + heuristic((nr, nc), goal, scale, slack)
+                heapq.heappush(frontier, (priority, new_cost, nxt))
+
+    if stats is not None:
+        stats.update(expanded=expanded, touched=len(cost_so_far), tile_loads=tiled.loads - loads)
+    if target not in came_from:
+        return [], inf
+
+    cells = [target]
+    while cells[-1] != source:
+        cells.append(came_from[cells[-1]])
+    cells.reverse()
+    path = [divmod(index, cols) for index in cells]
+    return path, {pos: cost_so_far[index] for pos, index in zip(path, cells)}
+
+# Cores de cada terreno na visualização
+COLOR_MAP = {
+    GRASS: [0.55, 0.8, 0.3],
+    SAND: [0.77, 0.75, 0.6],
+    FOREST: [0.1, 0.55, 0.1],
+    MOUNTAIN: [0.4, 0.35, 0.15],
+    WATER: [0.33, 0.55, 0.83],
+    DANGEON: [0.12, 0.12, 0.12],
+    LINK: [0.85, 0.5, 0.3],
+    WAY: [1.0, 0.9, 0.9],
+    WALL: [0.7, 0.7, 0.7],
+    PENDANT: [1, 1, 0],
+    LOSTWOOD: [0.8, 0.8, 0],
+    SWORD: [0.8, 0.2, 0.2]
+}
+DEFAULT_COLOR = [0.5, 0.5, 0.5]
+
+# Tabela indexada pelo tipo de terreno, para colorir o mapa inteiro de uma vez
+COLOR_TABLE = np.tile(np.array(DEFAULT_COLOR), (256, 1))
+for _terrain_type, _color in COLOR_MAP.items():
+    COLOR_TABLE[_terrain_type] = _color
+
+# Quadros por segundo padrão da animação (o antigo plt.pause(0.1))
+DEFAULT_FPS = 10
+
+def terrain_colors(map_data, map_size: Tuple[int, int]) -> np.ndarray:
+    """Imagem RGB (linhas x colunas x 3) do terreno"""
+    rows, cols = map_size
+    terrain = np.asarray(map_data)[:rows, :cols]
+    known = (terrain >= 0) & (terrain < len(COLOR_TABLE))
+    return COLOR_TABLE[np.where(known, terrain, len(COLOR_TABLE) - 1)]
+
+# Transparência máxima do mapa de calor sobre o terreno
+HEATMAP_ALPHA = 0.7
+
+def heat_overlay(image: np.ndarray, heatmap) -> np.ndarray:
+    """Mistura ao terreno as expansões por célula (``SearchTrace.heat``) ou um
+    campo de custos (``DistanceField.cost``; células sem caminho ficam de fora)"""
+    rows, cols = image.shape[:2]
+    heat = np.asarray(heatmap, dtype=float)[:rows, :cols]
+    heat = np.where(np.isfinite(heat), heat, 0)
+    peak = heat.max() if heat.size else 0
+    if peak <= 0:
+        return image
+    # Escala logarítmica: as células perto do início são expandidas muito mais
+    level = np.log1p(heat) / np.log1p(peak)
+    from matplotlib import colormaps
+    colors = colormaps['inferno'](level)[..., :3]
+    alpha = (HEATMAP_ALPHA * level)[..., None]
+    return image * (1 - alpha) + colors * alpha
+
+class FrameWriter:
+    """Grava quadros RGBA em GIF (Pillow) ou em vídeo (ffmpeg, pela entrada padrão).
+
+    Quadros repetidos (as pausas da animação) não são duplicados no GIF: só
+    aumenta a duração do último quadro.
+    """
+
+    def __init__(self, output: str, fps: float):
+        self.output = output
+        self.fps = fps
+        self.gif = output.lower().endswith('.gif')
+        self.frames = []
+        self.durations = []
+        self.process = None
+
+    def write(self, rgba: np.ndarray, count: int = 1):
+        if self.gif:
+            from PIL import Image
+            image = Image.fromarray(rgba[..., :3]).quantize(method=Image.Quantize.FASTOCTREE)
+            self.frames.append(image)
+            self.durations.append(1000 / self.fps * count)
+            return
+
+        if self.process is None:
+            import subprocess
+            import matplotlib
+            height, width = rgba.shape[:2]
+            self.process = subprocess.Popen(
+                [matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                 '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}', '-r', str(self.fps),
+                 '-i', '-', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', self.output],
+                stdin=subprocess.PIPE)
+        data = rgba.tobytes()
+        for _ in range(count):
+            self.process.stdin.write(data)
+
+    def close(self):
+        if self.gif and self.frames:
+            self.frames[0].save(self.output, save_all=True, append_images=self.frames[1:],
+                                duration=self.durations, loop=0)
+            self.frames = []
+        elif self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                print(f"ffmpeg terminou com erro ao gravar {self.output}")
+            self.process = None
+
+class JourneyRenderer:
+    """Desenha os trechos da jornada em uma única figura.
+
+    Cada quadro muda só duas células (a posição atual do Link e a anterior,
+    que vira rastro), então o tempo de renderização cresce linearmente com o
+    caminho. Na janela interativa apenas os artistas animados são
+    redesenhados (blit). Com ``output`` a figura é criada sem pyplot, o que
+    funciona em servidores sem tela, e os quadros são gravados em GIF
+    (``.gif``) ou em vídeo pelo ffmpeg (demais extensões).
+
+    O matplotlib só é importado aqui, para que quem usa apenas as buscas
+    (``main --no-plot``, benchmarks, lotes) não pague o custo de carregá-lo.
+    """
+
+    def __init__(self, output: str = None, fps: float = DEFAULT_FPS, dpi: int = 80):
+        from matplotlib.collections import LineCollection
+        from matplotlib.lines import Line2D
+
+        self.output = output
+        self.fps = fps
+        self.interactive = output is None
+        self.shape = None
+        self.im = None
+        self.background = None
+
+        if self.interactive:
+            import matplotlib.pyplot as plt
+            plt.ion()
+            fig, ax = plt.subplots(figsize=(12, 12))
+            mng = plt.get_current_fig_manager()
+            if mng is not None:
+                mng.full_screen_toggle()
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(12, 12), dpi=dpi)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+        self.fig, self.ax = fig, ax
+
+        # Configurações do plot
+        ax.set_title('Jornada de Link', pad=20, fontsize=16, weight='bold')
+        fig.subplots_adjust(top=0.9, bottom=0.15, left=0.1, right=0.75)
+
+        # Adicionar legenda
+        legend_elements = [
+            Line2D([0], [0], marker='o', color='w', label='Link (Início)',
+                      markerfacecolor=COLOR_MAP[LINK], markersize=10),
+            Line2D([0], [0], marker='o', color='w', label='Master Sword (Objetivo)',
+                      markerfacecolor=COLOR_MAP[SWORD], markersize=10),
+            Line2D([0], [0], marker='o', color='w', label='Pingente da Virtude',
+                      markerfacecolor=COLOR_MAP[PENDANT], markersize=10),
+            Line2D([0], [0], marker='o', color='w', label='Lost Woods',
+                      markerfacecolor=COLOR_MAP[LOSTWOOD], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Grama (Custo: 10)',
+                      markerfacecolor=COLOR_MAP[GRASS], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Areia (Custo: 20)',
+                      markerfacecolor=COLOR_MAP[SAND], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Floresta (Custo: 100)',
+                      markerfacecolor=COLOR_MAP[FOREST], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Montanha (Custo: 150)',
+                      markerfacecolor=COLOR_MAP[MOUNTAIN], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Água (Custo: 180)',
+                      markerfacecolor=COLOR_MAP[WATER], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Masmorra',
+                      markerfacecolor=COLOR_MAP[DANGEON], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Caminho (Masmorra)',
+                      markerfacecolor=COLOR_MAP[WAY], markersize=10),
+            Line2D([0], [0], marker='s', color='w', label='Parede (Intransponível)',
+                      markerfacecolor=COLOR_MAP[WALL], markersize=10)
+        ]
+
+        ax.legend(handles=legend_elements, bbox_to_anchor=(1.05, 1),
+                  loc='upper left', borderaxespad=0., title="Legenda:")
+
+        ax.set_xticklabels([])
+        ax.set_yticklabels([])
+        ax.tick_params(axis='both', which='both', length=0)
+
+        # Linhas para as bordas: uma só coleção, desenhada por cima da imagem
+        self.grid_lines = LineCollection([], colors='black', linestyles='-', linewidths=1, animated=True)
+        ax.add_collection(self.grid_lines)
+
+        # Textos de custo e barra de progresso: mudam a cada quadro
+        self.current_cost_text = ax.text(-0.015, 0.98, 'Custo Atual: 0', ha='right', va='top',
+                                         color='white', fontsize=14, weight='bold', animated=True,
+                                         bbox=dict(facecolor='black', alpha=0.8, edgecolor='white', boxstyle='round,pad=0.5'))
+
+        self.total_cost_text = ax.text(-0.015, 0.94, 'Custo Total: 0', ha='right', va='top',
+                                       color='white', fontsize=14, weight='bold', animated=True,
+                                       bbox=dict(facecolor='black', alpha=0.8, edgecolor='white', boxstyle='round,pad=0.5'))
+
+        self.progress_text = ax.text(0.5, -0.05, 'Preparando jornada...', ha='center', va='top',
+                                     color='black', fontsize=12, weight='bold', animated=True,
+                                     transform=ax.transAxes)
+
+        self.writer = FrameWriter(output, fps) if output else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def show_map(self, image: np.ndarray):
+        """Troca o mapa exibido (o tamanho pode mudar entre mapa e masmorra)"""
+        rows, cols = image.shape[:2]
+        if self.im is None:
+            self.im = self.ax.imshow(image, interpolation='nearest', animated=True)
+        else:
+            self.im.set_data(image)
+        if self.shape != (rows, cols):
+            self.shape = (rows, cols)
+            self.im.set_extent((-0.5, cols - 0.5, rows - 0.5, -0.5))
+            self.ax.set_xticks(np.arange(-.5, cols, 1))
+            self.ax.set_yticks(np.arange(-.5, rows, 1))
+            self.grid_lines.set_segments(
+                [[(x, -0.5), (x, rows - 0.5)] for x in np.arange(-.5, cols, 1)] +
+                [[(-0.5, y), (cols - 0.5, y)] for y in np.arange(-.5, rows, 1)])
+        # O fundo estático (eixos, grade, legenda) é desenhado uma vez por mapa
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def frame(self, seconds: float):
+        """Mostra o quadro atual por ``seconds`` segundos"""
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in (self.im, self.grid_lines, self.current_cost_text, self.total_cost_text, self.progress_text):
+            self.ax.draw_artist(artist)
+        if self.interactive:
+            canvas.blit(self.fig.bbox)
+            canvas.flush_events()
+            canvas.start_event_loop(seconds)
+        else:
+            self.writer.write(np.asarray(canvas.buffer_rgba()), max(1, round(seconds * self.fps)))
+
+    def draw_leg(self, map_data, map_size: Tuple[int, int], path: Path = None,
+                 cost: Dict[Position, int] = {}, total_cost: int = 0, heatmap=None):
+        grid = terrain_colors(map_data, map_size)
+        if heatmap is not None:
+            grid = heat_overlay(grid, heatmap)
+        current_grid = grid.copy()
+        self.show_map(current_grid)
+        self.current_cost_text.set_text('Custo Atual: 0')
+        self.total_cost_text.set_text(f'Custo Total: {total_cost}')
+        self.progress_text.set_text('Preparando jornada...')
+        self.frame(0.5)
+
+        if not path:
+            return
+
+        link_color = np.array(COLOR_MAP[LINK])
+        step_seconds = 1 / self.fps
         for i, (r, c) in enumerate(path):
-            current_grid = np.copy(grid)
-            
+            # A célula anterior vira rastro; o gradiente vai do início (mais
+            # escuro) ao fim do caminho, calculado uma única vez por célula
+            if i > 0:
+                pr, pc = path[i - 1]
+                current_grid[pr, pc] = np.clip(link_color * (0.5 + 0.5 * (i - 1) / len(path)), 0, 1)
+
             # Atualizar posição do Link
-            current_grid[r, c] = color_map[LINK]
-            
-            # Desenhar caminho com gradiente
-            for step, (pr, pc) in enumerate(path[:i]):
-                intensity = 0.5 + 0.5*(step/i) if i > 0 else 1
-                current_grid[pr, pc] = np.clip(np.array(color_map[LINK]) * intensity, 0, 1)
-            
+            current_grid[r, c] = link_color
+
             # Atualizar custos
             current_cost = cost.get((r, c), 0)
-            current_cost_text.set_text(f'Custo Atual: {current_cost}')
-            total_cost_text.set_text(f'Custo Total: {total_cost + current_cost}')
-            
+            self.current_cost_text.set_text(f'Custo Atual: {current_cost}')
+            self.total_cost_text.set_text(f'Custo Total: {total_cost + current_cost}')
+
             # Atualizar progresso
             progress = (i+1)/len(path)*100
-            progress_text.set_text(f'Progresso: {progress:.1f}% - Etapa {i+1}/{len(path)}')
-            
-            # Atualizar visualização
-            im.set_data(current_grid)
-            fig.canvas.draw_idle()
-            plt.pause(0.1)
-        
+            self.progress_text.set_text(f'Progresso: {progress:.1f}% - Etapa {i+1}/{len(path)}')
+
+            self.im.set_data(current_grid)
+            self.frame(step_seconds)
+
         # Mostrar caminho completo no final
         for r, c in path:
-            grid[r, c] = color_map[LINK]
-        
-        im.set_data(grid)
-        fig.canvas.draw_idle()
-        plt.pause(2)
-    
-    plt.ioff()
-    plt.close(fig)
+            grid[r, c] = link_color
+        self.im.set_data(grid)
+        self.frame(2)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.interactive:
+            import matplotlib.pyplot as plt
+            plt.ioff()
+            plt.close(self.fig)
+
+def plot_map(map_data: TerrainMap, map_size: Tuple[int, int], path: Path = None, 
+             cost: dict[Position, int] = {}, total_cost: int = 0, renderer: JourneyRenderer = None,
+             heatmap=None):
+    """Anima Link percorrendo ``path``; sem ``renderer`` abre e fecha uma janela própria.
+
+    ``heatmap`` (por exemplo ``SearchTrace.heat``) pinta as células pelo
+    número de vezes que a busca as expandiu.
+    """
+    if renderer is not None:
+        renderer.draw_leg(map_data, map_size, path, cost, total_cost, heatmap)
+        return
+    with JourneyRenderer() as renderer:
+        renderer.draw_leg(map_data, map_size, path, cost, total_cost, heatmap)
 
 def loading_map(filename):
-    map_data = []
-    link_position = Position
-    pendants_position = Position
-    lostWoods_position = Position
-    dungeons_position = []
+    """Retorna (mapa, posição do Link, masmorras + Lost Woods, pingente).
 
+    Aceita mapas .txt e .hmap; o mapa é o array numpy de ``load_map``, que as
+    buscas e ``plot_map`` usam direto, sem montar listas aninhadas. Um .tmap
+    devolve o ``TiledMap``, que só ``a_star_search`` aceita e que deve ser
+    fechado com ``close()``.
+    """
     try:
-        with open(filename, 'r') as f:
-            for row_index, line in enumerate(f):
-                lines = line.strip().split(' ')
-                process_lines = []
-
-                for col_index, element_str in enumerate(lines):
-                    try:
-                        element_int = int(element_str)
-                        process_lines.append(element_int)
-
-                        if element_int == 9: # Link
-                            link_position = (row_index, col_index)
-                        elif element_int == 8: # Pingente
-                            pendants_position = (row_index, col_index)
-                        elif element_int == 7: # Masmorra
-                            dungeons_position.append((row_index, col_index))
-                        elif element_int == 11: #Lost Wood
-                            lostWoods_position = (row_index, col_index)
-
-                    except ValueError:
-                        print(f"Não foi possível converter '{element_str}' para inteiro na linha {row_index}, coluna {col_index}")
-                        process_lines.append(22)
-
-                map_data.append(process_lines)
-        
-        dungeons_position.reverse()
-        dungeons_position.append(lostWoods_position)        
-        return map_data, link_position, dungeons_position, pendants_position
-
+        info = load_map(filename)
     except Exception as e:
         print(f"Ocorreu um erro ao ler o arquivo: {e}")
         return None
+    return info.terrain, info.link, info.targets(), info.pendant
 
 def main():
+    parser = argparse.ArgumentParser(description="Jornada de Link pelos pingentes até a Master Sword")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--video', help="grava a jornada em GIF (.gif) ou vídeo (.mp4) sem abrir janela")
+    output.add_argument('--no-plot', action='store_true',
+                        help="só calcula e imprime a jornada, sem gráficos e sem perguntas")
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS, help="quadros por segundo da animação")
+    parser.add_argument('--world', action='store_true',
+                        help="planeja a jornada inteira no grafo do mundo (ordem das masmorras otimizada)")
+    args = parser.parse_args()
+
+    cache = PathCache(a_star_search, filename=PATH_CACHE_FILE)
+
+    def run(renderer: JourneyRenderer = None, plot: bool = True):
+        if args.world:
+            world_journey(renderer, plot)
+        else:
+            journey(cache, renderer, plot)
+
+    try:
+        if args.no_plot:
+            run(plot=False)
+        else:
+            with JourneyRenderer(output=args.video, fps=args.fps) as renderer:
+                run(renderer)
+    finally:
+        cache.save()
+
+def confirm(question: str, renderer: JourneyRenderer = None) -> bool:
+    """Pergunta S/N ao jogador.
+
+    Gravando vídeo (``renderer.output``) ou sem terminal na entrada padrão
+    não há a quem perguntar: segue como se a resposta fosse 'S'.
+    """
+    if (renderer is not None and renderer.output) or not sys.stdin.isatty():
+        return True
+    try:
+        return input(question).strip().upper() == 'S'
+    except EOFError:
+        return True
+
+def print_victory(sword_position: Position, total_cost: float):
+    print("\n=== MISSÃO CUMPRIDA ===")
+    print(f"Todos os pingentes foram coletados!")
+    print(f"Master Sword obtida em {sword_position}")
+    print(f"Custo total da jornada: {total_cost}")
+    print("O Reino de Hyrule está salvo!\n")
+
+def world_journey(renderer: JourneyRenderer = None, plot: bool = True):
+    """Jornada planejada em uma única chamada sobre ``worldGraph.WorldGraph``.
+
+    Todos os mapas são lidos uma vez; a ordem das masmorras é a de menor
+    custo e cada trecho é desenhado (ou impresso, com ``plot=False``) no
+    nível em que acontece.
+    """
+    from worldGraph import WorldGraph
+
+    try:
+        world = WorldGraph(cost_map=COST_MAP)
+    except Exception as e:
+        print(f"Erro ao carregar os mapas do mundo: {e}")
+        return
+    if world.levels[0].sword is None or world.levels[0].lost_woods is None:
+        print("Lost Woods ou Master Sword não encontrada no mapa!")
+        return
+
+    pendants = world.pendants
+    route = world.plan(pendants, [world.lost_woods, world.sword])
+    if route is None:
+        print("Não foi possível encontrar uma rota pelos pingentes até a Master Sword.")
+        return
+    print(f"Ordem das masmorras: {tuple(pendants[k][0] for k in route.order)}")
+
+    for level, path, costs, before in route.segments():
+        if plot:
+            plot_map(world.levels[level].terrain, world.level_size(level), path, costs, before, renderer)
+        else:
+            name = "Mapa principal" if level == 0 else f"Masmorra {level}"
+            print(f"{name}: {path[0]} -> {path[-1]}: {len(path) - 1} passos, custo {costs[path[-1]]}")
+
+    print_victory(world.levels[0].sword, route.cost)
+
+def journey(cache: PathCache, renderer: JourneyRenderer = None, plot: bool = True):
+    """Percorre a jornada completa.
+
+    Com ``plot=False`` nada é desenhado nem perguntado: cada trecho é
+    impresso com seu número de passos e custo, na ordem da jornada.
+    """
     total_cost = 0
-    main_map_data, link_position, dungeons_position, _ = loading_map("mainMap.txt")
-    
-    # Encontra a posição da Master Sword (12)
-    sword_position = None
-    for i in range(len(main_map_data)):
-        for j in range(len(main_map_data[0])):
-            if main_map_data[i][j] == SWORD:  # 12 representa a Master Sword
-                sword_position = (i, j)
-                break
-        if sword_position:
-            break
 
+    def show_leg(label: str, map_data, map_size, path: Path, cost, leg_cost):
+        if plot:
+            plot_map(map_data, map_size, path, cost, total_cost, renderer)
+        else:
+            print(f"{label}: {len(path) - 1} passos, custo {leg_cost}")
+
+    main_map = load_map("mainMap.txt")
+    main_map_data = main_map.terrain
+    link_position = main_map.link
+    dungeons_position = main_map.targets()
+    main_key = cache.map_key(main_map_data, "mainMap.txt")
+
+    # Posição da Master Sword (12), encontrada junto com as demais células especiais
+    sword_position = main_map.sword
     if not sword_position:
         print("Posição da Master Sword não encontrada no mapa!")
         return
@@ -308,82 +1921,77 @@ def main():
     # Coletar pingentes nas 3 masmorras (excluindo Lost Woods da lista)
     for i, dungeon in enumerate(dungeons_position[:3], start=1):  # Pega apenas as 3 primeiras posições
         # Encontra caminho até a masmorra
-        test_path, test_cost = a_star_search(link_position, dungeon, main_map_data, COST_MAP)
+        test_path, test_cost = cache.search(link_position, dungeon, main_map_data, COST_MAP, main_key)
         
         if test_path:
-            plot_map(main_map_data, MAIN_MAP_SIZE, test_path, test_cost, total_cost)
+            show_leg(f"{link_position} -> Masmorra {i} {dungeon}", main_map_data, MAIN_MAP_SIZE,
+                     test_path, test_cost, test_cost.get(dungeon, 0))
             total_cost += test_cost.get(dungeon, 0)
         else:
             print(f"Não foi possível encontrar caminho para a Masmorra {i}.")
             return
 
         # Entrar na masmorra
-        proceed = input(f"Caminho para Masmorra {i} encontrado. Entrar na masmorra? (S/N): ").strip().upper()
-        if proceed != 'S':
+        if plot and not confirm(f"Caminho para Masmorra {i} encontrado. Entrar na masmorra? (S/N): ", renderer):
             print("Jornada abortada pelo herói.")
             return
 
-        dungeon_map_data, link_position_dungeon, _, pendant_pos = loading_map(f"dungeonMap{i}.txt")
-        if not dungeon_map_data:
-            print(f"Erro ao carregar mapa da Masmorra {i}.")
+        dungeon_file = f"dungeonMap{i}.txt"
+        try:
+            dungeon_map = load_map(dungeon_file)
+        except Exception as e:
+            print(f"Erro ao carregar mapa da Masmorra {i}: {e}")
             return
+        dungeon_map_data = dungeon_map.terrain
 
-        # Caminho até o pingente
-        pendant_path, pendant_cost = a_star_search(link_position_dungeon, pendant_pos, dungeon_map_data, COST_MAP)
-        if pendant_path:
-            plot_map(dungeon_map_data, DUNGEON_MAP_SIZE, pendant_path, pendant_cost, total_cost)
-            total_cost += pendant_cost.get(pendant_pos, 0)
-        else:
+        # Ida e volta vêm da tabela gravada ao lado do mapa (uma busca por masmorra)
+        route = dungeon_route(dungeon_file, a_star_search, COST_MAP, dungeon_map)
+        if not route.path_in:
             print(f"Não foi possível encontrar o pingente na Masmorra {i}.")
             return
-
-        # Voltar para entrada da masmorra
-        exit_path, exit_cost = a_star_search(pendant_pos, link_position_dungeon, dungeon_map_data, COST_MAP)
-        if exit_path:
-            plot_map(dungeon_map_data, DUNGEON_MAP_SIZE, exit_path, exit_cost, total_cost)
-            total_cost += exit_cost.get(link_position_dungeon, 0)
-        else:
+        if route.cost_out == float('inf'):
             print(f"Não foi possível sair da Masmorra {i}.")
             return
+        pendant_cost, exit_cost = route.leg_costs(dungeon_map_data, COST_MAP)
+
+        # Caminho até o pingente
+        show_leg(f"Masmorra {i}: entrada -> pingente", dungeon_map_data, DUNGEON_MAP_SIZE,
+                 route.path_in, pendant_cost, route.cost_in)
+        total_cost += route.cost_in
+
+        # Voltar para entrada da masmorra
+        show_leg(f"Masmorra {i}: pingente -> entrada", dungeon_map_data, DUNGEON_MAP_SIZE,
+                 route.path_out, exit_cost, route.cost_out)
+        total_cost += route.cost_out
 
         # Atualiza posição do Link para a entrada da masmorra
         link_position = dungeon
 
     # 1. Primeiro ir para Lost Woods (11)
-    lost_woods_pos = None
-    for i in range(len(main_map_data)):
-        for j in range(len(main_map_data[0])):
-            if main_map_data[i][j] == LOSTWOOD:
-                lost_woods_pos = (i, j)
-                break
-        if lost_woods_pos:
-            break
-
+    lost_woods_pos = main_map.lost_woods
     if not lost_woods_pos:
         print("Posição de Lost Woods não encontrada no mapa!")
         return
 
     # Caminho até Lost Woods
-    lw_path, lw_cost = a_star_search(link_position, lost_woods_pos, main_map_data, COST_MAP)
+    lw_path, lw_cost = cache.search(link_position, lost_woods_pos, main_map_data, COST_MAP, main_key)
     if lw_path:
-        plot_map(main_map_data, MAIN_MAP_SIZE, lw_path, lw_cost, total_cost)
+        show_leg(f"{link_position} -> Lost Woods {lost_woods_pos}", main_map_data, MAIN_MAP_SIZE,
+                 lw_path, lw_cost, lw_cost.get(lost_woods_pos, 0))
         total_cost += lw_cost.get(lost_woods_pos, 0)
     else:
         print("Não foi possível encontrar caminho para Lost Woods.")
         return
 
     # 2. Depois ir da Lost Woods até a Master Sword (12)
-    sword_path, sword_cost = a_star_search(lost_woods_pos, sword_position, main_map_data, COST_MAP)
+    sword_path, sword_cost = cache.search(lost_woods_pos, sword_position, main_map_data, COST_MAP, main_key)
     if sword_path:
-        plot_map(main_map_data, MAIN_MAP_SIZE, sword_path, sword_cost, total_cost)
+        show_leg(f"Lost Woods -> Master Sword {sword_position}", main_map_data, MAIN_MAP_SIZE,
+                 sword_path, sword_cost, sword_cost.get(sword_position, 0))
         total_cost += sword_cost.get(sword_position, 0)
         
         # Saída final
-        print("\n=== MISSÃO CUMPRIDA ===")
-        print(f"Todos os pingentes foram coletados!")
-        print(f"Master Sword obtida em {sword_position}")
-        print(f"Custo total da jornada: {total_cost}")
-        print("O Reino de Hyrule está salvo!\n")
+        print_victory(sword_position, total_cost)
     else:
         print("Não foi possível encontrar caminho da Lost Woods para a Master Sword.")
         
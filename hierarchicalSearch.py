@@ -0,0 +1,387 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from heuristicSearchComplete import (
+    COST_MAP, DEFAULT_LANDMARKS, FlatGrid, Path, Position
+)
+
+# =============================================
+# Busca Hierárquica (estilo HPA*)
+# =============================================
+#
+# O mapa é dividido em clusters quadrados. Nas bordas entre clusters vizinhos
+# as sequências de células transitáveis viram entradas (nós abstratos), e os
+# custos entre entradas de um mesmo cluster são pré-calculados uma única vez.
+# Uma consulta liga início e objetivo às entradas dos seus clusters, busca no
+# grafo abstrato e só refina os trechos de cluster que o caminho usa.
+
+DEFAULT_CLUSTER_SIZE = 16
+
+# Sequências de borda a partir deste tamanho recebem duas entradas (nas pontas)
+LONG_ENTRANCE = 6
+
+def cluster_distances(costs: np.ndarray, sources: List[Position]) -> np.ndarray:
+    """Custos de cada origem a todas as células de um bloco, em lote.
+
+    Varre as quatro direções com operações vetorizadas sobre todas as origens
+    até estabilizar; ``costs`` tem ``inf`` nas células intransitáveis.
+    """
+    dist = np.full((len(sources),) + costs.shape, np.inf)
+    for i, (r, c) in enumerate(sources):
+        dist[i, r, c] = 0
+
+    rows, cols = costs.shape
+    while True:
+        previous = dist.copy()
+        # Varreduras em cada direção propagam a frente por toda a linha/coluna
+        for r in range(1, rows):
+            np.minimum(dist[:, r], dist[:, r - 1] + costs[r], out=dist[:, r])
+        for r in range(rows - 2, -1, -1):
+            np.minimum(dist[:, r], dist[:, r + 1] + costs[r], out=dist[:, r])
+        for c in range(1, cols):
+            np.minimum(dist[:, :, c], dist[:, :, c - 1] + costs[:, c], out=dist[:, :, c])
+        for c in range(cols - 2, -1, -1):
+            np.minimum(dist[:, :, c], dist[:, :, c + 1] + costs[:, c], out=dist[:, :, c])
+        if np.array_equal(dist, previous):
+            return dist
+
+class HierarchicalGrid:
+    """Grafo abstrato de um ``FlatGrid`` para consultas em mapas grandes"""
+
+    def __init__(self, grid: FlatGrid, cluster_size: int = DEFAULT_CLUSTER_SIZE):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = (grid.rows + cluster_size - 1) // cluster_size
+        self.cluster_cols = (grid.cols + cluster_size - 1) // cluster_size
+
+        # Cluster de cada índice da grade achatada (-1 na borda)
+        labels = np.full((grid.rows + 2, grid.width), -1, dtype=np.int64)
+        row_cluster = (np.arange(grid.rows) // cluster_size) * self.cluster_cols
+        col_cluster = np.arange(grid.cols) // cluster_size
+        labels[1:-1, 1:-1] = row_cluster[:, None] + col_cluster[None, :]
+        self.cluster_of = labels.ravel().tolist()
+
+        self.nodes_in = {}  # cluster -> entradas
+        self.edges = {}     # entrada -> {vizinho: custo}
+        self.build_entrances()
+        self.build_intra_edges()
+
+    # ---------------------------------------------
+    # Pré-processamento
+    # ---------------------------------------------
+
+    def add_node(self, index: int):
+        if index not in self.edges:
+            self.edges[index] = {}
+            self.nodes_in.setdefault(self.cluster_of[index], []).append(index)
+
+    def add_transition(self, a: int, b: int):
+        """Liga duas células vizinhas de clusters diferentes (custo da célula de entrada)"""
+        move_cost = self.grid.move_cost
+        self.add_node(a)
+        self.add_node(b)
+        self.edges[a][b] = move_cost[b]
+        self.edges[b][a] = move_cost[a]
+
+    def add_run(self, run: List[Tuple[int, int]]):
+        if len(run) >= LONG_ENTRANCE:
+            self.add_transition(*run[0])
+            self.add_transition(*run[-1])
+        else:
+            self.add_transition(*run[len(run) // 2])
+
+    def build_entrances(self):
+        grid = self.grid
+        inf = float('inf')
+        move_cost = grid.move_cost
+        size = self.cluster_size
+
+        # Bordas verticais (entre colunas de clusters)
+        for c in range(size, grid.cols, size):
+            run = []
+            for r in range(grid.rows):
+                a = grid.index((r, c - 1))
+                b = a + 1
+                open_pair = move_cost[a] != inf and move_cost[b] != inf
+                if open_pair and (not run or r % size != 0):
+                    run.append((a, b))
+                    continue
+                if run:
+                    self.add_run(run)
+                run = [(a, b)] if open_pair else []
+            if run:
+                self.add_run(run)
+
+        # Bordas horizontais (entre linhas de clusters)
+        for r in range(size, grid.rows, size):
+            run = []
+            for c in range(grid.cols):
+                a = grid.index((r - 1, c))
+                b = a + grid.width
+                open_pair = move_cost[a] != inf and move_cost[b] != inf
+                if open_pair and (not run or c % size != 0):
+                    run.append((a, b))
+                    continue
+                if run:
+                    self.add_run(run)
+                run = [(a, b)] if open_pair else []
+            if run:
+                self.add_run(run)
+
+    def build_intra_edges(self):
+        grid = self.grid
+        costs = grid.costs.reshape(grid.rows + 2, grid.width)
+        size = self.cluster_size
+        for cluster, nodes in self.nodes_in.items():
+            row0 = (cluster // self.cluster_cols) * size
+            col0 = (cluster % self.cluster_cols) * size
+            block = costs[row0 + 1:row0 + 1 + size, col0 + 1:col0 + 1 + size]
+            local = [grid.position(n) for n in nodes]
+            dist = cluster_distances(block, [(r - row0, c - col0) for r, c in local])
+            for i, node in enumerate(nodes):
+                for j, other in enumerate(nodes):
+                    value = dist[i, local[j][0] - row0, local[j][1] - col0].item()
+                    if i != j and value != float('inf'):
+                        self.edges[node][other] = int(value) if grid.integral else value
+
+    # ---------------------------------------------
+    # Buscas restritas a um cluster
+    # ---------------------------------------------
+
+    def cluster_dijkstra(self, source: int, cluster: int, reverse: bool = False) -> Dict[int, float]:
+        """Custos de ``source`` às células do cluster (ou delas até ``source``)"""
+        inf = float('inf')
+        move_cost = self.grid.move_cost
+        offsets = self.grid.offsets
+        cluster_of = self.cluster_of
+        dist = {source: 0}
+        frontier = [(0, source)]
+
+        while frontier:
+            current_cost, current = heapq.heappop(frontier)
+            if current_cost != dist[current]:
+                continue
+            for offset in offsets:
+                nxt = current + offset
+                if cluster_of[nxt] != cluster or move_cost[nxt] == inf:
+                    continue
+                new_cost = current_cost + (move_cost[current] if reverse else move_cost[nxt])
+                if new_cost < dist.get(nxt, inf):
+                    dist[nxt] = new_cost
+                    heapq.heappush(frontier, (new_cost, nxt))
+        return dist
+
+    def restricted_search(
+        self,
+        source: int,
+        target: int,
+        cluster: Optional[int] = None,
+        upper: float = float('inf'),
+        stats: dict = None
+    ) -> Tuple[List[int], float]:
+        """A* de ``source`` a ``target`` dentro de ``cluster`` (ou no mapa todo).
+
+        Estados com f acima de ``upper`` são descartados: com ``upper`` igual a
+        um custo já conhecido a busca continua exata e expande menos.
+        """
+        inf = float('inf')
+        grid = self.grid
+        move_cost = grid.move_cost
+        offsets = grid.offsets
+        cluster_of = self.cluster_of
+        h = grid.heuristic_fn(target)
+
+        g_score = {source: 0}
+        parent = {source: None}
+        frontier = [(h(source), source)]
+        expanded = 0
+
+        while frontier:
+            _, current = heapq.heappop(frontier)
+            if current == target:
+                break
+            expanded += 1
+            base = g_score[current]
+            for offset in offsets:
+                nxt = current + offset
+                step = move_cost[nxt]
+                if step == inf or (cluster is not None and cluster_of[nxt] != cluster):
+                    continue
+                new_cost = base + step
+                if new_cost < g_score.get(nxt, inf):
+                    priority = new_cost + h(nxt)
+                    if priority > upper:
+                        continue
+                    g_score[nxt] = new_cost
+                    parent[nxt] = current
+                    heapq.heappush(frontier, (priority, nxt))
+
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + expanded
+        if target not in parent:
+            return [], inf
+
+        cells = []
+        current = target
+        while current is not None:
+            cells.append(current)
+            current = parent[current]
+        cells.reverse()
+        return cells, g_score[target]
+
+    # ---------------------------------------------
+    # Consultas
+    # ---------------------------------------------
+
+    def abstract_search(self, source: int, target: int, stats: dict) -> Tuple[List[int], float]:
+        """A* no grafo abstrato com início e objetivo ligados temporariamente"""
+        inf = float('inf')
+        source_cluster = self.cluster_of[source]
+        target_cluster = self.cluster_of[target]
+
+        start_costs = self.cluster_dijkstra(source, source_cluster)
+        start_edges = {n: start_costs[n] for n in self.nodes_in.get(source_cluster, []) if n in start_costs}
+        if source_cluster == target_cluster and target in start_costs:
+            start_edges[target] = start_costs[target]
+
+        # Um início intransitável não é entrada, mas sai sem pagar para vizinhas
+        # de outros clusters: liga-o às entradas (e ao objetivo) desses clusters
+        move_cost = self.grid.move_cost
+        if move_cost[source] == inf:
+            for offset in self.grid.offsets:
+                first = source + offset
+                cluster = self.cluster_of[first]
+                if cluster in (-1, source_cluster) or move_cost[first] == inf:
+                    continue
+                reach = self.cluster_dijkstra(first, cluster)
+                ends = [n for n in self.nodes_in.get(cluster, []) if n in reach]
+                if cluster == target_cluster and target in reach:
+                    ends.append(target)
+                for n in ends:
+                    cost = move_cost[first] + reach[n]
+                    if cost < start_edges.get(n, inf):
+                        start_edges[n] = cost
+
+        goal_costs = self.cluster_dijkstra(target, target_cluster, reverse=True)
+        goal_edges = {n: goal_costs[n] for n in self.nodes_in.get(target_cluster, []) if n in goal_costs}
+
+        h = self.grid.heuristic_fn(target)
+        g_score = {source: 0}
+        parent = {source: None}
+        frontier = [(h(source), 0, source)]
+        expanded = 0
+
+        while frontier:
+            _, base, current = heapq.heappop(frontier)
+            if base != g_score[current]:
+                continue  # Entrada antiga
+            if current == target:
+                break
+            expanded += 1
+
+            candidates = list(self.edges.get(current, {}).items())
+            if current == source:
+                candidates.extend(start_edges.items())
+            if current in goal_edges:
+                candidates.append((target, goal_edges[current]))
+
+            for nxt, step in candidates:
+                new_cost = base + step
+                if new_cost < g_score.get(nxt, inf):
+                    g_score[nxt] = new_cost
+                    parent[nxt] = current
+                    heapq.heappush(frontier, (new_cost + h(nxt), new_cost, nxt))
+
+        stats['abstract_expanded'] = expanded
+        if target not in parent:
+            return [], inf
+
+        nodes = []
+        current = target
+        while current is not None:
+            nodes.append(current)
+            current = parent[current]
+        nodes.reverse()
+        return nodes, g_score[target]
+
+    def lower_bound(self, source: int, target: int) -> float:
+        """Limite inferior do custo ótimo (ALT se os marcos já existirem)"""
+        mode = 'alt' if DEFAULT_LANDMARKS in self.grid.landmark_cache else 'scaled'
+        return self.grid.heuristic_fn(target, mode)(source)
+
+    def search(
+        self,
+        start: Position,
+        goal: Position,
+        exact: bool = False,
+        stats: dict = None
+    ) -> Tuple[Path, Dict[Position, float]]:
+        """Caminho e custos acumulados de ``start`` a ``goal``.
+
+        O caminho hierárquico pode ser um pouco pior que o ótimo; ``stats``
+        recebe o custo, o limite inferior do ótimo e o fator ``bound`` (custo
+        dividido pelo limite inferior), que limita essa diferença. Com
+        ``exact=True`` o custo abstrato é usado como limite superior de uma
+        busca A* exata no mapa todo.
+        """
+        if stats is None:
+            stats = {}
+        grid = self.grid
+        source = grid.index(start)
+        target = grid.index(goal)
+
+        nodes, abstract_cost = self.abstract_search(source, target, stats)
+        stats['refined_segments'] = 0
+        if not nodes:
+            if not grid.components().reachable(start, goal):
+                stats.update(cost=float('inf'), lower_bound=float('inf'), bound=1.0)
+                return [], float('inf')
+            # O grafo abstrato não achou um caminho que existe: busca exata sem limite
+            exact = True
+
+        if exact:
+            cells, cost = self.restricted_search(source, target, upper=abstract_cost, stats=stats)
+        else:
+            cells = [source]
+            cost = abstract_cost
+            for a, b in zip(nodes, nodes[1:]):
+                if self.cluster_of[a] != self.cluster_of[b] and b in self.edges.get(a, {}):
+                    cells.append(b)  # Transição entre clusters vizinhos
+                    continue
+                # Do início intransitável o trecho pode seguir no cluster vizinho
+                cluster = self.cluster_of[b] if a == source else self.cluster_of[a]
+                segment, _ = self.restricted_search(a, b, cluster, stats=stats)
+                cells.extend(segment[1:])
+                stats['refined_segments'] += 1
+
+        lower = self.lower_bound(source, target)
+        stats['cost'] = cost
+        stats['lower_bound'] = lower
+        if exact or cost == 0:
+            stats['bound'] = 1.0
+        else:
+            stats['bound'] = cost / lower if lower > 0 else float('inf')
+
+        path = [grid.position(i) for i in cells]
+        step_costs = {}
+        total = 0
+        for i, index in enumerate(cells):
+            if i > 0:
+                total += grid.move_cost[index]
+            step_costs[path[i]] = total
+        return path, step_costs
+
+def hierarchical_search(
+    start: Position,
+    goal: Position,
+    terrain_map,
+    cost_map: Dict[int, int] = COST_MAP,
+    cluster_size: int = DEFAULT_CLUSTER_SIZE,
+    exact: bool = False,
+    stats: dict = None
+) -> Tuple[Path, Dict[Position, float]]:
+    """Atalho para uma consulta; para várias, reutilize um ``HierarchicalGrid``"""
+    grid = terrain_map if isinstance(terrain_map, FlatGrid) else FlatGrid(terrain_map, cost_map)
+    return HierarchicalGrid(grid, cluster_size).search(start, goal, exact, stats)
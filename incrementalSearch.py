@@ -0,0 +1,228 @@
+import heapq
+from typing import Dict, Tuple
+
+import numpy as np
+
+from heuristicSearchComplete import COST_MAP, FlatGrid, Path, Position
+
+# =============================================
+# Replanejamento Incremental (D* Lite)
+# =============================================
+#
+# A busca é feita do objetivo para o início: g[s] é o custo de s até o
+# objetivo e rhs[s] a estimativa um passo à frente. Quando o terreno muda,
+# só os vizinhos das células alteradas são reavaliados e a árvore de caminhos
+# é reparada, em vez de refazer a busca inteira.
+
+class IncrementalPlanner:
+    """Planejador ligado a um mapa que aceita edições de células.
+
+    ``plan()`` retorna ``(caminho, custos acumulados)`` no mesmo formato de
+    ``a_star_search``. Se o mapa foi passado como lista, as edições também são
+    escritas nele, para que ``plot_map`` mostre o terreno atual.
+    """
+
+    def __init__(
+        self,
+        terrain_map,
+        start: Position,
+        goal: Position,
+        cost_map: Dict[int, int] = COST_MAP
+    ):
+        if isinstance(terrain_map, FlatGrid):
+            self.grid = terrain_map
+            self.terrain_map = None
+        else:
+            self.grid = FlatGrid(terrain_map, cost_map)
+            self.terrain_map = terrain_map
+
+        grid = self.grid
+        inf = float('inf')
+        self.g = [inf] * grid.size
+        self.rhs = [inf] * grid.size
+        inside = np.zeros((grid.rows + 2, grid.width), dtype=bool)
+        inside[1:-1, 1:-1] = True
+        self.inside = inside.ravel().tolist()
+
+        # O D* Lite só é correto com custos positivos: duas células vizinhas de
+        # custo 0 poderiam se sustentar mutuamente depois de uma edição. Por
+        # isso cada passo custa custo * unit + 1, o que equivale a comparar
+        # (custo, número de passos) e mantém o custo real recuperável
+        self.unit = grid.size
+        self.step = [self.encode(c) for c in grid.move_cost]
+
+        # A escala vem da tabela de custos e não do mapa atual, para que a
+        # heurística continue consistente depois de qualquer edição
+        finite = [c for c in grid.cost_map.values() if c != inf]
+        self.scale = self.encode(min(finite)) if finite else 1
+
+        self.start = grid.index(start)
+        self.goal = grid.index(goal)
+        self.last = self.start
+        self.km = 0
+        self.queue = []
+        self.queued = {}
+        self.expanded = 0
+
+        self.rhs[self.goal] = 0
+        self.insert(self.goal, self.calculate_key(self.goal))
+
+    # ---------------------------------------------
+    # Núcleo do D* Lite
+    # ---------------------------------------------
+
+    def encode(self, cost: float) -> float:
+        return cost * self.unit + 1
+
+    def h(self, a: int, b: int) -> float:
+        ar, ac = divmod(a, self.grid.width)
+        br, bc = divmod(b, self.grid.width)
+        return self.scale * (abs(ar - br) + abs(ac - bc))
+
+    def calculate_key(self, s: int) -> Tuple[float, float]:
+        best = min(self.g[s], self.rhs[s])
+        return (best + self.h(self.start, s) + self.km, best)
+
+    def insert(self, s: int, key: Tuple[float, float]):
+        self.queued[s] = key
+        heapq.heappush(self.queue, (key, s))
+
+    def top_key(self) -> Tuple[float, float]:
+        # Descarta entradas removidas ou com chave antiga
+        while self.queue:
+            key, s = self.queue[0]
+            if self.queued.get(s) == key:
+                return key
+            heapq.heappop(self.queue)
+        return (float('inf'), float('inf'))
+
+    def update_vertex(self, u: int):
+        if u != self.goal:
+            best = float('inf')
+            steps = self.step
+            g = self.g
+            for offset in self.grid.offsets:
+                v = u + offset
+                step = steps[v]
+                if step != float('inf'):
+                    candidate = step + g[v]
+                    if candidate < best:
+                        best = candidate
+            self.rhs[u] = best
+        self.queued.pop(u, None)
+        if self.g[u] != self.rhs[u]:
+            self.insert(u, self.calculate_key(u))
+
+    def update_predecessors(self, u: int):
+        """Reavalia as células que entram em ``u`` (seus vizinhos)"""
+        if self.step[u] == float('inf'):
+            return
+        for offset in self.grid.offsets:
+            p = u + offset
+            if self.inside[p]:
+                self.update_vertex(p)
+
+    def compute_shortest_path(self):
+        inf = float('inf')
+        while True:
+            top = self.top_key()
+            if top == (inf, inf):
+                break
+            if not (top < self.calculate_key(self.start) or self.rhs[self.start] != self.g[self.start]):
+                break
+
+            key_old, u = heapq.heappop(self.queue)
+            del self.queued[u]
+            self.expanded += 1
+            key_new = self.calculate_key(u)
+
+            if key_old < key_new:
+                self.insert(u, key_new)
+            elif self.g[u] > self.rhs[u]:
+                self.g[u] = self.rhs[u]
+                self.update_predecessors(u)
+            else:
+                self.g[u] = inf
+                self.update_vertex(u)
+                self.update_predecessors(u)
+
+    # ---------------------------------------------
+    # Interface pública
+    # ---------------------------------------------
+
+    def update_cells(self, changes: Dict[Position, int]):
+        """Aplica ``{posição: novo tipo de terreno}`` e marca o que precisa de reparo"""
+        grid = self.grid
+        changed = []
+        for pos, terrain_type in changes.items():
+            index = grid.index(pos)
+            if grid.move_cost[index] == grid.cost_map.get(terrain_type, float('inf')):
+                if self.terrain_map is not None:
+                    self.terrain_map[pos[0]][pos[1]] = terrain_type
+                continue
+            grid.set_cell(pos, terrain_type)
+            self.step[index] = self.encode(grid.move_cost[index])
+            if self.terrain_map is not None:
+                self.terrain_map[pos[0]][pos[1]] = terrain_type
+            changed.append(index)
+
+        if not changed:
+            return
+        self.km += self.h(self.last, self.start)
+        self.last = self.start
+        for index in changed:
+            # O custo de entrar em index mudou: os vizinhos recalculam rhs
+            for offset in grid.offsets:
+                p = index + offset
+                if self.inside[p]:
+                    self.update_vertex(p)
+
+    def update_cell(self, pos: Position, terrain_type: int):
+        self.update_cells({pos: terrain_type})
+
+    def move_start(self, start: Position):
+        """Muda a posição inicial (por exemplo, Link andou pelo caminho)"""
+        new_start = self.grid.index(start)
+        self.km += self.h(self.last, new_start)
+        self.last = new_start
+        self.start = new_start
+
+    def plan(self, stats: dict = None) -> Tuple[Path, Dict[Position, float]]:
+        """Repara a árvore de caminhos e retorna o caminho atual até o objetivo"""
+        expanded_before = self.expanded
+        self.compute_shortest_path()
+        if stats is not None:
+            stats['expanded'] = self.expanded - expanded_before
+
+        inf = float('inf')
+        grid = self.grid
+        move_cost = grid.move_cost
+        if self.g[self.start] == inf:
+            return [], inf
+
+        # Com passos estritamente positivos, descer sempre para o vizinho de
+        # menor c(u, v) + g(v) chega ao objetivo sem ciclos
+        g = self.g
+        steps = self.step
+        cells = [self.start]
+        current = self.start
+        while current != self.goal:
+            best, nxt = inf, None
+            for offset in grid.offsets:
+                v = current + offset
+                candidate = steps[v] + g[v]
+                if candidate < best:
+                    best, nxt = candidate, v
+            if nxt is None:
+                return [], inf
+            cells.append(nxt)
+            current = nxt
+
+        path = [grid.position(i) for i in cells]
+        costs = {}
+        total = 0
+        for k, index in enumerate(cells):
+            if k > 0:
+                total += move_cost[index]
+            costs[path[k]] = total
+        return path, costs
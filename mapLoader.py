@@ -0,0 +1,395 @@
+import os
+import struct
+import sys
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+Position = Tuple[int, int]
+
+# =============================================
+# Leitura Rápida de Mapas
+# =============================================
+#
+# Três formatos são aceitos:
+#   .txt  -> o formato original, números separados por espaço
+#   .hmap -> binário: cabeçalho + células especiais + grade uint8, aberto com
+#            np.memmap (só as páginas usadas são lidas do disco)
+#   .tmap -> binário em blocos quadrados de ``tile_size`` células, para mapas
+#            maiores que a memória: ``TiledMap`` lê os blocos sob demanda e
+#            guarda só os mais usados (LRU); a grade inteira nunca é montada
+
+# Códigos das células especiais (os mesmos de heuristicSearchComplete)
+DANGEON = 7
+PENDANT = 8
+LINK = 9
+LOSTWOOD = 11
+SWORD = 12
+SPECIAL_CELLS = (DANGEON, PENDANT, LINK, LOSTWOOD, SWORD)
+
+# Valor usado quando um número do arquivo de texto não pode ser lido
+INVALID_CELL = 22
+
+# Tabelas por byte usadas na leitura vetorizada do texto
+DIGIT_TABLE = np.zeros(256, dtype=bool)
+DIGIT_TABLE[ord('0'):ord('9') + 1] = True
+VALID_TABLE = DIGIT_TABLE.copy()
+VALID_TABLE[list(b' \t\r\n\v\f')] = True
+
+BINARY_EXTENSION = '.hmap'
+BINARY_MAGIC = b'HMAP'
+BINARY_VERSION = 1
+# magic, versão, linhas, colunas, nº de células especiais, início da grade
+BINARY_HEADER = struct.Struct('<4sHIIII')
+BINARY_ALIGN = 64
+
+TILED_EXTENSION = '.tmap'
+TILED_MAGIC = b'TMAP'
+TILED_VERSION = 1
+# magic, versão, linhas, colunas, lado do bloco, nº de células especiais,
+# início das células especiais; depois vem a contagem de cada terreno (256 x u8)
+TILED_HEADER = struct.Struct('<4sHIIIIQ')
+TILED_COUNTS = 256
+DEFAULT_TILE_SIZE = 256
+# Blocos mantidos na memória por TiledMap (64 blocos de 256 x 256 = 4 MB)
+DEFAULT_TILE_CAPACITY = 64
+# Valor gravado nas sobras dos blocos da borda direita e de baixo
+OUTSIDE_CELL = 255
+
+class MapInfo(NamedTuple):
+    """Grade do mapa e posições das células especiais, lidas em uma passada"""
+    terrain: np.ndarray  # ou um TiledMap, nos mapas .tmap
+    link: Optional[Position]
+    dungeons: List[Position]  # em ordem de leitura (linha, coluna)
+    pendant: Optional[Position]
+    lost_woods: Optional[Position]
+    sword: Optional[Position]
+
+    def targets(self) -> List[Position]:
+        """Masmorras na ordem usada por ``loading_map``, com Lost Woods no fim"""
+        return self.dungeons[::-1] + [self.lost_woods]
+
+def parse_map_text(text) -> np.ndarray:
+    """Converte o texto do mapa em uma matriz de inteiros.
+
+    Os dígitos são lidos direto dos bytes com numpy, sem criar uma string por
+    célula; só quando aparece algo que não é número ou espaço o texto é
+    relido token a token para apontar onde está o erro.
+    """
+    data = text.encode() if isinstance(text, str) else text
+    raw = np.frombuffer(data, dtype=np.uint8)
+    is_digit = DIGIT_TABLE[raw]
+    if not VALID_TABLE[raw].all():
+        lines = [line for line in data.decode().splitlines() if line.strip()]
+        return _parse_tokens(lines)
+
+    if not is_digit.any():
+        return np.zeros((0, 0), dtype=np.int64)
+
+    # Início e fim de cada número e a linha do arquivo em que ele está
+    previous = np.concatenate(([False], is_digit[:-1]))
+    following = np.concatenate((is_digit[1:], [False]))
+    starts = np.flatnonzero(is_digit & ~previous)
+    ends = np.flatnonzero(is_digit & ~following)
+    line_of = np.cumsum(raw == ord('\n'))[starts]
+
+    # line_of já está ordenado: o tamanho de cada linha sai das trocas de valor
+    breaks = np.flatnonzero(np.diff(line_of)) + 1
+    widths = np.diff(np.concatenate(([0], breaks, [len(starts)])))
+    if (widths != widths[0]).any():
+        raise ValueError(f"linhas com números de colunas diferentes: {sorted(set(widths.tolist()))}")
+
+    # Cada dígito vale digito * 10^(posições até o fim do número)
+    token = np.cumsum(is_digit & ~previous)[is_digit] - 1
+    positions = np.flatnonzero(is_digit)
+    place = ends[token] - positions
+    weights = (raw[is_digit] - ord('0')) * np.power(10.0, place)
+    values = np.bincount(token, weights=weights, minlength=len(starts)).astype(np.int64)
+    return values.reshape(len(widths), int(widths[0]))
+
+def _parse_tokens(lines: List[str]) -> np.ndarray:
+    """Caminho lento, só quando há valores inválidos: avisa cada um deles"""
+    widths = {len(line.split()) for line in lines}
+    if len(widths) > 1:
+        raise ValueError(f"linhas com números de colunas diferentes: {sorted(widths)}")
+    values = []
+    for row_index, line in enumerate(lines):
+        for col_index, element_str in enumerate(line.split()):
+            try:
+                values.append(int(element_str))
+            except ValueError:
+                print(f"Não foi possível converter '{element_str}' para inteiro na linha {row_index}, coluna {col_index}")
+                values.append(INVALID_CELL)
+    return np.array(values, dtype=np.int64).reshape(len(lines), -1)
+
+def find_special_cells(terrain: np.ndarray) -> np.ndarray:
+    """Linhas ``(tipo, linha, coluna)`` de todas as células especiais"""
+    rows, cols = np.nonzero(np.isin(terrain, SPECIAL_CELLS))
+    return np.stack([terrain[rows, cols], rows, cols], axis=1).astype(np.int64)
+
+def build_map_info(terrain: np.ndarray, specials: np.ndarray) -> MapInfo:
+    found: Dict[int, List[Position]] = {kind: [] for kind in SPECIAL_CELLS}
+    for kind, r, c in specials.tolist():
+        found[kind].append((r, c))
+
+    def last(kind: int) -> Optional[Position]:
+        # Como no carregador original, vale a última ocorrência
+        return found[kind][-1] if found[kind] else None
+
+    return MapInfo(terrain, last(LINK), found[DANGEON], last(PENDANT), last(LOSTWOOD), last(SWORD))
+
+def load_text_map(filename: str) -> MapInfo:
+    with open(filename, 'rb') as f:
+        terrain = parse_map_text(f.read())
+    return build_map_info(terrain, find_special_cells(terrain))
+
+def save_binary_map(terrain: np.ndarray, filename: str):
+    """Grava a grade no formato .hmap (escrita atômica)"""
+    terrain = np.asarray(terrain)
+    if terrain.ndim != 2:
+        raise ValueError("o mapa precisa ser uma matriz")
+    if terrain.size and (terrain.min() < 0 or terrain.max() > 255):
+        raise ValueError("o formato binário só aceita terrenos entre 0 e 255")
+
+    specials = find_special_cells(terrain).astype('<i4')
+    offset = BINARY_HEADER.size + specials.nbytes
+    offset += -offset % BINARY_ALIGN
+    rows, cols = terrain.shape
+
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, rows, cols, len(specials), offset))
+        f.write(specials.tobytes())
+        f.write(b'\0' * (offset - f.tell()))
+        f.write(np.ascontiguousarray(terrain, dtype=np.uint8).tobytes())
+    os.replace(tmp, filename)
+
+def load_binary_map(filename: str) -> MapInfo:
+    """Abre um .hmap; a grade retornada é um memmap somente leitura"""
+    with open(filename, 'rb') as f:
+        header = f.read(BINARY_HEADER.size)
+        if len(header) < BINARY_HEADER.size:
+            raise ValueError(f"{filename}: arquivo truncado")
+        magic, version, rows, cols, count, offset = BINARY_HEADER.unpack(header)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{filename}: não é um mapa .hmap versão {BINARY_VERSION}")
+        specials = np.frombuffer(f.read(count * 12), dtype='<i4').reshape(count, 3)
+
+    if os.path.getsize(filename) < offset + rows * cols:
+        raise ValueError(f"{filename}: arquivo truncado")
+    if rows * cols == 0:
+        terrain = np.zeros((rows, cols), dtype=np.uint8)
+    else:
+        terrain = np.memmap(filename, dtype=np.uint8, mode='r', offset=offset, shape=(rows, cols))
+    return build_map_info(terrain, specials.astype(np.int64))
+
+# =============================================
+# Mapas em Blocos (.tmap)
+# =============================================
+
+def tiled_offset() -> int:
+    """Início dos blocos no arquivo: cabeçalho e contagens, alinhados"""
+    offset = TILED_HEADER.size + TILED_COUNTS * 8
+    return offset + -offset % BINARY_ALIGN
+
+def write_tiled_map(bands: Iterable[np.ndarray], filename: str, tile_size: int = DEFAULT_TILE_SIZE):
+    """Grava em .tmap faixas de ``tile_size`` linhas (só a última pode ser menor).
+
+    Cada faixa vira uma fileira de blocos assim que chega, então só uma faixa
+    fica na memória. Escrita atômica.
+    """
+    rows = 0
+    cols = None
+    short_band = False
+    counts = np.zeros(TILED_COUNTS, dtype=np.int64)
+    specials = []
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.seek(tiled_offset())
+        for band in bands:
+            band = np.asarray(band)
+            if band.ndim != 2 or len(band) > tile_size:
+                raise ValueError(f"cada faixa precisa ser uma matriz de até {tile_size} linhas")
+            if cols is None:
+                cols = band.shape[1]
+            elif band.shape[1] != cols:
+                raise ValueError(f"linhas com números de colunas diferentes: {sorted({cols, band.shape[1]})}")
+            if short_band:
+                raise ValueError(f"só a última faixa pode ter menos de {tile_size} linhas")
+            if band.size and (band.min() < 0 or band.max() >= OUTSIDE_CELL):
+                raise ValueError(f"o formato em blocos só aceita terrenos entre 0 e {OUTSIDE_CELL - 1}")
+            if not len(band):
+                continue
+            short_band = len(band) < tile_size
+
+            found = find_special_cells(band)
+            found[:, 1] += rows
+            specials.append(found)
+            counts += np.bincount(band.ravel().astype(np.intp), minlength=TILED_COUNTS)
+
+            # Fileira de blocos: (linhas, blocos, colunas) -> (blocos, linhas, colunas)
+            across = -(-cols // tile_size)
+            block = np.full((tile_size, across * tile_size), OUTSIDE_CELL, dtype=np.uint8)
+            block[:len(band), :cols] = band
+            f.write(block.reshape(tile_size, across, tile_size).transpose(1, 0, 2).tobytes())
+            rows += len(band)
+
+        specials = np.concatenate(specials) if specials else np.zeros((0, 3), dtype=np.int64)
+        special_offset = f.tell()
+        f.write(specials.astype('<i4').tobytes())
+        f.seek(0)
+        f.write(TILED_HEADER.pack(TILED_MAGIC, TILED_VERSION, rows, cols or 0, tile_size,
+                                  len(specials), special_offset))
+        f.write(counts.astype('<u8').tobytes())
+    os.replace(tmp, filename)
+
+def save_tiled_map(terrain: np.ndarray, filename: str, tile_size: int = DEFAULT_TILE_SIZE):
+    """Grava uma grade (array ou memmap de um .hmap) em .tmap, uma faixa por vez"""
+    if np.ndim(terrain) != 2:
+        raise ValueError("o mapa precisa ser uma matriz")
+    bands = (terrain[r:r + tile_size] for r in range(0, len(terrain), tile_size))
+    write_tiled_map(bands, filename, tile_size)
+
+def text_bands(filename: str, band_rows: int) -> Iterator[np.ndarray]:
+    """Lê um mapa de texto em faixas de ``band_rows`` linhas"""
+    with open(filename, 'rb') as f:
+        lines = []
+        for line in f:
+            if not line.strip():
+                continue
+            lines.append(line)
+            if len(lines) == band_rows:
+                yield parse_map_text(b''.join(lines))
+                lines = []
+        if lines:
+            yield parse_map_text(b''.join(lines))
+
+class TiledMap:
+    """Mapa .tmap aberto para leitura.
+
+    ``tile(k)`` devolve o bloco k (``bytes`` com ``tile_size ** 2`` células,
+    linha a linha); no máximo ``capacity`` blocos ficam guardados, e o menos
+    usado sai primeiro. ``loads`` e ``hits`` contam leituras do disco e
+    acertos do cache.
+    """
+
+    def __init__(self, filename: str, capacity: int = DEFAULT_TILE_CAPACITY):
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        try:
+            header = self.file.read(TILED_HEADER.size)
+            if len(header) < TILED_HEADER.size:
+                raise ValueError(f"{filename}: arquivo truncado")
+            magic, version, rows, cols, tile_size, count, special_offset = TILED_HEADER.unpack(header)
+            if magic != TILED_MAGIC or version != TILED_VERSION:
+                raise ValueError(f"{filename}: não é um mapa .tmap versão {TILED_VERSION}")
+            self.counts = np.frombuffer(self.file.read(TILED_COUNTS * 8), dtype='<u8').astype(np.int64)
+
+            self.rows, self.cols, self.tile_size = rows, cols, tile_size
+            self.tiles_across = -(-cols // tile_size)
+            self.tiles_down = -(-rows // tile_size)
+            self.tiles_offset = tiled_offset()
+            tiles_end = self.tiles_offset + self.tiles_across * self.tiles_down * tile_size ** 2
+            if special_offset < tiles_end or os.path.getsize(filename) < special_offset + count * 12:
+                raise ValueError(f"{filename}: arquivo truncado")
+            self.file.seek(special_offset)
+            self.specials = np.frombuffer(self.file.read(count * 12), dtype='<i4').reshape(count, 3).astype(np.int64)
+        except Exception:
+            self.file.close()
+            raise
+
+        self.capacity = max(1, capacity)
+        self.cache: 'OrderedDict[int, bytes]' = OrderedDict()
+        self.loads = 0
+        self.hits = 0
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.rows, self.cols
+
+    def tile(self, key: int) -> bytes:
+        """Bloco ``key`` (linha de blocos * ``tiles_across`` + coluna de blocos)"""
+        tile = self.cache.get(key)
+        if tile is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return tile
+        size = self.tile_size ** 2
+        self.file.seek(self.tiles_offset + key * size)
+        tile = self.file.read(size)
+        self.cache[key] = tile
+        self.loads += 1
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        return tile
+
+    def __getitem__(self, pos: Position) -> int:
+        r, c = pos
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError(pos)
+        t = self.tile_size
+        return self.tile((r // t) * self.tiles_across + c // t)[(r % t) * t + c % t]
+
+    def region(self, top: int, left: int, rows: int, cols: int) -> np.ndarray:
+        """Recorte da grade (limitado ao mapa), montado só com os blocos que ele cobre"""
+        bottom, right = min(top + rows, self.rows), min(left + cols, self.cols)
+        top, left = max(top, 0), max(left, 0)
+        out = np.zeros((max(bottom - top, 0), max(right - left, 0)), dtype=np.uint8)
+        t = self.tile_size
+        for tr in range(top // t, -(-bottom // t)):
+            for tc in range(left // t, -(-right // t)):
+                tile = np.frombuffer(self.tile(tr * self.tiles_across + tc), dtype=np.uint8).reshape(t, t)
+                r0, r1 = max(top, tr * t), min(bottom, (tr + 1) * t)
+                c0, c1 = max(left, tc * t), min(right, (tc + 1) * t)
+                out[r0 - top:r1 - top, c0 - left:c1 - left] = tile[r0 - tr * t:r1 - tr * t, c0 - tc * t:c1 - tc * t]
+        return out
+
+    def close(self):
+        self.cache.clear()
+        self.file.close()
+
+    def __enter__(self) -> 'TiledMap':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_tiled_map(filename: str, capacity: int = DEFAULT_TILE_CAPACITY) -> MapInfo:
+    """Abre um .tmap; ``MapInfo.terrain`` é o ``TiledMap`` (nenhum bloco é lido ainda)"""
+    tiled = TiledMap(filename, capacity)
+    return build_map_info(tiled, tiled.specials)
+
+def load_map(filename: str) -> MapInfo:
+    """Carrega um mapa .txt, .hmap ou .tmap, escolhendo o formato pela extensão"""
+    if filename.endswith(BINARY_EXTENSION):
+        return load_binary_map(filename)
+    if filename.endswith(TILED_EXTENSION):
+        return load_tiled_map(filename)
+    return load_text_map(filename)
+
+def convert_map(source: str, target: Optional[str] = None) -> str:
+    """Converte um mapa de texto para .hmap e retorna o nome do arquivo gerado"""
+    if target is None:
+        target = os.path.splitext(source)[0] + BINARY_EXTENSION
+    save_binary_map(load_text_map(source).terrain, target)
+    return target
+
+def convert_tiled_map(source: str, target: Optional[str] = None, tile_size: int = DEFAULT_TILE_SIZE) -> str:
+    """Converte um mapa .txt ou .hmap para .tmap sem carregar a grade inteira"""
+    if target is None:
+        target = os.path.splitext(source)[0] + TILED_EXTENSION
+    if source.endswith(BINARY_EXTENSION):
+        save_tiled_map(load_binary_map(source).terrain, target, tile_size)
+    else:
+        write_tiled_map(text_bands(source, tile_size), target, tile_size)
+    return target
+
+if __name__ == "__main__":
+    names = [name for name in sys.argv[1:] if name != '--tiled']
+    if not names:
+        print("Uso: python mapLoader.py [--tiled] mapa.txt [outro_mapa.txt ...]")
+        sys.exit(1)
+    convert = convert_tiled_map if '--tiled' in sys.argv[1:] else convert_map
+    for name in names:
+        print(f"{name} -> {convert(name)}")
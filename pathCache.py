@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from searchResult import SearchResult, map_columns
+
+Position = Tuple[int, int]
+Path = List[Position]
+
+# =============================================
+# Cache de Caminhos
+# =============================================
+#
+# Cada entrada é indexada por (hash do mapa, hash da tabela de custos,
+# início, objetivo). Como o hash vem do conteúdo do mapa, editar um arquivo
+# gera uma chave nova; ``map_key`` com ``source`` também descarta as entradas
+# antigas daquele arquivo, sem tocar nas dos outros mapas.
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# Versão do arquivo gravado por ``save``; arquivos de outra versão são ignorados
+CACHE_FORMAT = 2
+
+def map_hash(terrain_map) -> str:
+    """Hash do conteúdo do mapa (lista de listas ou FlatGrid)"""
+    digest = hashlib.sha1()
+    terrain = getattr(terrain_map, 'terrain', None)
+    if terrain is not None:
+        digest.update(repr(terrain.shape).encode())
+        digest.update(terrain.tobytes())
+    else:
+        for row in terrain_map:
+            digest.update(' '.join(map(str, row)).encode())
+            digest.update(b'\n')
+    return digest.hexdigest()
+
+def cost_table_hash(cost_map: Dict[int, float]) -> str:
+    """Hash da tabela de custos por tipo de terreno"""
+    items = sorted((int(k), float(v)) for k, v in cost_map.items())
+    return hashlib.sha1(repr(items).encode()).hexdigest()
+
+class PathCache:
+    """Cache LRU de caminhos com persistência opcional em disco.
+
+    ``search`` é a função de busca usada nas faltas (por exemplo
+    ``a_star_search``). Cada entrada é um ``SearchResult`` (caminho
+    empacotado e custos acumulados por passo), que é o que ``plot_map`` e
+    ``main`` consultam.
+    """
+
+    def __init__(
+        self,
+        search: Callable,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        filename: Optional[str] = None
+    ):
+        self.search_fn = search
+        self.max_entries = max_entries
+        self.filename = filename
+        self.entries = OrderedDict()
+        self.sources = {}  # arquivo do mapa -> hash atual
+        self.hits = 0
+        self.misses = 0
+
+        if filename and os.path.exists(filename):
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def map_key(self, terrain_map, source: Optional[str] = None) -> str:
+        """Calcula o hash do mapa; com ``source`` invalida versões antigas do arquivo"""
+        key = map_hash(terrain_map)
+        if source is not None:
+            previous = self.sources.get(source)
+            if previous is not None and previous != key:
+                self.invalidate(previous)
+            self.sources[source] = key
+        return key
+
+    def invalidate(self, map_key: str):
+        """Remove todas as entradas de um mapa"""
+        for key in [k for k in self.entries if k[0] == map_key]:
+            del self.entries[key]
+
+    def search(
+        self,
+        start: Position,
+        goal: Position,
+        terrain_map,
+        cost_map: Dict[int, float],
+        map_key: Optional[str] = None
+    ) -> SearchResult:
+        if map_key is None:
+            map_key = map_hash(terrain_map)
+        key = (map_key, cost_table_hash(cost_map), tuple(start), tuple(goal))
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        result = self.search_fn(start, goal, terrain_map, cost_map)
+        if not isinstance(result, SearchResult):
+            # Funções de busca que ainda retornam (caminho, custos)
+            path, cost = result
+            result = SearchResult.from_path(path, cost, map_columns(terrain_map))
+        self.put(key, result)
+        return result
+
+    def put(self, key, result: SearchResult):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ocorreu um erro ao ler o cache de caminhos: {e}")
+            return
+
+        if data.get('format') != CACHE_FORMAT:
+            return  # Cache de outra versão: recomeça vazio
+
+        self.sources = dict(data.get('sources', {}))
+        for map_key, cost_key, start, goal, cols, cells, step_costs in data.get('entries', []):
+            key = (map_key, cost_key, tuple(start), tuple(goal))
+            self.put(key, SearchResult(np.asarray(cells, dtype=np.int64), cols, np.asarray(step_costs)))
+
+    def save(self):
+        """Grava o cache em ``filename`` (escrita atômica)"""
+        if not self.filename:
+            return
+        data = {
+            'format': CACHE_FORMAT,
+            'sources': self.sources,
+            'entries': [
+                [map_key, cost_key, list(start), list(goal),
+                 result.cols, result.cells.tolist(), result.step_costs.tolist()]
+                for (map_key, cost_key, start, goal), result in self.entries.items()
+            ]
+        }
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.filename)
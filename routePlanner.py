@@ -0,0 +1,151 @@
+from typing import List, Optional, Sequence, Tuple
+
+# =============================================
+# Ordenação dos Objetivos (masmorras)
+# =============================================
+#
+# Os nós da matriz seguem sempre a mesma convenção:
+#   0         -> ponto de partida (casa do Link)
+#   1 .. n    -> objetivos (masmorras)
+#   n + 1     -> destino final (Lost Woods)
+#
+# leg_cost[a][b] é o custo de ir do nó a até o nó b no mapa principal e
+# node_cost[k] é o custo gasto dentro do nó k (ida e volta na masmorra).
+
+INF = float('inf')
+
+# Acima deste número de objetivos o Held-Karp fica caro em Python puro
+HELD_KARP_LIMIT = 12
+
+Order = Tuple[int, ...]
+CostMatrix = Sequence[Sequence[float]]
+
+def tour_cost(order: Sequence[int], leg_cost: CostMatrix, node_cost: Sequence[float]) -> float:
+    """Custo total de partir do início, visitar ``order`` e terminar no destino"""
+    end = len(leg_cost) - 1
+    total = 0
+    previous = 0
+    for node in order:
+        total += leg_cost[previous][node] + node_cost[node]
+        previous = node
+    return total + leg_cost[previous][end]
+
+def held_karp_order(leg_cost: CostMatrix, node_cost: Sequence[float]) -> Tuple[Optional[Order], float]:
+    """Ordem ótima por programação dinâmica (Held-Karp), O(n²·2ⁿ).
+
+    Entre ordens de mesmo custo retorna a primeira em ordem lexicográfica, a
+    mesma que uma busca por ``itertools.permutations`` escolheria.
+    """
+    n = len(leg_cost) - 2
+    end = n + 1
+    full = (1 << n) - 1
+
+    # remaining[mask][j]: menor custo para, estando em j com os objetivos de
+    # mask já visitados, visitar o restante e chegar ao destino
+    remaining = [[INF] * (n + 1) for _ in range(full + 1)]
+    for j in range(1, n + 1):
+        remaining[full][j] = leg_cost[j][end]
+
+    for mask in range(full - 1, 0, -1):
+        for j in range(1, n + 1):
+            if not mask & (1 << (j - 1)):
+                continue
+            best = INF
+            for k in range(1, n + 1):
+                bit = 1 << (k - 1)
+                if mask & bit:
+                    continue
+                candidate = leg_cost[j][k] + node_cost[k] + remaining[mask | bit][k]
+                if candidate < best:
+                    best = candidate
+            remaining[mask][j] = best
+
+    if n == 0:
+        direct = leg_cost[0][end]
+        return ((), direct) if direct != INF else (None, INF)
+
+    # Reconstruir a ordem escolhendo sempre o menor índice que mantém o ótimo
+    best_total = INF
+    for k in range(1, n + 1):
+        bit = 1 << (k - 1)
+        best_total = min(best_total, leg_cost[0][k] + node_cost[k] + remaining[bit][k])
+    if best_total == INF:
+        return None, INF
+
+    order = []
+    mask = 0
+    current = 0
+    while mask != full:
+        # Mesmo cálculo da tabela, então a comparação exata é segura
+        expected = remaining[mask][current] if mask else best_total
+        for k in range(1, n + 1):
+            bit = 1 << (k - 1)
+            if mask & bit:
+                continue
+            if leg_cost[current][k] + node_cost[k] + remaining[mask | bit][k] == expected:
+                order.append(k)
+                mask |= bit
+                current = k
+                break
+
+    return tuple(order), best_total
+
+def nearest_neighbor_order(leg_cost: CostMatrix, node_cost: Sequence[float]) -> Order:
+    """Ordem gulosa: sempre o objetivo mais barato a partir da posição atual"""
+    n = len(leg_cost) - 2
+    unvisited = list(range(1, n + 1))
+    order = []
+    current = 0
+    while unvisited:
+        nxt = min(unvisited, key=lambda k: leg_cost[current][k] + node_cost[k])
+        unvisited.remove(nxt)
+        order.append(nxt)
+        current = nxt
+    return tuple(order)
+
+def two_opt(order: Sequence[int], leg_cost: CostMatrix, node_cost: Sequence[float]) -> Tuple[Order, float]:
+    """Melhora uma ordem invertendo trechos enquanto o custo total diminuir.
+
+    Os custos não são simétricos (o custo é cobrado na célula de entrada), por
+    isso cada candidato é reavaliado por completo.
+    """
+    best = list(order)
+    best_cost = tour_cost(best, leg_cost, node_cost)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(best) - 1):
+            for j in range(i + 1, len(best)):
+                candidate = best[:i] + best[i:j + 1][::-1] + best[j + 1:]
+                cost = tour_cost(candidate, leg_cost, node_cost)
+                if cost < best_cost:
+                    best, best_cost = candidate, cost
+                    improved = True
+    return tuple(best), best_cost
+
+def solve_order(
+    leg_cost: CostMatrix,
+    node_cost: Optional[Sequence[float]] = None,
+    exact_limit: int = HELD_KARP_LIMIT
+) -> Tuple[Optional[Order], float]:
+    """Escolhe a ordem de visita dos objetivos.
+
+    Usa Held-Karp (exato) até ``exact_limit`` objetivos e vizinho mais
+    próximo + 2-opt (heurístico) acima disso. Retorna ``(None, inf)`` quando
+    nenhuma ordem é viável.
+    """
+    if node_cost is None:
+        node_cost = [0] * len(leg_cost)
+    n = len(leg_cost) - 2
+    if n <= exact_limit:
+        return held_karp_order(leg_cost, node_cost)
+
+    order, cost = two_opt(nearest_neighbor_order(leg_cost, node_cost), leg_cost, node_cost)
+    if cost == INF:
+        return None, INF
+    return order, cost
+
+def empty_matrix(objectives: int) -> List[List[float]]:
+    """Matriz (n + 2) x (n + 2) preenchida com infinito"""
+    size = objectives + 2
+    return [[INF] * size for _ in range(size)]
@@ -0,0 +1,88 @@
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+
+Position = Tuple[int, int]
+Path = List[Position]
+
+# =============================================
+# Resultado Compacto de Busca
+# =============================================
+#
+# Em vez do dicionário com o custo de todas as células exploradas, o
+# resultado guarda só o caminho: as células como índices ``linha * colunas +
+# coluna`` em um vetor de inteiros e o custo acumulado de cada passo em outro
+# vetor alinhado com ele. Para o código antigo o objeto ainda se desempacota
+# como ``caminho, custos`` (custos = {posição: custo acumulado} do caminho).
+
+class SearchResult:
+    """Caminho empacotado, custos acumulados por passo e custo até o objetivo"""
+
+    __slots__ = ('cells', 'cols', 'step_costs', 'cost')
+
+    def __init__(self, cells: np.ndarray, cols: int, step_costs: np.ndarray):
+        self.cells = cells
+        self.cols = cols
+        self.step_costs = step_costs
+        self.cost = step_costs[-1].item() if len(step_costs) else float('inf')
+
+    @classmethod
+    def from_path(cls, path: Path, costs: Mapping[Position, float], cols: int) -> 'SearchResult':
+        """Empacota um ``(caminho, custos)`` no formato antigo"""
+        if not path:
+            return cls.not_found(cols)
+        rows, columns = zip(*path)
+        dtype = np.int32 if (max(rows) + 1) * cols < 2 ** 31 else np.int64
+        cells = np.asarray(rows, dtype=dtype) * cols + np.asarray(columns, dtype=dtype)
+        # Custos inteiros continuam inteiros (int32 quando cabem); o resto vira float64
+        step_costs = np.asarray([costs[pos] for pos in path])
+        if step_costs.dtype.kind == 'i' and step_costs[-1] < 2 ** 31:
+            step_costs = step_costs.astype(np.int32)
+        return cls(cells, cols, step_costs)
+
+    @classmethod
+    def not_found(cls, cols: int = 0) -> 'SearchResult':
+        return cls(np.zeros(0, dtype=np.int32), cols, np.zeros(0, dtype=np.int64))
+
+    @property
+    def found(self) -> bool:
+        return len(self.cells) > 0
+
+    @property
+    def path(self) -> Path:
+        if not self.found:
+            return []
+        rows, columns = np.divmod(self.cells, self.cols)
+        return list(zip(rows.tolist(), columns.tolist()))
+
+    @property
+    def costs(self) -> Dict[Position, float]:
+        """Custos acumulados do caminho como dicionário (para ``plot_map``)"""
+        return dict(zip(self.path, self.step_costs.tolist()))
+
+    @property
+    def nbytes(self) -> int:
+        return self.cells.nbytes + self.step_costs.nbytes
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __bool__(self) -> bool:
+        return self.found
+
+    def __iter__(self):
+        # Compatível com ``caminho, custos = a_star_search(...)``
+        if not self.found:
+            return iter(([], float('inf')))
+        path = self.path
+        return iter((path, dict(zip(path, self.step_costs.tolist()))))
+
+    def __repr__(self) -> str:
+        return f"SearchResult(passos={len(self)}, custo={self.cost})"
+
+def map_columns(terrain_map) -> int:
+    """Número de colunas de uma lista de listas, array numpy ou ``FlatGrid``"""
+    cols = getattr(terrain_map, 'cols', None)
+    if cols is not None:
+        return cols
+    return len(terrain_map[0]) if len(terrain_map) else 0
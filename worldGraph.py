@@ -0,0 +1,253 @@
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from heuristicSearchComplete import COST_MAP, WALL, FlatGrid, Path, Position
+from mapLoader import MapInfo, load_map
+from routePlanner import HELD_KARP_LIMIT, empty_matrix, solve_order
+
+# =============================================
+# Grafo do Mundo (mapa principal + masmorras)
+# =============================================
+#
+# Todos os mapas são carregados uma vez e empilhados em uma única grade,
+# separados por uma linha de parede, para que um só FlatGrid cubra o mundo.
+# Cada masmorra do mapa principal é ligada à entrada do seu mapa por um
+# portal nos dois sentidos; atravessar o portal custa o mesmo que entrar na
+# célula de chegada (0 nas células especiais). Assim uma busca sai do mapa
+# principal, entra na masmorra, pega o pingente e volta em uma só passada.
+#
+# As posições do mundo são (nível, linha, coluna): nível 0 é o mapa
+# principal e o nível k é dungeonMap{k}, ligado à k-ésima posição de
+# ``MapInfo.targets()`` (a mesma correspondência usada por ``journey``).
+
+WorldPosition = Tuple[int, int, int]
+
+MAIN_MAP_FILE = "mainMap.txt"
+
+def dungeon_map_files(count: int) -> List[str]:
+    return [f"dungeonMap{k}.txt" for k in range(1, count + 1)]
+
+class WorldLeg(NamedTuple):
+    """Trecho entre dois pontos do mundo, com o custo acumulado a cada passo"""
+    path: List[WorldPosition]
+    step_costs: List[float]
+
+    @property
+    def cost(self) -> float:
+        return self.step_costs[-1] if self.step_costs else float('inf')
+
+class WorldRoute(NamedTuple):
+    """Resposta de ``WorldGraph.plan``: ordem dos objetivos e trechos percorridos"""
+    order: Tuple[int, ...]  # índices em ``objectives``, na ordem de visita
+    legs: List[WorldLeg]
+
+    @property
+    def cost(self) -> float:
+        return sum(leg.cost for leg in self.legs)
+
+    def segments(self) -> List[Tuple[int, Path, Dict[Position, float], float]]:
+        """Partes de cada trecho dentro de um mesmo nível, prontas para ``plot_map``.
+
+        Cada item é ``(nível, caminho, custos desde o início da parte, custo
+        acumulado da rota antes dela)``.
+        """
+        segments = []
+        total = 0
+        for leg in self.legs:
+            first = 0
+            for k in range(1, len(leg.path) + 1):
+                if k < len(leg.path) and leg.path[k][0] == leg.path[first][0]:
+                    continue
+                base = leg.step_costs[first]
+                path = [(r, c) for _, r, c in leg.path[first:k]]
+                costs = {pos: cost - base for pos, cost in zip(path, leg.step_costs[first:k])}
+                segments.append((leg.path[first][0], path, costs, total + base))
+                first = k
+            total += leg.cost
+        return segments
+
+class WorldGraph:
+    """Mapa principal e masmorras como um único grafo ligado por portais"""
+
+    def __init__(
+        self,
+        main_file: str = MAIN_MAP_FILE,
+        dungeon_files: Optional[Sequence[str]] = None,
+        cost_map: Dict[int, int] = COST_MAP
+    ):
+        main = load_map(main_file)
+        if dungeon_files is None:
+            dungeon_files = dungeon_map_files(len(main.dungeons))
+        self.files = [main_file] + list(dungeon_files)
+        self.levels: List[MapInfo] = [main] + [load_map(name) for name in dungeon_files]
+        self.cost_map = cost_map
+
+        # Níveis empilhados com uma linha de parede entre eles; os mais
+        # estreitos são completados com parede à direita
+        cols = max(info.terrain.shape[1] for info in self.levels)
+        blocks = []
+        self.row_base = []
+        rows = 0
+        for info in self.levels:
+            if blocks:
+                blocks.append(np.full((1, cols), WALL, dtype=np.int64))
+                rows += 1
+            block = np.full((info.terrain.shape[0], cols), WALL, dtype=np.int64)
+            block[:, :info.terrain.shape[1]] = info.terrain
+            blocks.append(block)
+            self.row_base.append(rows)
+            rows += block.shape[0]
+        self.grid = FlatGrid(np.vstack(blocks), cost_map)
+
+        # Portais: masmorra k do mapa principal <-> entrada do nível k
+        targets = main.targets()
+        self.portals: Dict[int, int] = {}
+        for level, info in enumerate(self.levels[1:], start=1):
+            if level > len(main.dungeons) or info.link is None:
+                raise ValueError(f"{self.files[level]}: masmorra sem entrada no mapa principal")
+            outside = self.index((0,) + targets[level - 1])
+            inside = self.index((level,) + info.link)
+            self.portals[outside] = inside
+            self.portals[inside] = outside
+
+    # ---------------------------------------------
+    # Posições
+    # ---------------------------------------------
+
+    def index(self, pos: WorldPosition) -> int:
+        level, r, c = pos
+        return self.grid.index((self.row_base[level] + r, c))
+
+    def position(self, index: int) -> WorldPosition:
+        r, c = self.grid.position(index)
+        level = max(k for k, base in enumerate(self.row_base) if base <= r)
+        return level, r - self.row_base[level], c
+
+    def level_size(self, level: int) -> Tuple[int, int]:
+        return self.levels[level].terrain.shape
+
+    @property
+    def link(self) -> WorldPosition:
+        return (0,) + self.levels[0].link
+
+    @property
+    def pendants(self) -> List[WorldPosition]:
+        return [(level, ) + info.pendant for level, info in enumerate(self.levels) if level and info.pendant]
+
+    @property
+    def lost_woods(self) -> WorldPosition:
+        return (0,) + self.levels[0].lost_woods
+
+    @property
+    def sword(self) -> WorldPosition:
+        return (0,) + self.levels[0].sword
+
+    # ---------------------------------------------
+    # Buscas
+    # ---------------------------------------------
+
+    def sweep(self, start: WorldPosition, goals: Sequence[WorldPosition]) -> Dict[WorldPosition, WorldLeg]:
+        """Dijkstra de uma origem para vários destinos, atravessando portais.
+
+        Destinos inalcançáveis recebem ``WorldLeg([], [])``.
+        """
+        grid = self.grid
+        inf = float('inf')
+        move_cost = grid.move_cost
+        offsets = grid.offsets
+        portals = self.portals
+
+        g_score = [inf] * grid.size
+        parent = [-1] * grid.size
+        closed = bytearray(grid.size)
+        source = self.index(start)
+        pending = {self.index(goal) for goal in goals}
+
+        g_score[source] = 0
+        frontier = [(0, source)]
+        while frontier and pending:
+            current_cost, current = heapq.heappop(frontier)
+            if closed[current]:
+                continue  # Entrada antiga no heap
+            closed[current] = 1
+            pending.discard(current)
+
+            neighbors = [current + offset for offset in offsets]
+            jump = portals.get(current)
+            if jump is not None:
+                neighbors.append(jump)
+            for nxt in neighbors:
+                step = move_cost[nxt]
+                if step == inf:
+                    continue
+                new_cost = current_cost + step
+                if new_cost < g_score[nxt]:
+                    g_score[nxt] = new_cost
+                    heapq.heappush(frontier, (new_cost, nxt))
+                    parent[nxt] = current
+
+        legs = {}
+        for goal in goals:
+            target = self.index(goal)
+            if not closed[target]:
+                legs[goal] = WorldLeg([], [])
+                continue
+            cells = [target]
+            while cells[-1] != source:
+                cells.append(parent[cells[-1]])
+            cells.reverse()
+            legs[goal] = WorldLeg([self.position(i) for i in cells], [g_score[i] for i in cells])
+        return legs
+
+    def search(self, start: WorldPosition, goal: WorldPosition) -> WorldLeg:
+        return self.sweep(start, [goal])[goal]
+
+    def plan(
+        self,
+        objectives: Sequence[WorldPosition],
+        end: Union[WorldPosition, Sequence[WorldPosition]],
+        start: Optional[WorldPosition] = None,
+        exact_limit: int = HELD_KARP_LIMIT
+    ) -> Optional[WorldRoute]:
+        """Visita ``objectives`` na melhor ordem e termina em ``end``.
+
+        ``end`` pode ser uma lista de destinos, percorridos nessa ordem depois
+        dos objetivos (por exemplo Lost Woods e depois a Master Sword). Parte
+        de ``start`` ou da posição do Link. Retorna ``None`` sem rota viável.
+        """
+        if start is None:
+            start = self.link
+        ends = [tuple(end)] if isinstance(end[0], int) else [tuple(pos) for pos in end]
+        n = len(objectives)
+        points = [tuple(start)] + [tuple(pos) for pos in objectives] + [ends[0]]
+
+        # Uma varredura por ponto de partida cobre todas as suas pernas
+        leg_cost = empty_matrix(n)
+        legs = {}
+        for a in range(n + 1):
+            sweep = self.sweep(points[a], points[1:])
+            for b in range(1, n + 2):
+                if a == b or (a == 0 and b == n + 1 and n > 0):
+                    continue
+                leg = sweep[points[b]]
+                if leg.path:
+                    leg_cost[a][b] = leg.cost
+                    legs[(a, b)] = leg
+
+        order, _ = solve_order(leg_cost, None, exact_limit)
+        if order is None:
+            return None
+
+        route = []
+        previous = 0
+        for k in order + (n + 1,):
+            route.append(legs[(previous, k)])
+            previous = k
+        for a, b in zip(ends, ends[1:]):
+            leg = self.search(a, b)
+            if not leg.path:
+                return None
+            route.append(leg)
+        return WorldRoute(tuple(k - 1 for k in order), route)